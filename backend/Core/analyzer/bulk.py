@@ -0,0 +1,439 @@
+"""On-demand analysis of many tokens/pairs at once (POST /api/analyze).
+
+`BulkAnalyzer.analyze(addresses)` runs the TokenAnalyzer checks for a chunk
+of addresses in three rounds of batched RPC (backend.Core.rpc_batch) instead
+of ~12 sequential calls per token:
+
+  1. resolve: token0()/token1()/factory()/fee() on every address (pairs and
+     pools answer them) and getPair(address, WETH) on each V2 factory (for
+     plain token addresses)
+  2. checks: name/symbol/decimals of tokens not in the metadata cache,
+     runtime code, owner(), reserves (WETH balance for V3) and the buy quote
+  3. the sell quote for every buy that succeeded
+
+All three read the block that was the head when the chunk started, so a
+result describes one state, and with the chain's call cache
+(backend.Core.call_cache) chunks analysing the same pair in the same block
+share the calls.
+
+Results have the shape of TokenAnalyzer.analyze plus `input`/`target_token`,
+or `{"input": ..., "error": ...}`. V3 tokens have to be given by pool address.
+
+`stream_analysis` answers from `ResultCache` (recent results, ANALYZE_CACHE_TTL)
+first, then analyses the rest in chunks of ANALYZE_BATCH_SIZE on at most
+`concurrency` threads, yielding each chunk's results as soon as it is done.
+Chunks of every request together hold at most ANALYZE_GLOBAL_CONCURRENCY
+slots, and all calls go through the chain's RPC limiter, so bulk requests
+can't crowd out the listener.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+from backend import metrics
+from backend.Core.chains import get_chain
+from backend.Core.checks.bytecode_scan import scan_bytecode
+from backend.Core.checks.honeypot_check import TEST_AMOUNT, HONEYPOT_RATIO
+from backend.Core.checks.ownership_check import owner_renounced
+from backend.Core.code_templates import code_hash as hash_code
+from backend.Core.rate_limit import is_revert_error
+from backend.Core.token_info import cached_token_info, remember_token_info
+
+_RESULTS = metrics.REGISTRY.counter(
+    "ethbot_bulk_analysis_total", "Addresses answered by /api/analyze", ["outcome"])
+
+
+def _selector(signature: str) -> bytes:
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+SIGNATURES = {
+    "token0": ("token0()", []),
+    "token1": ("token1()", []),
+    "factory": ("factory()", []),
+    "fee": ("fee()", []),
+    "getPair": ("getPair(address,address)", ["address", "address"]),
+    "name": ("name()", []),
+    "symbol": ("symbol()", []),
+    "decimals": ("decimals()", []),
+    "owner": ("owner()", []),
+    "getReserves": ("getReserves()", []),
+    "balanceOf": ("balanceOf(address)", ["address"]),
+    "getAmountsOut": ("getAmountsOut(uint256,address[])", ["uint256", "address[]"]),
+    "quoteExactInputSingle": ("quoteExactInputSingle(address,address,uint24,uint256,uint160)",
+                              ["address", "address", "uint24", "uint256", "uint160"]),
+}
+_SELECTORS = {fn: _selector(sig) for fn, (sig, _) in SIGNATURES.items()}
+
+
+def calldata(fn: str, *args) -> str:
+    return "0x" + (_SELECTORS[fn] + encode(SIGNATURES[fn][1], list(args))).hex()
+
+
+def _decode(types: List[str], data: Optional[str]):
+    """Decoded return values, or None for a failed/reverted/empty call."""
+    if not data or data == "0x":
+        return None
+    try:
+        return decode(types, bytes.fromhex(data[2:] if data.startswith("0x") else data))
+    except Exception:
+        return None
+
+
+def _rpc_failed(error: Optional[Dict[str, Any]]) -> bool:
+    """An error that says nothing about the contract (transport, throttling), unlike a revert."""
+    return error is not None and not is_revert_error(error)
+
+
+def _address(data: Optional[str]) -> Optional[str]:
+    value = _decode(["address"], data)
+    if value is None or int(value[0], 16) == 0:
+        return None
+    return Web3.to_checksum_address(value[0])
+
+
+class ResultCache:
+    """Recent bulk results per (chain_id, address), so repeated requests cost no RPC."""
+
+    def __init__(self, ttl: float = 300.0, maxsize: int = 20000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        return cls(ttl=float(os.getenv("ANALYZE_CACHE_TTL", "300")))
+
+    def get(self, chain_id: int, address: str) -> Optional[Dict[str, Any]]:
+        key = (int(chain_id), address.lower())
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            if time.time() - hit[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return dict(hit[1])
+
+    def put(self, chain_id: int, address: str, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[(int(chain_id), address.lower())] = (time.time(), result)
+            self._entries.move_to_end((int(chain_id), address.lower()))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class BulkAnalyzer:
+    def __init__(self, caller, chain=None, templates=None):
+        # caller: backend.Core.rpc_batch.BatchCaller over the chain's web3
+        self.caller = caller
+        self.chain = get_chain(chain)
+        self.weth = Web3.to_checksum_address(self.chain.weth)
+        self.templates = templates
+        self.factories = {f.address.lower(): f for f in self.chain.registry.factories}
+        self.v2_factories = [f for f in self.chain.registry.factories if f.protocol == "v2"]
+        v3 = [f for f in self.chain.registry.factories if f.protocol == "v3"]
+        self.default_v3 = v3[0] if v3 else None
+
+    # ---- round 1
+    def head(self) -> Any:
+        """Current block number as a hex block parameter ("latest" if it can't be read)."""
+        result, error = self.caller.request_many([("eth_blockNumber", [])])[0]
+        return result if error is None and result else "latest"
+
+    def resolve(self, addresses: List[str], block: Any = "latest") -> List[Dict[str, Any]]:
+        """Pair/pool, tokens and factory of each address (a pair/pool itself, or a token's WETH pair)."""
+        per_address = 4 + len(self.v2_factories)
+        calls = []
+        for a in addresses:
+            calls += [(a, calldata("token0")), (a, calldata("token1")), (a, calldata("factory")), (a, calldata("fee"))]
+            calls += [(f.address, calldata("getPair", a, self.weth)) for f in self.v2_factories]
+        results = self.caller.call_many(calls, block)
+
+        out = []
+        for i, a in enumerate(addresses):
+            r = results[i * per_address:(i + 1) * per_address]
+            token0, token1 = _address(r[0]), _address(r[1])
+            if token0 and token1:
+                factory = self.factories.get((_address(r[2]) or "").lower())
+                fee = _decode(["uint24"], r[3])
+                if factory is None:
+                    # not a configured factory: V3 if it has a fee tier, else the first V2 factory
+                    factory = self.default_v3 if fee is not None and self.default_v3 else \
+                        (self.v2_factories[0] if self.v2_factories else None)
+                if factory is None:
+                    out.append({"input": a, "error": "unknown DEX"})
+                    continue
+                out.append({"input": a, "pair": a, "token0": token0, "token1": token1, "factory": factory,
+                            "fee": fee[0] if fee is not None and factory.protocol == "v3" else None})
+                continue
+            if a.lower() == self.weth.lower():
+                out.append({"input": a, "error": "WETH is the quote token of every pair"})
+                continue
+            for f, data in zip(self.v2_factories, r[4:]):
+                pair = _address(data)
+                if pair:
+                    token0, token1 = sorted([a, self.weth], key=lambda t: t.lower())
+                    out.append({"input": a, "pair": pair, "token0": token0, "token1": token1, "factory": f,
+                                "fee": None})
+                    break
+            else:
+                out.append({"input": a, "error": "not a pair/pool and no WETH pair found"})
+        return out
+
+    # ---- rounds 2 and 3
+    def _target(self, item: Dict[str, Any]) -> str:
+        return item["token0"] if item["token1"].lower() == self.weth.lower() else item["token1"]
+
+    def _buy_call(self, item: Dict[str, Any], target: str):
+        factory = item["factory"]
+        if factory.protocol == "v3":
+            if not factory.quoter:
+                return None
+            return factory.quoter, calldata("quoteExactInputSingle", self.weth, target, item["fee"] or 0,
+                                            TEST_AMOUNT, 0)
+        router = factory.router or self.chain.router
+        if not router:
+            return None
+        return Web3.to_checksum_address(router), calldata("getAmountsOut", TEST_AMOUNT, [self.weth, target])
+
+    def _sell_call(self, item: Dict[str, Any], target: str, amount: int):
+        factory = item["factory"]
+        if factory.protocol == "v3":
+            return factory.quoter, calldata("quoteExactInputSingle", target, self.weth, item["fee"] or 0, amount, 0)
+        router = factory.router or self.chain.router
+        return Web3.to_checksum_address(router), calldata("getAmountsOut", amount, [target, self.weth])
+
+    @staticmethod
+    def _quote(item: Dict[str, Any], data: Optional[str]) -> Optional[int]:
+        if item["factory"].protocol == "v3":
+            value = _decode(["uint256"], data)
+            return value[0] if value else None
+        value = _decode(["uint256[]"], data)
+        return value[0][-1] if value and value[0] else None
+
+    def analyze(self, addresses: List[str], block: Any = None) -> List[Dict[str, Any]]:
+        """Results per address, all read at `block` (default: the head when the chunk starts)."""
+        chain_id = self.chain.chain_id
+        addresses = [Web3.to_checksum_address(a) for a in addresses]
+        block = block if block is not None else self.head()
+        resolved = self.resolve(addresses, block)
+        items = [r for r in resolved if "error" not in r]
+
+        # round 2: everything that only needs the pair and tokens
+        requests, slots = [], []
+
+        def want(slot, method, params):
+            slots.append(slot)
+            requests.append((method, params))
+
+        metadata: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            for token in (item["token0"], item["token1"]):
+                key = token.lower()
+                if key in metadata:
+                    continue
+                cached = cached_token_info(token, chain_id)
+                metadata[key] = cached or {"address": token}
+                if cached is None:
+                    for fn in ("name", "symbol", "decimals"):
+                        want(("meta", key, fn), "eth_call", [{"to": token, "data": calldata(fn)}, block])
+        for n, item in enumerate(items):
+            target = item["target"] = self._target(item)
+            want(("code", n), "eth_getCode", [target, block])
+            want(("owner", n), "eth_call", [{"to": target, "data": calldata("owner")}, block])
+            if item["factory"].protocol == "v3":
+                want(("liquidity", n), "eth_call",
+                     [{"to": self.weth, "data": calldata("balanceOf", item["pair"])}, block])
+            else:
+                want(("liquidity", n), "eth_call", [{"to": item["pair"], "data": calldata("getReserves")}, block])
+            buy = self._buy_call(item, target)
+            if buy is not None:
+                want(("buy", n), "eth_call", [{"to": buy[0], "data": buy[1]}, block])
+
+        answers: Dict[tuple, Any] = {}
+        errors: Dict[tuple, Dict[str, Any]] = {}
+        for slot, (result, error) in zip(slots, self.caller.request_many(requests)):
+            answers[slot] = None if error is not None else result
+            if error is not None:
+                errors[slot] = error
+
+        for key, info in metadata.items():
+            if "symbol" in info:
+                continue
+            name = _decode(["string"], answers.get(("meta", key, "name")))
+            symbol = _decode(["string"], answers.get(("meta", key, "symbol")))
+            decimals = _decode(["uint8"], answers.get(("meta", key, "decimals")))
+            if name is None or symbol is None or decimals is None:
+                # same fallback as get_token_info
+                info.update(name="Unknown", symbol="UNK", decimals=18)
+            else:
+                info.update(name=name[0], symbol=symbol[0], decimals=decimals[0])
+                remember_token_info(dict(info), chain_id)
+
+        # round 3: sell back what the buy quote returned
+        sells, sell_items = [], []
+        for n, item in enumerate(items):
+            code_hex = answers.get(("code", n)) or "0x"
+            item["code"] = bytes.fromhex(code_hex[2:]) if code_hex.startswith("0x") else b""
+            template = None
+            if self.templates is not None:
+                item["code_hash"] = hash_code(item["code"])
+                template = self.templates.lookup(item["code_hash"])
+            item["template"] = template
+            item["verdict"] = self.templates.honeypot_verdict(template) if template else None
+            item["bought"] = self._quote(item, answers.get(("buy", n)))
+            if item["verdict"] is None and item["bought"]:
+                sells.append(self._sell_call(item, item["target"], item["bought"]))
+                sell_items.append(n)
+        sold = {}
+        if sells:
+            # (result, error) per sell quote, the error decides between "reverted" and "unknown"
+            responses = self.caller.request_many(
+                [("eth_call", [{"to": to, "data": data}, block]) for to, data in sells])
+            sold = dict(zip(sell_items, responses))
+
+        by_input = {}
+        for n, item in enumerate(items):
+            by_input[item["input"]] = dict(self._result(item, n, answers, errors, sold, metadata, chain_id),
+                                           block_number=None if block == "latest" else int(block, 16))
+        for r in resolved:
+            if "error" in r:
+                by_input[r["input"]] = {"input": r["input"], "chain_id": chain_id, "error": r["error"]}
+        return [by_input[a] for a in addresses]
+
+    def _result(self, item, n, answers, errors, sold, metadata, chain_id) -> Dict[str, Any]:
+        factory = item["factory"]
+        target = item["target"]
+
+        if factory.protocol == "v3":
+            balance = _decode(["uint256"], answers.get(("liquidity", n)))
+            liquidity = balance[0] / 10 ** 18 if balance else 0
+        else:
+            reserves = _decode(["uint112", "uint112", "uint32"], answers.get(("liquidity", n)))
+            liquidity = 0
+            if reserves:
+                if item["token0"].lower() == self.weth.lower():
+                    liquidity = reserves[0] / 10 ** 18
+                elif item["token1"].lower() == self.weth.lower():
+                    liquidity = reserves[1] / 10 ** 18
+
+        # only a round trip whose quotes both came back is a sample for the template
+        simulated = None
+        sell_result, sell_error = sold.get(n, (None, None))
+        eth_back = self._quote(item, sell_result)
+        if item["verdict"] is not None:
+            honeypot, source = item["verdict"], "template"
+            self.templates.skipped("simulate_trade")
+        elif eth_back is not None:
+            simulated = honeypot = eth_back / TEST_AMOUNT < HONEYPOT_RATIO
+            source = "simulation"
+        elif _rpc_failed(errors.get(("buy", n))) or _rpc_failed(sell_error):
+            # the RPC failed: unknown, as simulate_trade returns
+            honeypot = source = None
+        else:
+            # reverted or unquotable: default to caution, as simulate_trade does
+            honeypot, source = True, "caution"
+
+        # like get_owner: None when the token has no (callable) owner(), unknown when the RPC failed
+        has_owner = renounced = owner = None
+        if not _rpc_failed(errors.get(("owner", n))):
+            decoded = _decode(["address"], answers.get(("owner", n)))
+            owner = decoded[0] if decoded else None
+            has_owner = owner is not None
+            renounced = owner_renounced(owner)
+        template = item["template"]
+        scan = template.get("scan") if template else None
+        if scan is None and item["code"]:
+            scan = scan_bytecode(item["code"])
+        if self.templates is not None:
+            self.templates.record(item["code_hash"], len(item["code"]), has_owner=has_owner,
+                                  honeypot=simulated,
+                                  extra={"scan": scan} if scan and not (template and template.get("scan")) else None)
+
+        return {
+            "input": item["input"],
+            "target_token": target,
+            "token0": dict(metadata[item["token0"].lower()]),
+            "token1": dict(metadata[item["token1"].lower()]),
+            "pair": item["pair"],
+            "chain_id": chain_id,
+            "is_weth_pair": self.weth.lower() in (item["token0"].lower(), item["token1"].lower()),
+            "dex": factory.name,
+            "protocol": factory.protocol,
+            "fee": item["fee"],
+            "code_hash": item.get("code_hash"),
+            "bytecode_risk": scan,
+            "honeypot": honeypot,
+            "honeypot_source": source,
+            "template_verdict": item["verdict"] is not None,
+            "ownership_renounced": renounced,
+            "liquidity_eth": liquidity,
+            "analysis_level": "full",
+        }
+
+
+_slots: Optional[threading.BoundedSemaphore] = None
+_slots_lock = threading.Lock()
+
+
+def _global_slots() -> threading.BoundedSemaphore:
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(int(os.getenv("ANALYZE_GLOBAL_CONCURRENCY", "4")))
+    return _slots
+
+
+def _run_chunk(analyzer: BulkAnalyzer, chunk: List[str]) -> List[Dict[str, Any]]:
+    with _global_slots():
+        try:
+            return analyzer.analyze(chunk)
+        except Exception as e:
+            print(f"Bulk analysis of {len(chunk)} addresses failed: {e}")
+            return [{"input": a, "chain_id": analyzer.chain.chain_id, "error": str(e)} for a in chunk]
+
+
+def stream_analysis(analyzer: BulkAnalyzer, addresses: List[str], cache: Optional[ResultCache] = None,
+                    concurrency: int = 2, batch_size: int = 25) -> Iterator[Dict[str, Any]]:
+    """Yield one result per distinct address: cached ones first, then each chunk as it completes."""
+    chain_id = analyzer.chain.chain_id
+    todo, seen = [], set()
+    for a in addresses:
+        if a.lower() in seen:
+            continue
+        seen.add(a.lower())
+        hit = cache.get(chain_id, a) if cache is not None else None
+        if hit is not None:
+            _RESULTS.labels("cached").inc()
+            yield dict(hit, input=a, cached=True)
+        else:
+            todo.append(a)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="bulk-analyze")
+    try:
+        futures = [pool.submit(_run_chunk, analyzer, todo[i:i + batch_size])
+                   for i in range(0, len(todo), batch_size)]
+        for future in as_completed(futures):
+            for result in future.result():
+                if "error" in result:
+                    _RESULTS.labels("error").inc()
+                else:
+                    _RESULTS.labels("analyzed").inc()
+                    # a check whose RPC failed (None) is asked again next time
+                    if cache is not None and result.get("honeypot") is not None \
+                            and result.get("ownership_renounced") is not None:
+                        cache.put(chain_id, result["input"], result)
+                yield dict(result, cached=False)
+    finally:
+        # the client went away: don't start the chunks still waiting
+        pool.shutdown(wait=False, cancel_futures=True)
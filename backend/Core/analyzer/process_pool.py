@@ -0,0 +1,121 @@
+"""Run TokenAnalyzer in worker processes so analysis isn't bound to one core.
+
+ABI encoding/decoding and address checksumming in web3.py are CPU-bound, so
+with the GIL the analysis threads share a single core. `ProcessAnalysisPool`
+ships `AnalysisJob`s (and recheck entries) to a spawn-based process pool;
+each worker builds its own web3 connection, token-metadata cache and
+bytecode template cache once in its initializer, and returns a picklable
+`AnalysisOutcome` that the parent persists as before.
+
+The RPC rate budget (RPC_RATE_LIMIT and the RPC_RATE_<CLASS> overrides) is
+split evenly across the workers and the parent, which keeps `parent_share`
+for the listener, reserve reads and recheck writes, so all processes together
+stay within the same limit as the threads did.
+"""
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, NamedTuple, Optional
+
+# per-process state built by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+class AnalysisOutcome(NamedTuple):
+    result: Dict[str, Any]
+    target_token: Optional[str]
+    elapsed: float
+    pid: int
+
+
+def _init_worker(provider_url: str, router: str, public_address: str, rate_share: Optional[float],
+                 chain: Optional[str] = None, fraction: float = 1.0):
+    if rate_share is not None:
+        os.environ["RPC_RATE_LIMIT"] = str(rate_share)
+        from backend.Core.rate_limit import CLASS_NAMES
+        for name in CLASS_NAMES:
+            value = os.getenv(f"RPC_RATE_{name.upper()}")
+            if value:
+                os.environ[f"RPC_RATE_{name.upper()}"] = str(float(value) * fraction)
+    from backend.Core.chains import get_chain
+    from backend.Core.providers import make_web3
+    # a worker serves one chain, so the process-wide limiter is already that chain's
+    _worker["web3"] = make_web3(provider_url)
+    _worker["chain"] = get_chain(chain)
+    _worker["router"] = router
+    _worker["public_address"] = public_address
+    _worker["templates"] = None
+    if os.getenv("CODE_TEMPLATES", "1") != "0":
+        from backend.Core.code_templates import TemplateCache
+        collection = None
+        mongo_uri = os.getenv("MONGO_URI")
+        if mongo_uri:
+            try:
+                from pymongo import MongoClient
+                client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
+                collection = client[os.getenv("MONGO_DB", "eth_bot_db")][_worker["chain"].collection("code_templates")]
+            except Exception as e:
+                print(f"Analysis worker {os.getpid()}: no Mongo for code templates: {e}")
+        _worker["templates"] = TemplateCache(collection, min_samples=int(os.getenv("CODE_TEMPLATE_MIN_SAMPLES", "3")))
+
+
+def _analyzer(item, block=None):
+    from backend.Core.analyzer.token_analyzer import TokenAnalyzer
+    return TokenAnalyzer(_worker["web3"], item.token0, item.token1, item.pair, _worker["router"],
+                         _worker["public_address"], templates=_worker["templates"], dex=item.dex, fee=item.fee,
+                         chain=_worker["chain"], block_identifier=block)
+
+
+def _analyze(job, lite: bool, block: Optional[int] = None) -> AnalysisOutcome:
+    start = time.perf_counter()
+    analyzer = _analyzer(job, block)
+    # the reserve read at ingest is only reusable if it was read at the same block
+    liquidity = job.liquidity_eth if block is None or block == job.block_number else None
+    result = analyzer.analyze(lite=lite, liquidity_eth=liquidity)
+    return AnalysisOutcome(result, analyzer.get_target_token(), time.perf_counter() - start, os.getpid())
+
+
+def _recheck(entry) -> Dict[str, Any]:
+    return _analyzer(entry).recheck()
+
+
+def _warm_up(_):
+    return os.getpid()
+
+
+class ProcessAnalysisPool:
+    def __init__(self, processes: int, provider_url: str, router: str, public_address: str,
+                 rate_limit: Optional[float] = None, chain: Optional[str] = None):
+        self.processes = max(1, int(processes))
+        if rate_limit is None:
+            rate = os.getenv("RPC_RATE_LIMIT", "100")
+            if chain:
+                rate = os.getenv(f"RPC_RATE_LIMIT_{chain.upper()}", rate)
+            rate_limit = float(rate)
+        # the parent process counts as one more share of the budget
+        self.parent_share = 1.0 / (self.processes + 1)
+        rate_share = rate_limit * self.parent_share if rate_limit else None
+        # spawn: forking a process that already runs listener/limiter threads is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(provider_url, router, public_address, rate_share, chain, self.parent_share),
+        )
+
+    def warm_up(self):
+        """Start every worker now instead of on the first jobs."""
+        list(self._executor.map(_warm_up, range(self.processes)))
+        return self
+
+    def analyze(self, job, lite: bool = False, block: Optional[int] = None):
+        """Future of the job's AnalysisOutcome."""
+        return self._executor.submit(_analyze, job, lite, block)
+
+    def recheck(self, entry):
+        """Future of the entry's recheck results."""
+        return self._executor.submit(_recheck, entry)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
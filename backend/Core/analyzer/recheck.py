@@ -0,0 +1,280 @@
+"""Periodic re-analysis of tokens after pair creation (rug detection).
+
+Every persisted token is re-checked at a fixed ladder of ages (RECHECK_INTERVALS,
+default 1m, 5m, 30m, 2h). Pending rechecks live in a hierarchical timing wheel,
+so scheduling and expiring one costs O(1) however many are pending. Results
+are handed to a writer in batches, and state changes between two checks
+(liquidity pulled, sell path turned into a honeypot, ownership reclaimed) are
+reported as alerts. A check whose RPC failed comes back as None: it is
+neither compared nor written, and the last known value stands.
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend import metrics
+
+DEFAULT_INTERVALS = (60, 300, 1800, 7200)
+CHECKED_FIELDS = ("liquidity_eth", "honeypot", "ownership_renounced")
+
+_PENDING = metrics.REGISTRY.gauge("ethbot_recheck_pending", "Token rechecks waiting in the timing wheel")
+_RECHECKS = metrics.REGISTRY.counter("ethbot_rechecks_total", "Token rechecks run by outcome", ["outcome"])
+_TRANSITIONS = metrics.REGISTRY.counter(
+    "ethbot_recheck_transitions_total", "Risk transitions detected on recheck", ["kind"])
+
+
+def parse_intervals(value: Optional[str]) -> Tuple[int, ...]:
+    """'1m,5m,30m,2h' or '60,300' -> seconds, ascending."""
+    if not value:
+        return DEFAULT_INTERVALS
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    out = []
+    for part in value.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if part[-1] in units:
+            out.append(int(float(part[:-1]) * units[part[-1]]))
+        else:
+            out.append(int(float(part)))
+    return tuple(sorted(set(out))) or DEFAULT_INTERVALS
+
+
+class TimingWheel:
+    """Hierarchical timing wheel (Varghese & Lauck).
+
+    Level 0 has `slots` buckets of one tick each, level 1 buckets span `slots`
+    ticks, level 2 `slots**2` ticks, and so on. An item goes into the coarsest
+    level its delay needs; when a lower level wraps around, the matching
+    bucket of the level above is cascaded down. Insert and expiry are O(1)
+    amortised; delays past the top level are parked there and re-cascaded.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 64, levels: int = 4, start: Optional[float] = None):
+        self.tick = float(tick)
+        self.slots = int(slots)
+        self.levels = int(levels)
+        self.start = time.time() if start is None else start
+        self.current = 0
+        self._wheels: List[List[List[Tuple[int, Any]]]] = [[[] for _ in range(self.slots)] for _ in range(self.levels)]
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _insert(self, expire: int, item: Any):
+        diff = expire - self.current
+        span = self.slots
+        for level in range(self.levels):
+            if diff < span or level == self.levels - 1:
+                slot = (expire // (span // self.slots)) % self.slots
+                self._wheels[level][slot].append((expire, item))
+                return
+            span *= self.slots
+
+    def schedule_at(self, when: float, item: Any):
+        with self._lock:
+            # never schedule into a bucket that has already been processed
+            self._insert(max(int((when - self.start) / self.tick), self.current + 1), item)
+            self._size += 1
+
+    def schedule(self, delay: float, item: Any):
+        self.schedule_at(time.time() + delay, item)
+
+    def _step(self, due: List[Any]):
+        self.current += 1
+        # cascade every level whose lower neighbour just wrapped around
+        cascaded: List[Tuple[int, Any]] = []
+        span = self.slots
+        for level in range(1, self.levels):
+            if self.current % span:
+                break
+            slot = (self.current // span) % self.slots
+            cascaded.extend(self._wheels[level][slot])
+            self._wheels[level][slot] = []
+            span *= self.slots
+        for expire, item in cascaded:
+            self._insert(expire, item)
+        bucket = self._wheels[0][self.current % self.slots]
+        if bucket:
+            self._wheels[0][self.current % self.slots] = []
+            for expire, item in bucket:
+                if expire <= self.current:
+                    due.append(item)
+                    self._size -= 1
+                else:
+                    self._insert(expire, item)
+
+    def advance(self, now: Optional[float] = None) -> List[Any]:
+        """Move the wheel to `now` and return the items that expired."""
+        target = int(((time.time() if now is None else now) - self.start) / self.tick)
+        due: List[Any] = []
+        with self._lock:
+            while self.current < target:
+                self._step(due)
+        return due
+
+
+class RecheckEntry:
+    __slots__ = ("tx_hash", "log_index", "address", "pair", "token0", "token1", "created_at", "stage",
+                 "liquidity_eth", "honeypot", "ownership_renounced", "dex", "fee")
+
+    def __init__(self, tx_hash: str, log_index: int, address: str, pair: str, token0: str, token1: str,
+                 created_at: float, liquidity_eth: float = 0.0, honeypot: Optional[bool] = None,
+                 ownership_renounced: Optional[bool] = None, stage: int = 0, dex: Optional[str] = None,
+                 fee: Optional[int] = None):
+        self.tx_hash = tx_hash
+        self.log_index = log_index
+        self.address = address
+        self.pair = pair
+        self.token0 = token0
+        self.token1 = token1
+        self.created_at = created_at
+        self.stage = stage
+        self.liquidity_eth = liquidity_eth
+        self.honeypot = honeypot
+        self.ownership_renounced = ownership_renounced
+        self.dex = dex
+        self.fee = fee
+
+    @classmethod
+    def from_token_info(cls, info: Dict[str, Any]) -> "RecheckEntry":
+        return cls(
+            info["tx_hash"], info["log_index"], str(info.get("address", "")), str(info.get("pair_address", "")),
+            str((info.get("token0_info") or {}).get("address", "")),
+            str((info.get("token1_info") or {}).get("address", "")),
+            float(info.get("timestamp") or time.time()),
+            liquidity_eth=float(info.get("liquidity_eth", 0.0) or 0.0),
+            honeypot=info.get("honeypot"),
+            ownership_renounced=info.get("ownership_renounced"),
+            dex=info.get("dex"),
+            fee=info.get("fee"),
+        )
+
+
+def detect_transitions(entry: RecheckEntry, result: Dict[str, Any], liquidity_drop: float = 0.5) -> List[Tuple[str, str]]:
+    """Compare a recheck against the last known state: [(kind, message), ...].
+
+    Checks that failed (None) are skipped."""
+    out = []
+    name = entry.address
+    before = entry.liquidity_eth or 0.0
+    after = result.get("liquidity_eth")
+    if after is not None and before > 0 and float(after) < before * (1.0 - liquidity_drop):
+        out.append(("liquidity_pulled", f"Liquidity pulled on {name}: {before:.4f} -> {after:.4f} ETH"))
+    if entry.honeypot is False and result.get("honeypot") is True:
+        out.append(("honeypot", f"{name} turned into a honeypot (sell simulation now fails)"))
+    if entry.ownership_renounced is True and result.get("ownership_renounced") is False:
+        out.append(("ownership_reclaimed", f"Ownership of {name} is no longer renounced"))
+    return out
+
+
+class RecheckScheduler:
+    def __init__(self, check: Callable[[RecheckEntry], Dict[str, Any]],
+                 write: Callable[[List[Tuple[RecheckEntry, Dict[str, Any]]]], None],
+                 alert: Callable[[str], None], intervals: Sequence[int] = DEFAULT_INTERVALS,
+                 workers: int = 4, batch_size: int = 200, flush_interval: float = 5.0,
+                 liquidity_drop: float = 0.5, tick: float = 1.0):
+        self.check = check
+        self.write = write
+        self.alert = alert
+        self.intervals = tuple(intervals)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.liquidity_drop = liquidity_drop
+        self.wheel = TimingWheel(tick=tick)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="recheck")
+        self._batch: List[Tuple[RecheckEntry, Dict[str, Any]]] = []
+        self._batch_lock = threading.Lock()
+        self._last_flush = time.time()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, check, write, alert) -> "RecheckScheduler":
+        return cls(check, write, alert,
+                   intervals=parse_intervals(os.getenv("RECHECK_INTERVALS")),
+                   workers=int(os.getenv("RECHECK_WORKERS", "4")),
+                   batch_size=int(os.getenv("RECHECK_BATCH_SIZE", "200")),
+                   liquidity_drop=float(os.getenv("RECHECK_LIQUIDITY_DROP", "0.5")))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="recheck-wheel")
+        self._thread.start()
+        return self
+
+    def schedule(self, entry: RecheckEntry) -> bool:
+        """Queue the entry's next recheck (by age since creation); False once past the last interval."""
+        if entry.stage >= len(self.intervals):
+            return False
+        self.wheel.schedule_at(entry.created_at + self.intervals[entry.stage], entry)
+        _PENDING.set(len(self.wheel))
+        return True
+
+    def resume(self, entry: RecheckEntry, now: Optional[float] = None) -> bool:
+        """Re-queue an entry loaded after a restart, skipping intervals that already passed."""
+        age = (time.time() if now is None else now) - entry.created_at
+        while entry.stage < len(self.intervals) and self.intervals[entry.stage] <= age:
+            entry.stage += 1
+        return self.schedule(entry)
+
+    def pending(self) -> int:
+        return len(self.wheel)
+
+    def _run(self):
+        while True:
+            time.sleep(self.wheel.tick)
+            try:
+                for entry in self.wheel.advance():
+                    self._executor.submit(self._recheck, entry)
+                _PENDING.set(len(self.wheel))
+                if time.time() - self._last_flush >= self.flush_interval:
+                    self.flush()
+            except Exception as e:
+                print(f"Recheck scheduler error: {e}")
+
+    def _recheck(self, entry: RecheckEntry):
+        try:
+            result = self.check(entry)
+        except Exception as e:
+            print(f"Recheck failed for {entry.address}: {e}")
+            _RECHECKS.labels("error").inc()
+            result = None
+        failed = [f for f in CHECKED_FIELDS if not result or result.get(f) is None]
+        if result and len(failed) == len(CHECKED_FIELDS):
+            print(f"Recheck failed for {entry.address}: every check's RPC failed")
+            _RECHECKS.labels("error").inc()
+            result = None
+        if result:
+            _RECHECKS.labels("partial" if failed else "ok").inc()
+            for kind, message in detect_transitions(entry, result, self.liquidity_drop):
+                _TRANSITIONS.labels(kind).inc()
+                self.alert(message)
+            # only what was actually checked replaces the last known state
+            result = {k: v for k, v in result.items() if k not in failed}
+            if "liquidity_eth" in result:
+                entry.liquidity_eth = float(result["liquidity_eth"])
+            if "honeypot" in result:
+                entry.honeypot = result["honeypot"]
+            if "ownership_renounced" in result:
+                entry.ownership_renounced = result["ownership_renounced"]
+            with self._batch_lock:
+                self._batch.append((entry, dict(result, recheck_stage=entry.stage)))
+                full = len(self._batch) >= self.batch_size
+            if full:
+                self.flush()
+        entry.stage += 1
+        self.schedule(entry)
+
+    def flush(self):
+        with self._batch_lock:
+            batch, self._batch = self._batch, []
+            self._last_flush = time.time()
+        if not batch:
+            return
+        try:
+            self.write(batch)
+        except Exception as e:
+            print(f"Failed to write {len(batch)} recheck results: {e}")
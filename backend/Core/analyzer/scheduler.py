@@ -0,0 +1,180 @@
+"""Priority scheduling and load shedding in front of TokenAnalyzer.
+
+The listener turns each PairCreated log into an `AnalysisJob` and submits it
+here; a small pool of worker threads pops jobs in priority order:
+
+  0. pairs created by a watch-listed deployer
+  1. WETH pairs, largest initial WETH reserve first
+  2. everything else (non-WETH pairs, dust liquidity), deferred behind the rest
+
+When the queue backs up past `lite_threshold` (or a job has waited longer
+than `max_wait`), non-watch-listed jobs get a "lite" analysis that skips the
+honeypot simulation; when the handler reports that it stored a row still
+needing a full analysis, the job is remembered and completed once the queue
+drains. Past `max_queue` the lowest-priority jobs are moved straight to that
+deferred list instead of being analysed at all.
+
+The deferred list holds at most `max_deferred` jobs. Shed jobs come first: a
+lite-analysed pair at least has a row (flagged `needs_full_analysis`), a shed
+one has nothing. When the list is full a pending completion is dropped to
+make room for a shed job, and a job with no room left is dropped; either way
+it is counted in ethbot_analysis_dropped_total, never evicted silently.
+"""
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Optional, Tuple
+
+from backend import metrics
+
+FULL = "full"
+LITE = "lite"
+
+_ANALYSES = metrics.REGISTRY.counter(
+    "ethbot_analysis_total", "Pair analyses run by level", ["level"])
+_SHED = metrics.REGISTRY.counter(
+    "ethbot_analysis_shed_total", "Jobs deferred because the analysis queue was full")
+_DROPPED = metrics.REGISTRY.counter(
+    "ethbot_analysis_dropped_total", "Deferred jobs dropped because the deferred list was full", ["kind"])
+_QUEUE_WAIT = metrics.REGISTRY.histogram(
+    "ethbot_analysis_queue_wait_seconds", "Time jobs spend queued before analysis")
+
+
+class AnalysisJob:
+    __slots__ = ("token0", "token1", "pair", "deployer", "tx_hash", "log_index", "block_number",
+                 "watchlisted", "is_weth_pair", "liquidity_eth", "dex", "fee", "chain_id", "enqueued_at")
+
+    def __init__(self, token0: str, token1: str, pair: str, deployer: str, tx_hash: str, log_index: int,
+                 block_number: Optional[int] = None, watchlisted: bool = False, is_weth_pair: bool = False,
+                 liquidity_eth: Optional[float] = None, dex: Optional[str] = None, fee: Optional[int] = None,
+                 chain_id: int = 1):
+        self.token0 = token0
+        self.token1 = token1
+        self.pair = pair
+        self.deployer = deployer
+        self.tx_hash = tx_hash
+        self.log_index = log_index
+        self.block_number = block_number
+        self.watchlisted = watchlisted
+        self.is_weth_pair = is_weth_pair
+        self.liquidity_eth = liquidity_eth
+        self.dex = dex
+        self.fee = fee
+        self.chain_id = chain_id
+        self.enqueued_at = time.time()
+
+    def priority(self, dust_eth: float) -> Tuple[int, float]:
+        if self.watchlisted:
+            return 0, 0.0
+        liquidity = self.liquidity_eth or 0.0
+        if self.is_weth_pair and liquidity >= dust_eth:
+            return 1, -liquidity
+        return 2, -liquidity
+
+
+class AnalysisScheduler:
+    def __init__(self, handler: Callable[[AnalysisJob, str], bool],
+                 complete: Optional[Callable[[AnalysisJob], None]] = None, workers: int = 4,
+                 lite_threshold: int = 50, max_queue: int = 5000, max_wait: float = 30.0,
+                 dust_eth: float = 0.1, max_deferred: int = 10000):
+        # returns whether it persisted a row that still needs a full analysis
+        self.handler = handler
+        # completes a job that was persisted from a lite analysis; without it, re-run in full
+        self.complete = complete
+        self.workers = max(1, int(workers))
+        self.lite_threshold = lite_threshold
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.dust_eth = dust_eth
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        # waiting for a full analysis when the queue is idle: shed jobs never persisted,
+        # and lite-analysed jobs waiting for their completion
+        self.max_deferred = max(1, int(max_deferred))
+        self._shed_jobs: deque = deque()
+        self._completions: deque = deque()
+        self._threads = []
+        self._depth = metrics.QUEUE_DEPTH.labels("analysis")
+        self._deferred_depth = metrics.QUEUE_DEPTH.labels("analysis_deferred")
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, daemon=True, name=f"analysis-worker-{i}")
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def submit(self, job: AnalysisJob):
+        with self._cond:
+            tier, key = job.priority(self.dust_eth)
+            heapq.heappush(self._heap, (tier, key, next(self._seq), job))
+            if len(self._heap) > self.max_queue:
+                self._shed()
+            self._depth.set(len(self._heap))
+            self._cond.notify()
+
+    def _shed(self):
+        # drop the lowest-priority job into the deferred list (O(n), only under overload)
+        worst = max(range(len(self._heap)), key=lambda i: self._heap[i][:3])
+        entry = self._heap[worst]
+        self._heap[worst] = self._heap[-1]
+        self._heap.pop()
+        heapq.heapify(self._heap)
+        self._defer(entry[3], persisted=False)
+        _SHED.inc()
+
+    def _defer(self, job: AnalysisJob, persisted: bool):
+        # caller holds self._cond
+        if self.deferred() >= self.max_deferred:
+            if not persisted and self._completions:
+                # the dropped completion's row stays lite (needs_full_analysis) but exists
+                self._completions.popleft()
+                _DROPPED.labels("completion").inc()
+            else:
+                _DROPPED.labels("completion" if persisted else "shed").inc()
+                print(f"Deferred analysis list full, dropping {'completion of ' if persisted else ''}{job.pair}")
+                return
+        (self._completions if persisted else self._shed_jobs).append(job)
+        self._deferred_depth.set(self.deferred())
+
+    def depth(self) -> int:
+        return len(self._heap)
+
+    def deferred(self) -> int:
+        return len(self._shed_jobs) + len(self._completions)
+
+    def _next(self):
+        with self._cond:
+            while not self._heap and not self._shed_jobs and not self._completions:
+                self._cond.wait()
+            if self._heap:
+                _, _, _, job = heapq.heappop(self._heap)
+                backlog = len(self._heap)
+                self._depth.set(backlog)
+                overloaded = backlog >= self.lite_threshold or time.time() - job.enqueued_at > self.max_wait
+                level = LITE if overloaded and not job.watchlisted else FULL
+                return job, level, False
+            persisted = not self._shed_jobs
+            job = (self._completions if persisted else self._shed_jobs).popleft()
+            self._deferred_depth.set(self.deferred())
+            return job, FULL, persisted
+
+    def _run(self):
+        while True:
+            job, level, completing = self._next()
+            try:
+                if completing and self.complete is not None:
+                    self.complete(job)
+                    _ANALYSES.labels("completion").inc()
+                    continue
+                _QUEUE_WAIT.observe(time.time() - job.enqueued_at)
+                needs_completion = self.handler(job, level)
+                _ANALYSES.labels(level).inc()
+                if level == LITE and needs_completion:
+                    with self._cond:
+                        self._defer(job, persisted=True)
+            except Exception as e:
+                print(f"Analysis worker failed for {job.pair}: {e}")
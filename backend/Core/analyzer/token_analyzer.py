@@ -1,58 +1,175 @@
 from backend.Core.token_info import get_token_info
-from backend.Core.checks.liquidity import check_liquidity
-from backend.Core.checks.honeypot_check import simulate_trade
-from backend.Core.checks.ownership_check import is_renounced
+from backend.Core.checks.liquidity import check_liquidity, check_liquidity_v3
+from backend.Core.checks.honeypot_check import (quote_round_trip, quote_round_trip_v3, ratio_verdict,
+                                                failure_verdict)
+from backend.Core.checks.ownership_check import is_renounced, get_owner, owner_renounced
+from backend.Core.checks.bytecode_scan import scan_bytecode
+from backend.Core.code_templates import code_hash as hash_code
+from backend.Core.chains import get_chain
+from backend.metrics import stage_timer
 
-import json
-import os
 
-with open("resources/config.json") as f:
-    config = json.load(f)
-    WETH = config["WETH"]
 class TokenAnalyzer:
-    def __init__(self, web3, token0, token1, pair, router, public_address):
+    def __init__(self, web3, token0, token1, pair, router, public_address, templates=None, dex=None, fee=None,
+                 chain=None, block_identifier=None):
         self.web3 = web3
         self.token0 = token0
         self.token1 = token1
         self.pair = pair
         self.router = router
         self.public_address = public_address
+        # optional backend.Core.code_templates.TemplateCache shared across analyzers
+        self.templates = templates
+        # chain profile (name or ChainProfile, default mainnet) supplies WETH and the factories
+        self.chain = get_chain(chain)
+        self.weth = self.chain.weth
+        # factory registry entry the pair came from; decides router/quoter and liquidity reads
+        self.factory = self.chain.registry.get(dex)
+        self.protocol = self.factory.protocol if self.factory else "v2"
+        if self.factory and self.factory.router:
+            self.router = self.factory.router
+        self.fee = fee
+        # block every check of analyze() reads (the creation log's, usually); None is "latest"
+        self.block = block_identifier if block_identifier is not None else "latest"
 
     def is_weth_pair(self):
-        return self.token0.lower() == WETH.lower() or self.token1.lower() == WETH.lower()
+        return self.token0.lower() == self.weth.lower() or self.token1.lower() == self.weth.lower()
 
     def get_target_token(self):
-        return self.token0 if self.token1.lower() == WETH.lower() else self.token1
+        return self.token0 if self.token1.lower() == self.weth.lower() else self.token1
 
-    def analyze(self):
+    def simulate_trade(self, target_token):
+        """(honeypot, sampled): the verdict (None when the RPC failed) and whether both
+        quotes came back, i.e. whether it says something about the token's code."""
+        try:
+            if self.protocol == "v3":
+                ratio = quote_round_trip_v3(self.web3, target_token, self.factory.quoter, self.weth, self.fee,
+                                            self.block)
+                return ratio_verdict(ratio, f" (V3, fee {self.fee})"), True
+            ratio = quote_round_trip(self.web3, target_token, self.router, self.weth, self.block)
+            return ratio_verdict(ratio), True
+        except Exception as e:
+            return failure_verdict(e), False
+
+    def check_liquidity(self):
+        if self.protocol == "v3":
+            return check_liquidity_v3(self.web3, self.pair, self.weth, self.block)
+        return check_liquidity(self.web3, self.pair, self.token0, self.token1, self.weth, self.block)
+
+    def analyze(self, lite=False, liquidity_eth=None):
+        """Run the checks for this pair.
+
+        `lite=True` skips the honeypot simulation (the scheduler uses it under
+        load); `liquidity_eth` reuses a reserve the caller already fetched.
+        The runtime bytecode is scanned for risky selectors/opcodes; with a
+        template cache, clones of a known template reuse its scan and honeypot
+        verdict and skip owner() when the template has none. A check whose
+        RPC failed is None ("unknown") and teaches the template nothing.
+        `honeypot_source` is "simulation" (both quotes came back),
+        "template", "caution" (a quote reverted) or None.
+
+        Code, owner, reserves and quotes are all read at `block_identifier`,
+        so they describe one state; pinned calls are cacheable
+        (backend.Core.call_cache).
+        """
         result = {}
 
         # Basic token info
-        token0_info = get_token_info(self.web3, self.token0)
-        token1_info = get_token_info(self.web3, self.token1)
+        with stage_timer("get_token_info"):
+            token0_info = get_token_info(self.web3, self.token0, self.chain.chain_id, self.block)
+        with stage_timer("get_token_info"):
+            token1_info = get_token_info(self.web3, self.token1, self.chain.chain_id, self.block)
 
         result["token0"] = token0_info
         result["token1"] = token1_info
         result["pair"] = self.pair
+        result["chain_id"] = self.chain.chain_id
         result["is_weth_pair"] = self.is_weth_pair()
+        result["dex"] = self.factory.name if self.factory else None
+        result["protocol"] = self.protocol
+        result["block_number"] = self.block if isinstance(self.block, int) else None
 
         # Determine target token
         target_token = self.get_target_token()
 
-        # Honeypot check
-        result["honeypot"] = simulate_trade(
-            self.web3, target_token, self.router, WETH, self.public_address
-        )
+        # Runtime bytecode: template lookup and static risk scan
+        code, code_hash, template = b"", None, None
+        try:
+            with stage_timer("get_code"):
+                code = bytes(self.web3.eth.get_code(target_token, self.block))
+        except Exception as e:
+            print(f"Could not fetch code for {target_token}: {e}")
+        if self.templates is not None:
+            code_hash = hash_code(code)
+            template = self.templates.lookup(code_hash)
+            result["code_hash"] = code_hash
+        scan = template.get("scan") if template else None
+        if scan is None and code:
+            with stage_timer("bytecode_scan"):
+                scan = scan_bytecode(code)
+        result["bytecode_risk"] = scan
+        verdict = self.templates.honeypot_verdict(template) if template else None
+
+        # Honeypot check; honeypot_source says how the verdict was reached
+        simulated = None
+        if verdict is not None:
+            result["honeypot"] = verdict
+            result["honeypot_source"] = "template"
+            result["template_verdict"] = True
+            self.templates.skipped("simulate_trade")
+        elif lite:
+            result["honeypot"] = result["honeypot_source"] = None
+        else:
+            with stage_timer("simulate_trade"):
+                result["honeypot"], sampled = self.simulate_trade(target_token)
+            # a reverted quote says more about the pool's state than about the code
+            simulated = result["honeypot"] if sampled else None
+            result["honeypot_source"] = "simulation" if sampled else ("caution" if result["honeypot"] else None)
 
         # Ownership check
-        result["ownership_renounced"] = is_renounced(self.web3, target_token)
+        has_owner = None
+        if template and template.get("has_owner") is False:
+            result["ownership_renounced"] = False
+            self.templates.skipped("is_renounced")
+        else:
+            with stage_timer("is_renounced"):
+                try:
+                    owner = get_owner(self.web3, target_token, self.block)
+                except Exception as e:
+                    print(f" Could not check ownership for {target_token}: {e}")
+                    result["ownership_renounced"] = None
+                else:
+                    result["ownership_renounced"] = owner_renounced(owner)
+                    has_owner = owner is not None
+
+        if self.templates is not None:
+            self.templates.record(code_hash, len(code), has_owner=has_owner, honeypot=simulated,
+                                  extra={"scan": scan} if scan and not (template and template.get("scan")) else None)
 
         # Liquidity check
-        result["liquidity_eth"] = check_liquidity(
-            self.web3, self.pair, self.token0, self.token1, WETH
-        )
+        if liquidity_eth is not None:
+            result["liquidity_eth"] = liquidity_eth
+        else:
+            with stage_timer("check_liquidity"):
+                result["liquidity_eth"] = self.check_liquidity()
+        result["analysis_level"] = "lite" if lite else "full"
 
         # Log to file
 
 
-        return result
\ No newline at end of file
+        return result
+
+    def recheck(self):
+        """Re-run only the checks that can change after launch (no token metadata);
+        a check whose RPC failed is None.
+
+        Reads `block_identifier` like analyze(); rechecks leave it at "latest"."""
+        target_token = self.get_target_token()
+        result = {}
+        with stage_timer("simulate_trade"):
+            result["honeypot"], _ = self.simulate_trade(target_token)
+        with stage_timer("is_renounced"):
+            result["ownership_renounced"] = is_renounced(self.web3, target_token, self.block)
+        with stage_timer("check_liquidity"):
+            result["liquidity_eth"] = self.check_liquidity()
+        return result
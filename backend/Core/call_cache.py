@@ -0,0 +1,150 @@
+"""Cache of block-pinned eth_call / eth_getCode results, with in-flight coalescing.
+
+A call pinned to a block number returns the same thing forever, so its
+response is cached under (method, contract, calldata, block) (the whole
+params, normalised). Identical pinned calls made while one is in flight wait
+for that one instead of going out again, e.g. two analyses of the same token
+in the same block. Calls against "latest" and other tags pass through.
+
+Only successful responses are cached; waiters of a failed call get its error.
+One cache per chain (`get_call_cache(chain)`), shared by every web3 instance
+built by backend.Core.providers.make_web3 and by BatchCaller; CALL_CACHE_SIZE
+entries (0 disables it).
+"""
+import os
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from web3.middleware import Web3Middleware
+except Exception:
+    Web3Middleware = object
+
+from backend import metrics
+
+CACHED_METHODS = {"eth_call": 1, "eth_getCode": 1}    # method -> index of the block parameter
+
+_LOOKUPS = metrics.REGISTRY.counter(
+    "ethbot_call_cache_total", "Block-pinned calls by cache outcome", ["outcome"])
+_SIZE = metrics.REGISTRY.gauge("ethbot_call_cache_entries", "Entries in the block-pinned call cache", ["chain"])
+
+
+def pinned_block(block: Any) -> Optional[int]:
+    """The block number a block parameter pins, or None for tags ("latest", ...)."""
+    if isinstance(block, int):
+        return block
+    if isinstance(block, str) and block.startswith("0x"):
+        try:
+            return int(block, 16)
+        except ValueError:
+            return None
+    return None
+
+
+def cache_key(method: str, params: Any) -> Optional[Tuple[str, str]]:
+    index = CACHED_METHODS.get(method)
+    if index is None or not isinstance(params, (list, tuple)) or len(params) <= index:
+        return None
+    if pinned_block(params[index]) is None:
+        return None
+    normalised = list(params)
+    normalised[index] = pinned_block(params[index])
+    # addresses and calldata are hex, so case doesn't matter
+    return method, json.dumps(normalised, sort_keys=True, default=str).lower()
+
+
+class CallCache:
+    def __init__(self, maxsize: int = 50000, name: str = ""):
+        self.maxsize = maxsize
+        self.name = name or "default"
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        metrics.REGISTRY.add_collector(self._export_metrics)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def claim(self, key: tuple) -> Tuple[str, Any]:
+        """("hit", response), ("wait", future of the call in flight) or ("own", future to resolve)."""
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+                _LOOKUPS.labels("hit").inc()
+                return "hit", response
+            future = self._inflight.get(key)
+            if future is not None:
+                _LOOKUPS.labels("coalesced").inc()
+                return "wait", future
+            future = self._inflight[key] = Future()
+            _LOOKUPS.labels("miss").inc()
+            return "own", future
+
+    def finish(self, key: tuple, future: Future, response: Dict[str, Any]):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if isinstance(response, dict) and response.get("error") is None and "result" in response:
+                self._entries[key] = response
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        future.set_result(response)
+
+    def fail(self, key: tuple, future: Future, error: BaseException):
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_exception(error)
+
+    def fetch(self, method: str, params: Any, send: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """`send()`'s response, from the cache or a call in flight when the params pin a block."""
+        key = cache_key(method, params)
+        if key is None:
+            return send()
+        state, value = self.claim(key)
+        if state == "hit":
+            return value
+        if state == "wait":
+            return value.result()
+        try:
+            response = send()
+        except BaseException as e:
+            self.fail(key, value, e)
+            raise
+        self.finish(key, value, response)
+        return response
+
+    def middleware(self):
+        """A Web3Middleware class answering pinned calls through this cache."""
+        cache = self
+
+        class CallCacheMiddleware(Web3Middleware):
+            def wrap_make_request(self, make_request):
+                def middleware(method, params):
+                    return cache.fetch(method, params, lambda: make_request(method, params))
+
+                return middleware
+
+        return CallCacheMiddleware
+
+    def _export_metrics(self):
+        _SIZE.labels(self.name).set(len(self._entries))
+
+
+_caches: Dict[str, CallCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_call_cache(chain: Optional[str] = None) -> Optional[CallCache]:
+    """The process-wide cache of `chain` (None: the default chain), or None when disabled."""
+    size = int(os.getenv("CALL_CACHE_SIZE", "50000"))
+    if size <= 0:
+        return None
+    name = chain or ""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = CallCache(size, name=chain or "default")
+        return cache
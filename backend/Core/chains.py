@@ -0,0 +1,88 @@
+"""Per-chain configuration profiles.
+
+The top-level keys of `resources/config.json` (WETH, UNISWAP_*, FACTORIES)
+describe the default chain, Ethereum mainnet. Other chains are profiles under
+"CHAINS", each with its own CHAIN_ID, wrapped native token (WETH) and
+FACTORIES:
+
+    "CHAINS": {"base": {"CHAIN_ID": 8453, "WETH": "0x...", "FACTORIES": [...]}}
+
+A profile's RPC endpoint comes from WEB3_PROVIDER_<NAME> (e.g.
+WEB3_PROVIDER_BASE, comma-separated for a pool); the default chain keeps
+using WEB3_PROVIDERS / WEB3_PROVIDER. CHAINS=ethereum,base,... selects the
+chains the listener supervisor runs (default: the default chain only).
+"""
+import os
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from backend.Core.factories import FactoryRegistry
+
+DEFAULT_CHAIN = "ethereum"
+
+
+class ChainProfile:
+    def __init__(self, name: str, chain_id: int, config: Dict[str, Any]):
+        self.name = name
+        self.chain_id = int(chain_id)
+        self.config = config
+        self.weth = config["WETH"]
+        self.router = config.get("UNISWAP_ROUTER")
+        self.registry = FactoryRegistry.from_config(config)
+
+    @property
+    def is_default(self) -> bool:
+        return self.name == DEFAULT_CHAIN
+
+    @property
+    def provider_url(self) -> Optional[str]:
+        if self.is_default:
+            return os.getenv("WEB3_PROVIDERS") or os.getenv("WEB3_PROVIDER")
+        return os.getenv(f"WEB3_PROVIDER_{self.name.upper()}")
+
+    def collection(self, base: str) -> str:
+        """Per-chain Mongo collection for caches that must not mix chains."""
+        return base if self.is_default else f"{base}_{self.name}"
+
+    def __repr__(self):
+        return f"ChainProfile({self.name!r}, chain_id={self.chain_id})"
+
+
+def load_profiles(config: Dict[str, Any]) -> Dict[str, ChainProfile]:
+    base = {k: v for k, v in config.items() if k != "CHAINS"}
+    profiles = {DEFAULT_CHAIN: ChainProfile(DEFAULT_CHAIN, base.get("CHAIN_ID", 1), base)}
+    for name, entry in (config.get("CHAINS") or {}).items():
+        profiles[name] = ChainProfile(name, entry["CHAIN_ID"], entry)
+    return profiles
+
+
+_profiles: Optional[Dict[str, ChainProfile]] = None
+_profiles_lock = threading.Lock()
+
+
+def get_profiles(path: str = "resources/config.json") -> Dict[str, ChainProfile]:
+    """Every configured chain, loaded from the config file on first use."""
+    global _profiles
+    if _profiles is None:
+        with _profiles_lock:
+            if _profiles is None:
+                with open(path) as f:
+                    _profiles = load_profiles(json.load(f))
+    return _profiles
+
+
+def get_chain(chain=None) -> ChainProfile:
+    """Profile by name (or pass-through profile); None is the default chain."""
+    if isinstance(chain, ChainProfile):
+        return chain
+    profiles = get_profiles()
+    name = chain or DEFAULT_CHAIN
+    if name not in profiles:
+        raise ValueError(f"unknown chain {name!r}; configured: {', '.join(profiles)}")
+    return profiles[name]
+
+
+def enabled_chains() -> List[ChainProfile]:
+    names = [n.strip() for n in os.getenv("CHAINS", DEFAULT_CHAIN).split(",") if n.strip()]
+    return [get_chain(n) for n in names]
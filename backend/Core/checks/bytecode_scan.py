@@ -0,0 +1,90 @@
+"""Static risk scan of a token's runtime bytecode.
+
+One linear pass over the code: PUSH immediates are skipped (so data bytes are
+never mistaken for opcodes), every PUSH4 is looked up in a precomputed table
+of risky function selectors (the dispatcher compares calldata against PUSH4
+constants), and DELEGATECALL / CALLCODE / SELFDESTRUCT opcodes are flagged.
+The Solidity CBOR metadata trailer is stripped first.
+
+No RPC calls: callers pass the bytes they already fetched with eth_getCode.
+"""
+from typing import Any, Dict, Union
+
+# keccak(signature)[:4] -> (signature, category); precomputed so the scan needs no hashing
+RISK_SELECTORS = {
+    0x44337ea1: ("addToBlacklist(address)", "blacklist"),
+    0xf9f92be4: ("blacklist(address)", "blacklist"),
+    0x455a4396: ("blacklistAddress(address,bool)", "blacklist"),
+    0x153b0d1e: ("setBlacklist(address,bool)", "blacklist"),
+    0xd34628cc: ("addBots(address[])", "blacklist"),
+    0xb515566a: ("setBots(address[])", "blacklist"),
+    0x69fe0e2d: ("setFee(uint256)", "fee"),
+    0x0b78f9c0: ("setFees(uint256,uint256)", "fee"),
+    0xc4081a4c: ("setTaxFee(uint256)", "fee"),
+    0x0cc835a3: ("setBuyFee(uint256)", "fee"),
+    0x8b4cee08: ("setSellFee(uint256)", "fee"),
+    0x6db79437: ("updateFees(uint256,uint256)", "fee"),
+    0x2e5bb6ff: ("setTax(uint256)", "fee"),
+    0x40c10f19: ("mint(address,uint256)", "mint"),
+    0xa0712d68: ("mint(uint256)", "mint"),
+    0x8456cb59: ("pause()", "pause"),
+    0x16c38b3c: ("setPaused(bool)", "pause"),
+    0xc2e5ec04: ("setTradingEnabled(bool)", "pause"),
+    0xec28438a: ("setMaxTxAmount(uint256)", "limits"),
+    0xea1644d5: ("setMaxWalletSize(uint256)", "limits"),
+    0x3659cfe6: ("upgradeTo(address)", "proxy"),
+    0x4f1ef286: ("upgradeToAndCall(address,bytes)", "proxy"),
+}
+
+PUSH1, PUSH4, PUSH32 = 0x60, 0x63, 0x7f
+RISK_OPCODES = {0xf4: "delegatecall", 0xf2: "callcode", 0xff: "selfdestruct"}
+
+# how much each finding contributes to risk_score
+CATEGORY_WEIGHTS = {
+    "blacklist": 3, "fee": 2, "mint": 3, "pause": 2, "limits": 1, "proxy": 3,
+    "delegatecall": 3, "callcode": 2, "selfdestruct": 4,
+}
+
+
+def _strip_metadata(code: bytes) -> bytes:
+    # solc appends CBOR metadata followed by its 2-byte big-endian length
+    if len(code) < 4:
+        return code
+    length = int.from_bytes(code[-2:], "big")
+    start = len(code) - 2 - length
+    if 0 < length < len(code) - 2 and 0xa0 <= code[start] <= 0xbf:
+        return code[:start]
+    return code
+
+
+def scan_bytecode(code: Union[bytes, str]) -> Dict[str, Any]:
+    if isinstance(code, str):
+        code = bytes.fromhex(code[2:] if code.startswith("0x") else code)
+    code = _strip_metadata(bytes(code))
+
+    selectors = set()
+    opcodes = set()
+    risky_ops = RISK_OPCODES
+    table = RISK_SELECTORS
+    n = len(code)
+    i = 0
+    while i < n:
+        op = code[i]
+        if PUSH1 <= op <= PUSH32:
+            if op == PUSH4:
+                sel = int.from_bytes(code[i + 1:i + 5], "big")
+                if sel in table:
+                    selectors.add(sel)
+            i += op - PUSH1 + 2
+            continue
+        if op in risky_ops:
+            opcodes.add(risky_ops[op])
+        i += 1
+
+    categories = sorted({table[s][1] for s in selectors} | opcodes)
+    return {
+        "functions": sorted(table[s][0] for s in selectors),
+        "flags": categories,
+        "risk_score": sum(CATEGORY_WEIGHTS.get(c, 1) for c in categories),
+        "code_size": n,
+    }
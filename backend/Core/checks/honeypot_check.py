@@ -1,42 +1,92 @@
+from typing import Optional
+
 from web3 import Web3
 
-def simulate_trade(web3: Web3, token_address: str, router_address: str, weth_address: str, test_wallet: str):
-    try:
-        
-        router_abi = [{
-            "name": "getAmountsOut",
-            "outputs": [{"name": "", "type": "uint256[]"}],
-            "inputs": [
-                {"name": "amountIn", "type": "uint256"},
-                {"name": "path", "type": "address[]"}
-            ],
-            "constant": True,
-            "payable": False,
-            "type": "function"
-        }]
+from backend.Core.rate_limit import is_revert_error
+
+# round trip of 0.01 ETH; getting back less than 40% of it on the sell side is a honeypot
+TEST_AMOUNT = Web3.to_wei(0.01, "ether")
+HONEYPOT_RATIO = 0.4
 
-        router = web3.eth.contract(address=router_address, abi=router_abi)
+ROUTER_V2_ABI = [{
+    "name": "getAmountsOut",
+    "outputs": [{"name": "", "type": "uint256[]"}],
+    "inputs": [
+        {"name": "amountIn", "type": "uint256"},
+        {"name": "path", "type": "address[]"}
+    ],
+    "constant": True,
+    "payable": False,
+    "type": "function"
+}]
 
-        test_amount = Web3.to_wei(0.01, "ether")  # Simulate with 0.01 ETH
-        path_buy = [weth_address, token_address]
-        path_sell = [token_address, weth_address]
+def quote_round_trip(web3: Web3, token_address: str, router_address: str, weth_address: str,
+                     block_identifier="latest") -> float:
+    """ETH back per ETH in for a TEST_AMOUNT buy -> sell through a V2 router; raises if a quote fails."""
+    router = web3.eth.contract(address=router_address, abi=ROUTER_V2_ABI)
+    path_buy = [weth_address, token_address]
+    path_sell = [token_address, weth_address]
 
-        buy_out = router.functions.getAmountsOut(test_amount, path_buy).call()
-        token_amount = buy_out[1]
+    token_amount = router.functions.getAmountsOut(TEST_AMOUNT, path_buy).call(block_identifier=block_identifier)[1]
+    eth_back = router.functions.getAmountsOut(token_amount, path_sell).call(block_identifier=block_identifier)[1]
+    return eth_back / TEST_AMOUNT
 
-        sell_out = router.functions.getAmountsOut(token_amount, path_sell).call()
-        eth_back = sell_out[1]
+def ratio_verdict(eth_back_ratio: float, label: str = "") -> bool:
+    print(f"Simulated Buy → Sell Ratio{label}: {eth_back_ratio:.2f}x")
+    if eth_back_ratio < HONEYPOT_RATIO:
+        print("Potential honeypot — you lose most ETH on sell.")
+        return True
+    return False
 
-        eth_back_ratio = eth_back / test_amount
+def failure_verdict(error: BaseException) -> Optional[bool]:
+    """Verdict when a quote failed: a revert is one (default to caution), an RPC failure is unknown."""
+    print(f"Honeypot check failed: {error}")
+    return True if is_revert_error(error) else None
 
-        print(f"Simulated Buy → Sell Ratio: {eth_back_ratio:.2f}x")
+def simulate_trade(web3: Web3, token_address: str, router_address: str, weth_address: str, test_wallet: str,
+                   block_identifier="latest") -> Optional[bool]:
+    """Buy -> sell round trip through a V2 router (eth_call only).
 
-        if eth_back_ratio < 0.4:
-            print("Potential honeypot — you lose most ETH on sell.")
-            return True
-        else:
-            return False
+    None when a quote didn't come back (transport error, throttling): that
+    says nothing about the token.
+    """
+    try:
+        eth_back_ratio = quote_round_trip(web3, token_address, router_address, weth_address, block_identifier)
+    except Exception as e:
+        return failure_verdict(e)
+    return ratio_verdict(eth_back_ratio)
 
+
+QUOTER_V3_ABI = [{
+    "name": "quoteExactInputSingle",
+    "outputs": [{"name": "amountOut", "type": "uint256"}],
+    "inputs": [
+        {"name": "tokenIn", "type": "address"},
+        {"name": "tokenOut", "type": "address"},
+        {"name": "fee", "type": "uint24"},
+        {"name": "amountIn", "type": "uint256"},
+        {"name": "sqrtPriceLimitX96", "type": "uint160"}
+    ],
+    "stateMutability": "nonpayable",
+    "type": "function"
+}]
+
+def quote_round_trip_v3(web3: Web3, token_address: str, quoter_address: str, weth_address: str, fee: int,
+                        block_identifier="latest") -> float:
+    """quote_round_trip through a Uniswap V3 pool via the Quoter."""
+    quoter = web3.eth.contract(address=quoter_address, abi=QUOTER_V3_ABI)
+    token_amount = quoter.functions.quoteExactInputSingle(weth_address, token_address, fee, TEST_AMOUNT, 0) \
+        .call(block_identifier=block_identifier)
+    eth_back = quoter.functions.quoteExactInputSingle(token_address, weth_address, fee, token_amount, 0) \
+        .call(block_identifier=block_identifier)
+    return eth_back / TEST_AMOUNT
+
+def simulate_trade_v3(web3: Web3, token_address: str, quoter_address: str, weth_address: str, fee: int,
+                      block_identifier="latest") -> Optional[bool]:
+    """Buy -> sell round trip through a Uniswap V3 pool via the Quoter (eth_call only)."""
+    try:
+        eth_back_ratio = quote_round_trip_v3(web3, token_address, quoter_address, weth_address, fee,
+                                             block_identifier)
     except Exception as e:
-        print(f"Honeypot check failed: {e}")
-        return True  # default to caution
+        return failure_verdict(e)
+    return ratio_verdict(eth_back_ratio, f" (V3, fee {fee})")
@@ -2,6 +2,8 @@ import json
 from pathlib import Path
 from web3 import Web3
 
+from backend.Core.rate_limit import is_revert_error
+
 PAIR_ABI = json.loads("""
 [
   {
@@ -32,11 +34,11 @@ PAIR_ABI = json.loads("""
 ]
 """)
 
-def check_liquidity(web3, pair_address, token0, token1, weth_address):
+def check_liquidity(web3, pair_address, token0, token1, weth_address, block_identifier="latest"):
     try:
         pair_abi = PAIR_ABI
         pair_contract = web3.eth.contract(address=pair_address, abi=pair_abi)
-        reserves = pair_contract.functions.getReserves().call()
+        reserves = pair_contract.functions.getReserves().call(block_identifier=block_identifier)
 
         token0_reserve = reserves[0] / (10 ** 18)
         token1_reserve = reserves[1] / (10 ** 18)
@@ -53,5 +55,31 @@ def check_liquidity(web3, pair_address, token0, token1, weth_address):
 
     except Exception as e:
         print("Error checking liquidity:", e)
-        return 0
+        # None: the RPC failed, the reserve is unknown (a revert means there is none)
+        return 0 if is_revert_error(e) else None
+
+
+ERC20_BALANCE_ABI = [{
+    "constant": True,
+    "inputs": [{"name": "owner", "type": "address"}],
+    "name": "balanceOf",
+    "outputs": [{"name": "", "type": "uint256"}],
+    "type": "function"
+}]
+
+def check_liquidity_v3(web3, pool_address, weth_address, block_identifier="latest"):
+    """WETH held by a V3 pool (there are no reserves to read)."""
+    try:
+        weth = web3.eth.contract(address=weth_address, abi=ERC20_BALANCE_ABI)
+        weth_reserve = weth.functions.balanceOf(pool_address).call(block_identifier=block_identifier) / (10 ** 18)
+        print(f"WETH Reserve (V3 pool): {weth_reserve:.4f}")
+        return weth_reserve
+    except Exception as e:
+        print("Error checking liquidity:", e)
+        # None: the RPC failed, the reserve is unknown (a revert means there is none)
+        return 0 if is_revert_error(e) else None
 
+def pool_liquidity(web3, protocol, pair_address, token0, token1, weth_address, block_identifier="latest"):
+    if protocol == "v3":
+        return check_liquidity_v3(web3, pair_address, weth_address, block_identifier)
+    return check_liquidity(web3, pair_address, token0, token1, weth_address, block_identifier)
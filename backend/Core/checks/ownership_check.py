@@ -1,25 +1,50 @@
+from typing import Optional
+
 from web3 import Web3
 
-def is_renounced(web3: Web3, token_address: str) -> bool:
-    renounced_addresses = [
-        "0x0000000000000000000000000000000000000000",
-        "0x000000000000000000000000000000000000dEaD"
-    ]
+from backend.Core.rate_limit import is_revert_error
+
+RENOUNCED_ADDRESSES = {
+    "0x0000000000000000000000000000000000000000",
+    "0x000000000000000000000000000000000000dead",
+}
+
+OWNER_ABI = [{
+    "constant": True,
+    "inputs": [],
+    "name": "owner",
+    "outputs": [{"name": "", "type": "address"}],
+    "type": "function"
+}]
+
+def get_owner(web3: Web3, token_address: str, block_identifier="latest") -> Optional[str]:
+    """owner() of the token, or None when the contract has no (callable) owner().
+
+    Only a revert or an empty return means "no owner()"; RPC failures
+    (transport, throttling) are raised, they say nothing about the token.
+    """
     try:
-        contract = web3.eth.contract(address=token_address, abi=[{
-            "constant": True,
-            "inputs": [],
-            "name": "owner",
-            "outputs": [{"name": "", "type": "address"}],
-            "type": "function"
-        }])
-
-        owner = contract.functions.owner().call()
-        if owner.lower() in renounced_addresses:
-            return True
-        else:
-            print(f" Ownership still active — owner is {owner}")
-            return False
+        contract = web3.eth.contract(address=token_address, abi=OWNER_ABI)
+        return contract.functions.owner().call(block_identifier=block_identifier)
     except Exception as e:
-        print(f" Could not check ownership for {token_address}: {e}")
+        if not is_revert_error(e):
+            raise
+        print(f" No callable owner() on {token_address}: {e}")
+        return None
+
+def owner_renounced(owner: Optional[str]) -> bool:
+    if owner is None:
         return False  # default to caution
+    if owner.lower() in RENOUNCED_ADDRESSES:
+        return True
+    print(f" Ownership still active — owner is {owner}")
+    return False
+
+def is_renounced(web3: Web3, token_address: str, block_identifier="latest") -> Optional[bool]:
+    """None when owner() couldn't be read (RPC failure)."""
+    try:
+        owner = get_owner(web3, token_address, block_identifier)
+    except Exception as e:
+        print(f" Could not check ownership for {token_address}: {e}")
+        return None
+    return owner_renounced(owner)
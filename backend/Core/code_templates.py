@@ -0,0 +1,137 @@
+"""Analysis cache keyed by the hash of a token's runtime bytecode.
+
+Most new tokens are byte-identical deployments of a handful of templates.
+The analyzer fetches `eth_getCode` once per token and looks the keccak hash up
+here; what earlier clones taught us about the template (whether it has a
+callable `owner()`, how often the sell simulation failed, the static bytecode
+scan) lets later clones skip that work. Templates are kept in a bounded
+in-process LRU backed by the Mongo `code_templates` collection, so the
+knowledge survives restarts and is shared between processes.
+
+A template only produces a honeypot verdict once `min_samples` simulations
+agreed unanimously; mixed results keep simulating every clone. Only
+simulations whose quotes both came back are samples, and `has_owner` never
+goes from True back to False, so RPC failures can't teach a template a
+verdict. Per-instance state (the owner address, reserves) is never taken
+from the template.
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from backend import metrics
+
+_LOOKUPS = metrics.REGISTRY.counter(
+    "ethbot_code_template_lookups_total", "Bytecode template cache lookups", ["result"])
+_SKIPPED = metrics.REGISTRY.counter(
+    "ethbot_code_template_skipped_calls_total", "Checks answered from a known bytecode template", ["check"])
+
+
+def code_hash(code: bytes) -> Optional[str]:
+    """keccak of the runtime code (what EXTCODEHASH returns); None for accounts without code."""
+    if not code:
+        return None
+    from web3 import Web3
+    return Web3.to_hex(Web3.keccak(code))
+
+
+class TemplateCache:
+    def __init__(self, collection=None, maxsize: int = 10000, min_samples: int = 3):
+        self.collection = collection
+        self.maxsize = max(1, int(maxsize))
+        self.min_samples = max(1, int(min_samples))
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ensure_index(self):
+        if self.collection is None:
+            return
+        try:
+            self.collection.create_index("code_hash", unique=True, name="uniq_code_hash")
+        except Exception as e:
+            print(f"Warning: could not ensure code_templates index: {e}")
+
+    def _remember(self, code_hash: str, template: Dict[str, Any]):
+        with self._lock:
+            self._entries[code_hash] = template
+            self._entries.move_to_end(code_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def lookup(self, code_hash: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not code_hash:
+            return None
+        with self._lock:
+            template = self._entries.get(code_hash)
+            if template is not None:
+                self._entries.move_to_end(code_hash)
+        if template is None and self.collection is not None:
+            try:
+                template = self.collection.find_one({"code_hash": code_hash}, {"_id": 0})
+            except Exception as e:
+                print(f"code_templates lookup failed: {e}")
+                template = None
+            if template is not None:
+                self._remember(code_hash, template)
+        _LOOKUPS.labels("hit" if template is not None else "miss").inc()
+        return template
+
+    def honeypot_verdict(self, template: Optional[Dict[str, Any]]) -> Optional[bool]:
+        """True/False when enough clones were simulated and all agreed, else None."""
+        if not template:
+            return None
+        checks = int(template.get("honeypot_checks", 0))
+        if checks < self.min_samples:
+            return None
+        hits = int(template.get("honeypot_count", 0))
+        if hits == checks:
+            return True
+        if hits == 0:
+            return False
+        return None
+
+    def record(self, code_hash: Optional[str], code_size: int, has_owner: Optional[bool] = None,
+               honeypot: Optional[bool] = None, extra: Optional[Dict[str, Any]] = None):
+        """Fold one analysed clone into the template's counters (memory and Mongo)."""
+        if not code_hash:
+            return
+        now = int(time.time())
+        inc = {"seen_count": 1}
+        if honeypot is not None:
+            inc["honeypot_checks"] = 1
+            inc["honeypot_count"] = 1 if honeypot else 0
+        fields: Dict[str, Any] = {"last_seen": now}
+        if extra:
+            fields.update(extra)
+
+        with self._lock:
+            template = self._entries.get(code_hash)
+            if template is None:
+                template = {"code_hash": code_hash, "code_size": code_size, "first_seen": now}
+                self._entries[code_hash] = template
+            for k, v in inc.items():
+                template[k] = int(template.get(k, 0)) + v
+            template.update(fields)
+            if has_owner is not None:
+                template["has_owner"] = bool(template.get("has_owner")) or bool(has_owner)
+            self._entries.move_to_end(code_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        if self.collection is not None:
+            update = {"$inc": inc, "$set": fields, "$setOnInsert": {"code_size": code_size, "first_seen": now}}
+            if has_owner is not None:
+                # False < True: a template seen with an owner() keeps calling it
+                update["$max"] = {"has_owner": bool(has_owner)}
+            try:
+                self.collection.update_one({"code_hash": code_hash}, update, upsert=True)
+            except Exception as e:
+                print(f"code_templates update failed: {e}")
+
+    def skipped(self, check: str):
+        _SKIPPED.labels(check).inc()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"cached_templates": len(self._entries)}
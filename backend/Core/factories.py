@@ -0,0 +1,103 @@
+"""Registry of DEX factories the listener follows.
+
+`resources/config.json` lists factories under "FACTORIES":
+
+    {"name": "sushiswap", "protocol": "v2", "address": "0x...", "router": "0x..."}
+    {"name": "uniswap_v3", "protocol": "v3", "address": "0x...", "quoter": "0x..."}
+
+All of them are watched with one log filter (every factory address, every
+creation topic0); each log is routed back to its factory by (address, topic0)
+and decoded by the protocol's decoder straight from topics/data. Without a
+"FACTORIES" entry the legacy UNISWAP_FACTORY / UNISWAP_ROUTER keys describe a
+single Uniswap V2 factory. Each chain profile (backend.Core.chains) has its
+own registry.
+"""
+from typing import Any, Dict, List, Optional
+
+from web3 import Web3
+
+# creation event per protocol; v3 fee tier is indexed, pool address is in data
+PROTOCOL_EVENTS = {
+    "v2": "PairCreated(address,address,address,uint256)",
+    "v3": "PoolCreated(address,address,uint24,int24,address)",
+}
+
+
+def _hex(value) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    return value if value.startswith("0x") else "0x" + value
+
+
+def _word_address(word_hex: str) -> str:
+    return Web3.to_checksum_address("0x" + word_hex[-40:])
+
+
+class Factory:
+    def __init__(self, name: str, protocol: str, address: str, router: Optional[str] = None,
+                 quoter: Optional[str] = None):
+        if protocol not in PROTOCOL_EVENTS:
+            raise ValueError(f"unknown DEX protocol {protocol!r} for factory {name}")
+        self.name = name
+        self.protocol = protocol
+        self.address = Web3.to_checksum_address(address)
+        self.router = Web3.to_checksum_address(router) if router else None
+        self.quoter = Web3.to_checksum_address(quoter) if quoter else None
+        self.topic = Web3.to_hex(Web3.keccak(text=PROTOCOL_EVENTS[protocol]))
+
+    def decode(self, log) -> Dict[str, Any]:
+        """token0/token1/pair (and fee for v3) from a raw creation log."""
+        topics = [_hex(t) for t in log["topics"]]
+        data = _hex(log["data"])[2:]
+        event = {
+            "dex": self.name,
+            "protocol": self.protocol,
+            "token0": _word_address(topics[1]),
+            "token1": _word_address(topics[2]),
+        }
+        if self.protocol == "v3":
+            event["fee"] = int(topics[3], 16)
+            event["pair"] = _word_address(data[64:128])
+        else:
+            event["fee"] = None
+            event["pair"] = _word_address(data[0:64])
+        return event
+
+
+class FactoryRegistry:
+    def __init__(self, factories: List[Factory]):
+        if not factories:
+            raise ValueError("no DEX factories configured")
+        self.factories = factories
+        self._by_name = {f.name: f for f in factories}
+        self._by_key = {(f.address.lower(), f.topic): f for f in factories}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "FactoryRegistry":
+        entries = config.get("FACTORIES")
+        if not entries:
+            entries = [{"name": "uniswap_v2", "protocol": "v2", "address": config["UNISWAP_FACTORY"],
+                        "router": config.get("UNISWAP_ROUTER")}]
+        return cls([Factory(e["name"], e.get("protocol", "v2"), e["address"], e.get("router"), e.get("quoter"))
+                    for e in entries if e.get("enabled", True)])
+
+    def get(self, name: Optional[str]) -> Optional[Factory]:
+        return self._by_name.get(name) if name else None
+
+    def names(self) -> List[str]:
+        return [f.name for f in self.factories]
+
+    def log_filter(self, **extra) -> Dict[str, Any]:
+        """One filter spec covering every factory address and creation topic."""
+        topics = sorted({f.topic for f in self.factories})
+        return dict(extra, address=[f.address for f in self.factories], topics=[topics])
+
+    def decode(self, log) -> Optional[Dict[str, Any]]:
+        topics = log.get("topics") or []
+        if not topics:
+            return None
+        factory = self._by_key.get((str(log["address"]).lower(), _hex(topics[0]).lower()))
+        if factory is None:
+            return None
+        return factory.decode(log)
+
@@ -1,8 +1,14 @@
 # gui_manager.py
 
 import dearpygui.dearpygui as dpg
+from collections import deque
 from datetime import datetime
-import json
+import time
+
+try:
+    from backend.Core.gui.history import HistoryIndex, verdict_text
+except ImportError:  # run from this directory (test_gui.py)
+    from history import HistoryIndex, verdict_text
 
 dpg.create_context()
 
@@ -22,6 +28,17 @@ token_count = 0
 honeypot_count = 0
 high_liquidity_count = 0
 
+# Historical Data tab: indexed copy of logs/tokens.json plus live events,
+# filtered HISTORY_FILTER_DELAY s after the last keystroke, shown a page at a time
+history = HistoryIndex("logs/tokens.json")
+HISTORY_PAGE_SIZE = 200
+HISTORY_FILTER_DELAY = 0.25
+HISTORY_POLL_INTERVAL = 2.0   # how often the file's mtime is checked
+history_page = 0
+_filter_due = None
+_history_dirty = False
+_next_history_poll = 0.0
+
 def setup_historical_data_handlers():
     try:
         dpg.set_value("history_search", "")
@@ -119,6 +136,10 @@ def setup_gui():
                     with dpg.group(horizontal=True):
                         dpg.add_input_text(label="Search", width=200, tag="history_search")
                         dpg.add_checkbox(label="Show Honeypots Only", tag="history_honeypot_filter")
+                        dpg.add_spacer(width=20)
+                        dpg.add_button(label="< Prev", callback=lambda: show_history_page(history_page - 1))
+                        dpg.add_text("Page 1/1", tag="history_page_label")
+                        dpg.add_button(label="Next >", callback=lambda: show_history_page(history_page + 1))
                     
                     with dpg.child_window(height=500):
                         with dpg.table(header_row=True, resizable=True,
@@ -146,102 +167,143 @@ def setup_gui():
     dpg.show_viewport()
     
     setup_historical_data_handlers()
-    filter_historical_data()
+    apply_history_filter()
+
+# Producers (listener threads) only append to this deque; the render loop
+# drains it once per frame so Dear PyGui items are touched from one thread,
+# in bulk. deque.append/popleft are atomic, so producers never wait on the GUI.
+gui_events = deque()
+MAX_ROWS_PER_FRAME = 50   # token + wallet rows added per frame; the rest wait for the next one
 
 def update_token_log(token_info: dict):
-    global token_count, honeypot_count, high_liquidity_count
+    gui_events.append(("token", (datetime.now(), token_info)))
+
+def update_wallet_log(message: str):
+    gui_events.append(("wallet", (datetime.now(), message)))
+
+def update_status(message: str):
+    gui_events.append(("status", message))
+
+def drain_gui_events(max_rows: int = MAX_ROWS_PER_FRAME):
+    """Apply queued events: at most `max_rows` new rows, only the latest status."""
+    tokens, wallet, status = [], [], None
+    while len(tokens) + len(wallet) < max_rows:
+        try:
+            kind, payload = gui_events.popleft()
+        except IndexError:
+            break
+        if kind == "token":
+            tokens.append(payload)
+        elif kind == "wallet":
+            wallet.append(payload)
+        else:
+            status = payload
+    if status is not None:
+        dpg.set_value("status", f"Status: {status}")
+    if tokens:
+        apply_token_batch(tokens)
+    for received, message in wallet:
+        dpg.add_text(f"[{received.strftime('%H:%M:%S')}] {message}", parent="wallet_log_window")
+
+def apply_token_batch(batch):
+    global token_count, honeypot_count, high_liquidity_count, _history_dirty
+    # one malformed event must not cost the rest of the batch its counters
+    dropped = sum(1 for _, info in batch if not isinstance(info, dict))
+    if dropped:
+        print(f"GUI Update Error: ignoring {dropped} token event(s) that are not dicts")
+        batch = [(received, info) for received, info in batch if isinstance(info, dict)]
     try:
-        # Update statistics
-        token_count += 1
-        if token_info.get('honeypot', False):
-            honeypot_count += 1
-        if token_info.get('liquidity_eth', 0) > 5:  # Consider high liquidity if > 5 ETH
-            high_liquidity_count += 1
-        
-        # Update stats display
+        infos = [info for _, info in batch]
+        # newest rows are on the first page; update_history_view redraws it
+        visible = [history.add(info) for info in infos]
+        if any(visible) and history_page == 0:
+            _history_dirty = True
+
+        # Update statistics once for the whole batch
+        token_count += len(infos)
+        honeypot_count += sum(1 for info in infos if info.get('honeypot', False))
+        # Consider high liquidity if > 5 ETH
+        high_liquidity_count += sum(1 for info in infos if info.get('liquidity_eth', 0) > 5)
         dpg.configure_item("token_stats", default_value=f"Tokens Detected: {token_count}")
         dpg.configure_item("honeypot_stats", default_value=f"Honeypots: {honeypot_count}")
         dpg.configure_item("liquidity_stats", default_value=f"High Liquidity: {high_liquidity_count}")
-        
-        # Add row to token table
-        with dpg.table_row(parent="token_table"):
-            dpg.add_text(datetime.now().strftime("%H:%M:%S"))
-            dpg.add_text(token_info.get('address', 'N/A')[:22] + "...")  # Truncate long addresses
-            dpg.add_text(f"{token_info.get('liquidity_eth', 0):.2f}")
-            dpg.add_text(" Yes" if token_info.get('honeypot', False) else "No")
-            dpg.add_text(" Renounced" if token_info.get('ownership_renounced', False) else " Not Renounced")
     except Exception as e:
         print(f"GUI Update Error: {e}")  # This will help debug any of my GUI issues
-    
-    # log infor
-    detail_text = (
-        f"Token: {token_info.get('address', 'N/A')}\n"
-        f"Liquidity: {token_info.get('liquidity_eth', 0):.2f} ETH\n"
-        f"Honeypot: {'Yes' if token_info.get('honeypot', False) else 'No'}\n"
-        f"Ownership: {'Renounced' if token_info.get('ownership_renounced', False) else 'Not Renounced'}\n"
-        f"------------------------"
-    )
-    dpg.add_text(detail_text, parent="token_log_window")
 
-def update_wallet_log(message: str):
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    dpg.add_text(f"[{timestamp}] {message}", parent="wallet_log_window")
+    for received, token_info in batch:
+        try:
+            # Add row to token table
+            with dpg.table_row(parent="token_table"):
+                dpg.add_text(received.strftime("%H:%M:%S"))
+                dpg.add_text(token_info.get('address', 'N/A')[:22] + "...")  # Truncate long addresses
+                dpg.add_text(f"{token_info.get('liquidity_eth', 0):.2f}")
+                dpg.add_text(" " + verdict_text(token_info.get('honeypot')))
+                dpg.add_text(" " + verdict_text(token_info.get('ownership_renounced'), "Renounced", "Not Renounced"))
 
-def update_status(message: str):
-    dpg.set_value("status", f"Status: {message}")
+            # log infor
+            detail_text = (
+                f"Token: {token_info.get('address', 'N/A')}\n"
+                f"Liquidity: {token_info.get('liquidity_eth', 0):.2f} ETH\n"
+                f"Honeypot: {verdict_text(token_info.get('honeypot'))}\n"
+                f"Ownership: {verdict_text(token_info.get('ownership_renounced'), 'Renounced', 'Not Renounced')}\n"
+                f"------------------------"
+            )
+            dpg.add_text(detail_text, parent="token_log_window")
+        except Exception as e:
+            print(f"GUI Update Error: {e}")
 
 def render_gui():
     print("GUI thread started")
     while dpg.is_dearpygui_running():
+        drain_gui_events()
+        update_history_view()
         dpg.render_dearpygui_frame()
 
 def filter_historical_data(sender=None, value=None):
+    # search/checkbox callback: filter once typing pauses instead of on every keystroke
+    global _filter_due
+    _filter_due = time.monotonic() + HISTORY_FILTER_DELAY
+
+def update_history_view():
+    """Called every frame: apply a due filter, pick up file changes, redraw after live events."""
+    global _filter_due, _history_dirty, _next_history_poll
+    now = time.monotonic()
+    if now >= _next_history_poll:
+        _next_history_poll = now + HISTORY_POLL_INTERVAL
+        if history.refresh():
+            _filter_due = _filter_due or now
+    if _filter_due is not None and now >= _filter_due:
+        _filter_due = None
+        apply_history_filter()
+    elif _history_dirty:
+        _history_dirty = False
+        show_history_page(history_page)
+
+def apply_history_filter():
     try:
-        with open("logs/tokens.json", "r") as f:
-            historical_data = json.load(f)
-            
-        # Get filter values
-        search_text = dpg.get_value("history_search").lower()
-        show_honeypots = dpg.get_value("history_honeypot_filter")
-            
+        history.refresh()
+        history.filter(dpg.get_value("history_search"), dpg.get_value("history_honeypot_filter"))
+        show_history_page(0)
+    except Exception as e:
+        print(f"Error loading historical data: {e}")
+
+def show_history_page(number: int):
+    global history_page
+    try:
+        rows, history_page, pages = history.page(number, HISTORY_PAGE_SIZE)
+
         # Clear existing rows
         for child in dpg.get_item_children("history_table", slot=1):
             dpg.delete_item(child)
-            
-        # Add historical data to the table
-        for entry in historical_data:
-            token0 = entry.get("token0", {})
-            token1 = entry.get("token1", {})
-            
-            # Only show tokens paired with WETH/ETH
-            if token1.get("symbol") in ["WETH", "ETH"]:
-                main_token = token0
-            elif token0.get("symbol") in ["WETH", "ETH"]:
-                main_token = token1
-            else:
-                continue
-                
-            # Apply filters
-            if show_honeypots and not entry.get("honeypot", False):
-                continue
-                
-            token_name = f"{main_token.get('name', 'Unknown')} ({main_token.get('symbol', 'N/A')})".lower()
-            token_address = main_token.get("address", "").lower()
-            
-            if search_text and search_text not in token_name and search_text not in token_address:
-                continue
-                
+
+        # Only the rows of the visible page exist as items
+        for row in rows:
             with dpg.table_row(parent="history_table"):
-                timestamp = datetime.fromisoformat(entry.get("timestamp", "").rstrip('Z'))
-                dpg.add_text(timestamp.strftime("%Y-%m-%d %H:%M"))
-                dpg.add_text(f"{main_token.get('name', 'Unknown')} ({main_token.get('symbol', 'N/A')})")
-                dpg.add_text(main_token.get("address", "N/A")[:22] + "...")
-                dpg.add_text(entry.get("pair_address", "N/A")[:22] + "...")
-                dpg.add_text(f"{entry.get('liquidity_eth', 0):.2f}")
-                dpg.add_text("Yes" if entry.get("honeypot", False) else "No")
-                dpg.add_text("Renounced" if entry.get("ownership_renounced", False) else "Not Renounced")
+                for cell in row.cells():
+                    dpg.add_text(cell)
+        dpg.set_value("history_page_label", f"Page {history_page + 1}/{pages}")
     except Exception as e:
-        print(f"Error loading historical data: {e}")
+        print(f"Error showing historical data: {e}")
 
 def close_gui():
     dpg.destroy_context()
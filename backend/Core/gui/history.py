@@ -0,0 +1,204 @@
+# history.py
+"""
+In-memory index of the token history shown in the GUI's Historical Data tab.
+
+`logs/tokens.json` is parsed once and again only when its mtime changes;
+events coming in through `update_token_log` are appended to the same index,
+so filtering never touches the disk. Every row keeps a pre-lowercased search
+string, and a filter that only narrows the previous one (more search text,
+honeypots-only switched on) is applied to the previous matches instead of
+all rows. The GUI renders one page of the matches at a time.
+"""
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+NATIVE_SYMBOLS = ("WETH", "ETH")
+
+
+def verdict_text(value: Optional[bool], yes: str = "Yes", no: str = "No") -> str:
+    """Cell text of a check result; None (lite analysis, failed check) is "Unknown", not `no`."""
+    if value is None:
+        return "Unknown"
+    return yes if value else no
+
+
+class HistoryRow:
+    __slots__ = ("key", "when", "name", "address", "pair", "liquidity_eth",
+                 "honeypot", "ownership_renounced", "haystack")
+
+    def __init__(self, key, when, name, address, pair, liquidity_eth, honeypot, ownership_renounced):
+        self.key = key
+        self.when = when
+        self.name = name
+        self.address = address
+        self.pair = pair
+        self.liquidity_eth = liquidity_eth
+        self.honeypot = honeypot
+        self.ownership_renounced = ownership_renounced
+        self.haystack = f"{name}\n{address}".lower()
+
+    def cells(self) -> Tuple[str, ...]:
+        """Text of the table columns: Date/Time, Token Name, Token Address, Pair, Liquidity, Honeypot, Ownership."""
+        return (
+            self.when.strftime("%Y-%m-%d %H:%M") if self.when else "N/A",
+            self.name,
+            (self.address or "N/A")[:22] + "...",
+            (self.pair or "N/A")[:22] + "...",
+            f"{self.liquidity_eth:.2f}",
+            verdict_text(self.honeypot),
+            verdict_text(self.ownership_renounced, "Renounced", "Not Renounced"),
+        )
+
+
+def _parse_when(value) -> Optional[datetime]:
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value)
+        if value:
+            return datetime.fromisoformat(str(value).rstrip("Z"))
+    except (ValueError, OSError, OverflowError):
+        pass
+    return None
+
+
+def row_from_entry(entry: Dict[str, Any]) -> Optional[HistoryRow]:
+    """Row for a tokens.json entry or a live token_info; None if it isn't paired with WETH/ETH."""
+    token0 = entry.get("token0") or entry.get("token0_info") or {}
+    token1 = entry.get("token1") or entry.get("token1_info") or {}
+    if token1.get("symbol") in NATIVE_SYMBOLS:
+        main_token = token0
+    elif token0.get("symbol") in NATIVE_SYMBOLS:
+        main_token = token1
+    elif token0 or token1:
+        return None
+    else:
+        # live events without token metadata only carry the token address
+        main_token = {"address": entry.get("address", "")}
+    address = main_token.get("address") or entry.get("address") or ""
+    pair = entry.get("pair_address") or ""
+    key = (entry.get("tx_hash"), entry.get("log_index")) if entry.get("tx_hash") else (pair.lower(), address.lower())
+    return HistoryRow(
+        key=key,
+        when=_parse_when(entry.get("timestamp")),
+        name=f"{main_token.get('name', 'Unknown')} ({main_token.get('symbol', 'N/A')})",
+        address=address,
+        pair=pair,
+        liquidity_eth=float(entry.get("liquidity_eth", 0) or 0),
+        honeypot=None if entry.get("honeypot") is None else bool(entry["honeypot"]),
+        ownership_renounced=None if entry.get("ownership_renounced") is None else bool(entry["ownership_renounced"]),
+    )
+
+
+class HistoryIndex:
+    def __init__(self, path: str = "logs/tokens.json"):
+        self.path = path
+        self.rows: List[HistoryRow] = []
+        self._keys: Dict[Any, int] = {}
+        self._live: Dict[Any, HistoryRow] = {}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        # last filter and its matches (row positions, newest first)
+        self._filter: Optional[Tuple[str, bool]] = None
+        self._matches: List[int] = []
+        self.version = 0
+
+    def refresh(self) -> bool:
+        """Re-read the file if its mtime changed; True when the rows changed."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading historical data: {e}")
+            return False
+        file_rows = [r for r in map(row_from_entry, entries) if r is not None]
+        with self._lock:
+            self.rows, self._keys = [], {}
+            for row in file_rows:
+                self._put(row)
+            # live rows that haven't been written to the file yet survive the reload
+            self._live = {k: r for k, r in self._live.items() if k not in self._keys}
+            for row in self._live.values():
+                self._put(row)
+            self._mtime = mtime
+            self._filter = None
+            self.version += 1
+        return True
+
+    def _put(self, row: HistoryRow) -> int:
+        pos = self._keys.get(row.key)
+        if pos is not None:
+            self.rows[pos] = row
+            return pos
+        self.rows.append(row)
+        self._keys[row.key] = len(self.rows) - 1
+        return len(self.rows) - 1
+
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """Index a live event; True if it changed the view under the current filter."""
+        row = row_from_entry(entry)
+        if row is None:
+            return False
+        with self._lock:
+            is_new = row.key not in self._keys
+            pos = self._put(row)
+            self._live[row.key] = row
+            self.version += 1
+            if self._filter is None:
+                return False
+            matches = self._matches_filter(row, *self._filter)
+            if is_new:
+                if matches:
+                    self._matches.insert(0, pos)
+                return matches
+            # a re-added event (e.g. a completed analysis) may enter or leave the view;
+            # positions are kept newest (highest) first
+            i = next((j for j, p in enumerate(self._matches) if p <= pos), len(self._matches))
+            listed = i < len(self._matches) and self._matches[i] == pos
+            if matches and not listed:
+                self._matches.insert(i, pos)
+            elif listed and not matches:
+                del self._matches[i]
+            return matches or listed
+
+    @staticmethod
+    def _matches_filter(row: HistoryRow, search: str, honeypots_only: bool) -> bool:
+        if honeypots_only and not row.honeypot:
+            return False
+        return not search or search in row.haystack
+
+    def filter(self, search: str = "", honeypots_only: bool = False) -> List[int]:
+        """Positions of matching rows, newest first (reuses the last result when narrowing)."""
+        search = (search or "").strip().lower()
+        with self._lock:
+            prev = self._filter
+            if prev == (search, honeypots_only):
+                return self._matches
+            if prev is not None and search.startswith(prev[0]) and (honeypots_only or not prev[1]):
+                candidates = self._matches
+            else:
+                candidates = range(len(self.rows) - 1, -1, -1)
+            rows = self.rows
+            self._matches = [i for i in candidates if self._matches_filter(rows[i], search, honeypots_only)]
+            self._filter = (search, honeypots_only)
+            return self._matches
+
+    def page(self, number: int, size: int) -> Tuple[List[HistoryRow], int, int]:
+        """(rows of page `number`, clamped page number, page count) of the current matches."""
+        with self._lock:
+            matches = self._matches
+            pages = max(1, (len(matches) + size - 1) // size)
+            number = min(max(0, number), pages - 1)
+            start = number * size
+            return [self.rows[i] for i in matches[start:start + size]], number, pages
+
+    def __len__(self):
+        return len(self.rows)
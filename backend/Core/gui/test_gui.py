@@ -10,7 +10,7 @@ update_status("🟢 GUI Test Running")
 
 # 2. Pump in some fake messages
 for i in range(5):
-    update_token_log(f"Test token event #{i}")
+    update_token_log({"address": f"0xTestToken{i}", "liquidity_eth": i * 2.5, "honeypot": i % 2 == 0})
     update_wallet_log(f"Test wallet alert #{i}")
     time.sleep(1)
 
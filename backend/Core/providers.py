@@ -0,0 +1,50 @@
+"""Provider/web3 construction shared by the listener and analysis worker processes.
+
+`make_provider(url)` understands:
+  - `replay:<file>`        a recording made with RPC_RECORD_PATH (backend.Core.rpc_recorder)
+  - `url1,url2,...`        a health-scored pool over several endpoints (backend.Core.rpc_pool)
+  - `http(s)://...`        HTTPProvider
+  - anything else          LegacyWebSocketProvider
+"""
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from web3 import Web3
+
+# provider pools are kept across reconnects so their health history survives
+_provider_pools: Dict[str, Any] = {}
+_pools_lock = threading.Lock()
+
+
+def make_provider(url: str):
+    if url.startswith("replay:"):
+        from backend.Core.rpc_recorder import ReplayProvider
+        return ReplayProvider(url[len("replay:"):], latency=os.getenv("RPC_REPLAY_LATENCY", "zero"))
+    if "," in url:
+        with _pools_lock:
+            pool = _provider_pools.get(url)
+            if pool is None:
+                from backend.Core.rpc_pool import ProviderPool
+                pool = ProviderPool.from_urls([u.strip() for u in url.split(",") if u.strip()], make_provider)
+                _provider_pools[url] = pool
+        return pool
+    if url.startswith(("http://", "https://")):
+        return Web3.HTTPProvider(url)
+    return Web3.LegacyWebSocketProvider(url)
+
+
+def make_web3(url: str, chain: Optional[str] = None):
+    web3 = Web3(make_provider(url))
+    # every request from this instance (checks, wallet trackers, API handlers) shares the
+    # process-wide adaptive rate/concurrency budget of its chain; RPC_RATE_LIMIT=0 turns it off
+    if os.getenv("RPC_RATE_LIMIT", "100") != "0":
+        from backend.Core.rate_limit import get_limiter
+        web3.middleware_onion.add(get_limiter(chain).middleware(), name="rpc_rate_limit")
+    # calls pinned to a block number are answered from the chain's cache (outermost, so
+    # hits cost no budget); CALL_CACHE_SIZE=0 turns it off
+    from backend.Core.call_cache import get_call_cache
+    cache = get_call_cache(chain)
+    if cache is not None:
+        web3.middleware_onion.add(cache.middleware(), name="call_cache")
+    return web3
@@ -0,0 +1,326 @@
+"""Shared client-side RPC rate limiting with AIMD concurrency control.
+
+Every request made through a web3 instance built by the listener passes
+through one `AdaptiveLimiter`, so the analyzer checks, wallet trackers and API
+handlers draw from the same budget. Requests are grouped into method classes
+(`call`, `logs`, `tx`, `block`, `other`); each class has a token bucket for
+its request rate and a concurrency limit that grows additively while calls
+come back quickly and is halved whenever the provider throttles us
+(HTTP 429 or JSON-RPC -32005). Throttled requests are retried with
+full-jitter exponential backoff.
+
+Every chain other than the default one gets a limiter of its own
+(`get_limiter(chain)`), since each chain has its own provider and quota;
+its method-class labels are prefixed with the chain name ("base:call").
+"""
+import os
+import re
+import time
+import random
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from web3.middleware import Web3Middleware
+except Exception:
+    Web3Middleware = object
+
+from backend import metrics
+
+METHOD_CLASSES = {
+    "eth_call": "call",
+    "eth_estimateGas": "call",
+    "eth_getCode": "call",
+    "eth_getLogs": "logs",
+    "eth_newFilter": "logs",
+    "eth_getFilterChanges": "logs",
+    "eth_getFilterLogs": "logs",
+    "eth_uninstallFilter": "logs",
+    "eth_getTransactionByHash": "tx",
+    "eth_getTransactionReceipt": "tx",
+    "eth_getBlockByNumber": "block",
+    "eth_getBlockByHash": "block",
+    "eth_blockNumber": "block",
+}
+
+THROTTLE_CODES = {-32005, 429}
+# method classes with their own RPC_RATE_<CLASS> override
+CLASS_NAMES = ("call", "logs", "tx", "block", "other")
+_THROTTLE_PHRASES = ("rate limit", "limit exceeded", "too many requests")
+# a -32005 error code quoted in an exception message, not digits inside hex data
+_THROTTLE_CODE_RE = re.compile(r"(?<![\w-])-32005(?!\d)")
+
+# answered from static node info (and re-asked by web3 before many calls); never limited
+UNLIMITED_METHODS = {"eth_chainId", "net_version", "web3_clientVersion"}
+
+_CONCURRENCY = metrics.REGISTRY.gauge(
+    "ethbot_rpc_concurrency_limit", "Current AIMD concurrency limit per RPC method class", ["method_class"])
+_RATE = metrics.REGISTRY.gauge(
+    "ethbot_rpc_rate_limit", "Current token bucket rate (req/s) per RPC method class", ["method_class"])
+_INFLIGHT = metrics.REGISTRY.gauge(
+    "ethbot_rpc_inflight", "RPC requests in flight per method class", ["method_class"])
+_THROTTLED = metrics.REGISTRY.counter(
+    "ethbot_rpc_throttled_total", "Throttling responses received per RPC method class", ["method_class"])
+_RETRIES = metrics.REGISTRY.counter(
+    "ethbot_rpc_retries_total", "Requests retried after throttling per RPC method class", ["method_class"])
+
+
+def method_class(method: str) -> str:
+    return METHOD_CLASSES.get(method, "other")
+
+
+def is_throttle_error(error: Any) -> bool:
+    if isinstance(error, Mapping):
+        if error.get("code") in THROTTLE_CODES:
+            return True
+        message = str(error.get("message", "")).lower()
+        return any(p in message for p in _THROTTLE_PHRASES)
+    if isinstance(error, BaseException):
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) == 429 or getattr(error, "status", None) == 429:
+            return True
+        # web3 keeps the JSON-RPC error object on the exception
+        for payload in (getattr(error, "rpc_response", None), *error.args[:1]):
+            if isinstance(payload, Mapping) and is_throttle_error(payload.get("error", payload)):
+                return True
+        # never a bare "429": addresses, calldata and revert payloads contain it
+        text = str(error).lower()
+        return any(p in text for p in _THROTTLE_PHRASES) or _THROTTLE_CODE_RE.search(text) is not None
+    return False
+
+
+def is_revert_error(error: Any) -> bool:
+    """A definitive answer from the contract: the call reverted or returned no/undecodable data.
+
+    Anything else (transport errors, timeouts, throttling) says nothing about
+    the contract and must not be taken as a result.
+    """
+    if isinstance(error, Mapping):
+        if is_throttle_error(error):
+            return False
+        return error.get("code") == 3 or "revert" in str(error.get("message", "")).lower()
+    if isinstance(error, BaseException):
+        from web3.exceptions import BadFunctionCallOutput, ContractLogicError
+        return isinstance(error, (ContractLogicError, BadFunctionCallOutput))
+    return False
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self.rate = float(rate)
+
+
+class AimdGate:
+    """Concurrency gate whose limit follows additive-increase/multiplicative-decrease."""
+
+    def __init__(self, initial: float, min_limit: float = 1.0, max_limit: float = 64.0):
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.inflight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+
+    def release(self):
+        with self._cond:
+            self.inflight -= 1
+            self._cond.notify()
+
+    def increase(self):
+        with self._cond:
+            # +1 per "window" of `limit` successful calls
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify()
+
+    def decrease(self, factor: float = 0.5):
+        with self._cond:
+            self.limit = max(self.min_limit, self.limit * factor)
+
+
+class _ClassLimiter:
+    def __init__(self, name: str, rate: float, burst: float, concurrency: float, max_concurrency: float,
+                 min_rate: float):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.gate = AimdGate(concurrency, max_limit=max_concurrency)
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate)
+
+
+class AdaptiveLimiter:
+    def __init__(self, rate: float = 100.0, concurrency: float = 4.0,
+                 max_concurrency: float = 32.0, latency_target: float = 1.0, max_retries: int = 4,
+                 base_backoff: float = 0.25, max_backoff: float = 8.0,
+                 class_rates: Optional[Dict[str, float]] = None, prefix: str = ""):
+        self.prefix = prefix
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._params = dict(rate=rate, concurrency=concurrency, max_concurrency=max_concurrency)
+        self._class_rates = dict(class_rates or {})
+        self._classes: Dict[str, _ClassLimiter] = {}
+        self._lock = threading.Lock()
+        metrics.REGISTRY.add_collector(self._export_metrics)
+
+    @classmethod
+    def from_env(cls, chain: Optional[str] = None) -> "AdaptiveLimiter":
+        class_rates = {}
+        for name in CLASS_NAMES:
+            value = os.getenv(f"RPC_RATE_{name.upper()}")
+            if value:
+                class_rates[name] = float(value)
+        rate = os.getenv("RPC_RATE_LIMIT", "100")
+        if chain:
+            # RPC_RATE_LIMIT_<CHAIN> overrides the budget for that chain's provider
+            rate = os.getenv(f"RPC_RATE_LIMIT_{chain.upper()}", rate)
+        return cls(
+            rate=float(rate),
+            concurrency=float(os.getenv("RPC_INITIAL_CONCURRENCY", "4")),
+            max_concurrency=float(os.getenv("RPC_MAX_CONCURRENCY", "32")),
+            latency_target=float(os.getenv("RPC_LATENCY_TARGET", "1.0")),
+            max_retries=int(os.getenv("RPC_MAX_RETRIES", "4")),
+            class_rates=class_rates,
+            prefix=f"{chain}:" if chain else "",
+        )
+
+    def scale(self, fraction: float):
+        """Keep only `fraction` of every class's configured rate (this process's share when
+        other processes draw on the same RPC budget)."""
+        with self._lock:
+            self._params["rate"] *= fraction
+            self._class_rates = {name: rate * fraction for name, rate in self._class_rates.items()}
+            for limiter in self._classes.values():
+                limiter.max_rate *= fraction
+                limiter.min_rate *= fraction
+                limiter.bucket.set_rate(min(limiter.bucket.rate, limiter.max_rate))
+
+    def _limiter(self, name: str) -> _ClassLimiter:
+        limiter = self._classes.get(name)
+        if limiter is None:
+            with self._lock:
+                limiter = self._classes.get(name)
+                if limiter is None:
+                    rate = self._class_rates.get(name, self._params["rate"])
+                    # bursts of up to two seconds' worth of requests
+                    limiter = _ClassLimiter(self.prefix + name, rate, max(1.0, rate * 2), self._params["concurrency"],
+                                            self._params["max_concurrency"], min_rate=max(0.5, rate / 20.0))
+                    self._classes[name] = limiter
+        return limiter
+
+    def _on_throttle(self, limiter: _ClassLimiter):
+        limiter.gate.decrease()
+        limiter.bucket.set_rate(max(limiter.min_rate, limiter.bucket.rate * 0.7))
+        _THROTTLED.labels(limiter.name).inc()
+
+    def _on_success(self, limiter: _ClassLimiter, elapsed: float):
+        if elapsed > self.latency_target:
+            return
+        limiter.gate.increase()
+        if limiter.bucket.rate < limiter.max_rate:
+            limiter.bucket.set_rate(min(limiter.max_rate, limiter.bucket.rate + limiter.max_rate / 100.0))
+
+    def backoff(self, attempt: int) -> float:
+        # "full jitter": uniform in [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    def execute(self, method: str, send: Callable[[], Dict[str, Any]], weight: int = 1) -> Dict[str, Any]:
+        """Run `send` within the method's budget; `weight` > 1 is a JSON-RPC batch of that many
+        requests, which holds one concurrency slot but draws a bucket token per request."""
+        if method in UNLIMITED_METHODS:
+            return send()
+        limiter = self._limiter(method_class(method))
+        attempt = 0
+        while True:
+            for _ in range(max(1, weight)):
+                limiter.bucket.acquire()
+            limiter.gate.acquire()
+            start = time.perf_counter()
+            try:
+                response = send()
+            except Exception as e:
+                if not is_throttle_error(e) or attempt >= self.max_retries:
+                    raise
+                self._on_throttle(limiter)
+            else:
+                if not is_throttle_error(response.get("error")):
+                    self._on_success(limiter, time.perf_counter() - start)
+                    return response
+                self._on_throttle(limiter)
+                if attempt >= self.max_retries:
+                    return response
+            finally:
+                limiter.gate.release()
+            _RETRIES.labels(limiter.name).inc()
+            time.sleep(self.backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: {"concurrency_limit": round(l.gate.limit, 2), "inflight": l.gate.inflight,
+                       "rate": round(l.bucket.rate, 2)} for name, l in list(self._classes.items())}
+
+    def middleware(self):
+        """A Web3Middleware class routing every request through this limiter."""
+        limiter = self
+
+        class RateLimitMiddleware(Web3Middleware):
+            def wrap_make_request(self, make_request):
+                def middleware(method, params):
+                    return limiter.execute(method, lambda: make_request(method, params))
+
+                return middleware
+
+        return RateLimitMiddleware
+
+    def _export_metrics(self):
+        for l in list(self._classes.values()):
+            _CONCURRENCY.labels(l.name).set(l.gate.limit)
+            _RATE.labels(l.name).set(l.bucket.rate)
+            _INFLIGHT.labels(l.name).set(l.gate.inflight)
+
+
+_shared: Optional[AdaptiveLimiter] = None
+_chain_limiters: Dict[str, AdaptiveLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_limiter(chain: Optional[str] = None) -> AdaptiveLimiter:
+    """The process-wide limiter shared by every web3 instance (of `chain`, if given)."""
+    global _shared
+    if chain:
+        with _shared_lock:
+            limiter = _chain_limiters.get(chain)
+            if limiter is None:
+                limiter = _chain_limiters[chain] = AdaptiveLimiter.from_env(chain)
+        return limiter
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = AdaptiveLimiter.from_env()
+    return _shared
@@ -0,0 +1,164 @@
+"""JSON-RPC batching for call-heavy work (on-demand bulk analysis).
+
+`BatchCaller.request_many` sends a list of requests as JSON-RPC batches of at
+most RPC_BATCH_SIZE (default 100, a common provider cap) in one HTTP round
+trip each, instead of one round trip per request. Each batch passes through
+the chain's rate limiter as a single request holding one concurrency slot but
+drawing a bucket token per call, so batched work spends the same quota the
+listener would for the same calls. Requests of a batch that come back
+throttled are sent again (at most RPC_MAX_RETRIES rounds).
+
+Providers that can't batch (websocket, the multi-endpoint pool, replays) get
+the requests one at a time through the same limiter.
+
+With a `cache` (backend.Core.call_cache), requests pinned to a block number
+are answered from it or from an identical request already in flight, and only
+the rest is sent.
+"""
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend import metrics
+from backend.Core.call_cache import cache_key
+from backend.Core.rate_limit import is_throttle_error
+
+_BATCHES = metrics.REGISTRY.counter("ethbot_rpc_batches_total", "JSON-RPC batches sent")
+_REQUESTS = metrics.REGISTRY.counter(
+    "ethbot_rpc_batch_requests_total", "Requests sent through BatchCaller, batched or one at a time", ["mode"])
+
+Request = Tuple[str, Sequence[Any]]
+# (result, error): exactly one of them is set
+Response = Tuple[Any, Optional[Dict[str, Any]]]
+
+
+def _to_response(raw: Any) -> Response:
+    if not isinstance(raw, dict):
+        return None, {"code": -32603, "message": f"malformed response: {raw!r}"[:200]}
+    if raw.get("error") is not None:
+        error = raw["error"]
+        return None, error if isinstance(error, dict) else {"code": -32603, "message": str(error)}
+    return raw.get("result"), None
+
+
+class BatchCaller:
+    def __init__(self, web3, limiter=None, batch_size: Optional[int] = None, max_retries: Optional[int] = None,
+                 cache=None):
+        self.web3 = web3
+        self.limiter = limiter
+        self.cache = cache
+        self.batch_size = max(1, batch_size or int(os.getenv("RPC_BATCH_SIZE", "100")))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("RPC_MAX_RETRIES", "4"))
+        provider = web3.provider
+        self._batching = callable(getattr(provider, "make_batch_request", None))
+
+    def _execute(self, method: str, send, weight: int = 1) -> Dict[str, Any]:
+        if self.limiter is None:
+            return send()
+        return self.limiter.execute(method, send, weight=weight)
+
+    def _send_one(self, method: str, params: Sequence[Any]) -> Response:
+        try:
+            raw = self._execute(method, lambda: self.web3.provider.make_request(method, list(params)))
+        except Exception as e:
+            return None, {"code": -32603, "message": str(e)}
+        return _to_response(raw)
+
+    def _send_batch(self, requests: List[Request]) -> Optional[List[Response]]:
+        """One JSON-RPC batch; None when the provider turned out not to support batching."""
+        def send():
+            response = self.web3.provider.make_batch_request([(m, list(p)) for m, p in requests])
+            # a whole-batch failure is a single error object; the limiter looks at its "error"
+            return {"result": response} if isinstance(response, list) else response
+
+        try:
+            raw = self._execute(requests[0][0], send, weight=len(requests))
+        except NotImplementedError:
+            self._batching = False
+            return None
+        except Exception as e:
+            return [(None, {"code": -32603, "message": str(e)})] * len(requests)
+        if raw.get("error") is not None or not isinstance(raw.get("result"), list):
+            return [_to_response(raw)] * len(requests)
+        responses = [_to_response(r) for r in raw["result"]]
+        if len(responses) != len(requests):
+            return [(None, {"code": -32603, "message": "batch response size mismatch"})] * len(requests)
+        _BATCHES.inc()
+        _REQUESTS.labels("batch").inc(len(requests))
+        return responses
+
+    def request_many(self, requests: Sequence[Request]) -> List[Response]:
+        """(result, error) per request, in order."""
+        requests = list(requests)
+        if self.cache is None:
+            return self._request_many(requests)
+        out: List[Response] = [(None, None)] * len(requests)
+        owned: Dict[int, tuple] = {}
+        waiting: Dict[int, Any] = {}
+        for i, (method, params) in enumerate(requests):
+            key = cache_key(method, params)
+            if key is None:
+                owned[i] = (None, None)
+                continue
+            state, value = self.cache.claim(key)
+            if state == "hit":
+                out[i] = _to_response(value)
+            elif state == "wait":
+                waiting[i] = value
+            else:
+                owned[i] = (key, value)
+        try:
+            sent = list(owned)
+            for i, response in zip(sent, self._request_many([requests[i] for i in sent])):
+                out[i] = response
+                key, future = owned.pop(i)
+                if key is not None:
+                    result, error = response
+                    self.cache.finish(key, future, {"error": error} if error is not None else {"result": result})
+        finally:
+            # never leave other callers waiting on a request that wasn't answered
+            for key, future in owned.values():
+                if key is not None:
+                    self.cache.fail(key, future, RuntimeError("batch request aborted"))
+        for i, future in waiting.items():
+            try:
+                out[i] = _to_response(future.result())
+            except Exception as e:
+                out[i] = (None, {"code": -32603, "message": str(e)})
+        return out
+
+    def _request_many(self, requests: List[Request]) -> List[Response]:
+        out: List[Response] = [(None, None)] * len(requests)
+        pending = list(range(len(requests)))
+        attempt = 0
+        while pending and self._batching:
+            retry = []
+            for start in range(0, len(pending), self.batch_size):
+                chunk = pending[start:start + self.batch_size]
+                responses = self._send_batch([requests[i] for i in chunk])
+                if responses is None:
+                    break
+                for i, response in zip(chunk, responses):
+                    out[i] = response
+                    if is_throttle_error(response[1]):
+                        retry.append(i)
+            if not self._batching:
+                break
+            if not retry or attempt >= self.max_retries:
+                return out
+            pending, attempt = retry, attempt + 1
+            if self.limiter is not None:
+                time.sleep(self.limiter.backoff(attempt))
+        for i in pending:
+            _REQUESTS.labels("sequential").inc()
+            out[i] = self._send_one(*requests[i])
+        return out
+
+    def call_many(self, calls: Sequence[Tuple[str, str]], block: Any = "latest") -> List[Optional[str]]:
+        """Hex return data of each (to, data) eth_call, or None when it failed or reverted."""
+        responses = self.request_many([("eth_call", [{"to": to, "data": data}, block]) for to, data in calls])
+        return [None if error is not None else result for result, error in responses]
+
+    def code_many(self, addresses: Sequence[str], block: Any = "latest") -> List[Optional[str]]:
+        responses = self.request_many([("eth_getCode", [address, block]) for address in addresses])
+        return [None if error is not None else result for result, error in responses]
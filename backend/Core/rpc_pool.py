@@ -0,0 +1,344 @@
+"""Health-scored pool of JSON-RPC endpoints exposed as a single web3 provider.
+
+Reads go to the endpoint with the best score (EWMA latency penalised by the
+recent error rate); transport failures and throttling errors put an endpoint
+in a short cooldown and the request is retried on the next one. Slow
+`eth_call`s are hedged: if the first endpoint hasn't answered within its own
+latency percentile, the same call is sent to a second endpoint and whichever
+answers first wins.
+
+Log filters are emulated by the pool instead of living on one node: a filter
+is just a spec plus the last block delivered, and `eth_getFilterChanges` is
+answered with `eth_getLogs` over the blocks since then on whichever endpoint
+is healthy, up to that endpoint's own head (a lagging node never moves the
+cursor past blocks it hasn't seen). Filter IDs therefore survive failover and
+no logs are skipped while switching endpoints.
+"""
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+try:
+    from web3.providers.base import BaseProvider
+except Exception:
+    BaseProvider = object
+
+from backend import metrics
+
+# JSON-RPC error codes that mean "this endpoint is unhappy", not "this call is invalid"
+RETRYABLE_CODES = {-32005, -32603, 429, 503}
+RETRYABLE_MESSAGES = ("limit exceeded", "rate limit", "timeout", "too many", "capacity", "unavailable", "header not found")
+
+FILTER_METHODS = {"eth_newFilter", "eth_getFilterChanges", "eth_getFilterLogs", "eth_uninstallFilter"}
+MAX_LOG_RANGE = 2000
+
+_ENDPOINT_LATENCY = metrics.REGISTRY.gauge(
+    "ethbot_rpc_endpoint_latency_seconds", "EWMA request latency per RPC endpoint", ["endpoint"])
+_ENDPOINT_ERROR_RATE = metrics.REGISTRY.gauge(
+    "ethbot_rpc_endpoint_error_rate", "EWMA error rate per RPC endpoint", ["endpoint"])
+_ENDPOINT_REQUESTS = metrics.REGISTRY.counter(
+    "ethbot_rpc_endpoint_requests_total", "Requests sent per RPC endpoint and outcome", ["endpoint", "outcome"])
+_HEDGES = metrics.REGISTRY.counter(
+    "ethbot_rpc_hedged_requests_total", "eth_call requests duplicated to a second endpoint", ["winner"])
+
+
+def is_retryable_error(error: Any) -> bool:
+    if not isinstance(error, Mapping):
+        return False
+    if error.get("code") in RETRYABLE_CODES:
+        return True
+    message = str(error.get("message", "")).lower()
+    return any(m in message for m in RETRYABLE_MESSAGES)
+
+
+def endpoint_label(url: str) -> str:
+    # never export API keys embedded in the path or query
+    parsed = urlparse(url)
+    return parsed.netloc or url.split("?")[0][:40]
+
+
+class Endpoint:
+    def __init__(self, url: str, provider, alpha: float = 0.2):
+        self.url = url
+        self.label = endpoint_label(url)
+        self.provider = provider
+        self.alpha = alpha
+        self.latency = 0.1
+        self.error_rate = 0.0
+        self.cooldown_until = 0.0
+        self.consecutive_failures = 0
+        self._samples: deque = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def score(self) -> float:
+        return self.latency * (1.0 + 20.0 * self.error_rate)
+
+    def record_success(self, elapsed: float):
+        with self._lock:
+            self.latency += self.alpha * (elapsed - self.latency)
+            self.error_rate -= self.alpha * self.error_rate
+            self.consecutive_failures = 0
+            self._samples.append(elapsed)
+        _ENDPOINT_REQUESTS.labels(self.label, "ok").inc()
+
+    def record_failure(self):
+        with self._lock:
+            self.error_rate += self.alpha * (1.0 - self.error_rate)
+            self.consecutive_failures += 1
+            # exponential cooldown capped at 30 s
+            backoff = min(30.0, 0.5 * (2 ** (self.consecutive_failures - 1)))
+            self.cooldown_until = time.time() + backoff
+        _ENDPOINT_REQUESTS.labels(self.label, "error").inc()
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < 20:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class ProviderPool(BaseProvider):
+    def __init__(self, endpoints: List[Endpoint], hedge_percentile: float = 0.9,
+                 min_hedge_delay: float = 0.05, hedge_workers: int = 16):
+        super().__init__()
+        if not endpoints:
+            raise ValueError("ProviderPool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self._executor = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix="rpc-hedge")
+        self._filters: Dict[str, Dict[str, Any]] = {}
+        self._filter_lock = threading.Lock()
+        self._next_filter = 1
+        self._next_id = 0
+        metrics.REGISTRY.add_collector(self._export_metrics)
+
+    @classmethod
+    def from_urls(cls, urls: List[str], make_provider: Callable[[str], Any], **kwargs) -> "ProviderPool":
+        return cls([Endpoint(u, make_provider(u)) for u in urls], **kwargs)
+
+    # ---- endpoint selection
+    def ranked(self, exclude=()) -> List[Endpoint]:
+        now = time.time()
+        candidates = [e for e in self.endpoints if e not in exclude]
+        healthy = [e for e in candidates if e.healthy(now)]
+        # with everything cooling down, try the one that recovers first
+        pool = healthy or sorted(candidates, key=lambda e: e.cooldown_until)[:1]
+        # small jitter so equal scores don't pin all traffic to the first endpoint
+        return sorted(pool, key=lambda e: e.score() * random.uniform(0.95, 1.05))
+
+    def _send(self, endpoint: Endpoint, method: str, params: Any) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            response = endpoint.provider.make_request(method, params)
+        except Exception:
+            endpoint.record_failure()
+            raise
+        if is_retryable_error(response.get("error")):
+            endpoint.record_failure()
+        else:
+            endpoint.record_success(time.perf_counter() - start)
+        return response
+
+    def _request(self, method: str, params: Any) -> Dict[str, Any]:
+        tried: List[Endpoint] = []
+        last_exc: Optional[Exception] = None
+        last_response: Optional[Dict[str, Any]] = None
+        for _ in range(len(self.endpoints)):
+            ranked = self.ranked(exclude=tried)
+            if not ranked:
+                break
+            endpoint = ranked[0]
+            tried.append(endpoint)
+            try:
+                if method == "eth_call" and len(ranked) > 1:
+                    response = self._hedged(endpoint, ranked[1], method, params)
+                else:
+                    response = self._send(endpoint, method, params)
+            except Exception as e:
+                last_exc = e
+                continue
+            if is_retryable_error(response.get("error")):
+                last_response = response
+                continue
+            return response
+        if last_response is not None:
+            return last_response
+        raise last_exc or ConnectionError("no RPC endpoint available")
+
+    def _hedged(self, primary: Endpoint, secondary: Endpoint, method: str, params: Any) -> Dict[str, Any]:
+        delay = primary.percentile(self.hedge_percentile)
+        if delay is None:
+            return self._send(primary, method, params)
+        first = self._executor.submit(self._send, primary, method, params)
+        done, _ = wait([first], timeout=max(self.min_hedge_delay, delay))
+        if done:
+            return first.result()
+        second = self._executor.submit(self._send, secondary, method, params)
+        pending = {first: primary, second: secondary}
+        error: Optional[Exception] = None
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                endpoint = pending.pop(fut)
+                try:
+                    response = fut.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if is_retryable_error(response.get("error")) and pending:
+                    continue
+                _HEDGES.labels("secondary" if endpoint is secondary else "primary").inc()
+                return response
+        raise error or ConnectionError("hedged eth_call failed on both endpoints")
+
+    # ---- pool-side log filters
+    def _new_filter(self, params: Any) -> str:
+        spec = dict(params[0]) if params else {}
+        head = self._block_number()
+        start = spec.pop("fromBlock", None)
+        stop = spec.pop("toBlock", None)
+        if start in (None, "latest", "pending"):
+            first = None
+            last = head
+        else:
+            first = int(start, 16) if isinstance(start, str) else int(start)
+            last = first - 1
+        if stop in ("latest", "pending"):
+            stop = None
+        elif stop is not None:
+            stop = int(stop, 16) if isinstance(stop, str) else int(stop)
+        with self._filter_lock:
+            fid = hex(self._next_filter)
+            self._next_filter += 1
+            # first: fromBlock for eth_getFilterLogs (None: "latest" at query time); last: cursor
+            self._filters[fid] = {"spec": spec, "first": first, "stop": stop, "last": last,
+                                  "poll_lock": threading.Lock()}
+        return fid
+
+    @staticmethod
+    def _block(response: Dict[str, Any]) -> int:
+        if "error" in response:
+            raise ConnectionError(f"eth_blockNumber failed: {response['error']}")
+        return int(response["result"], 16) if isinstance(response["result"], str) else int(response["result"])
+
+    def _block_number(self) -> int:
+        return self._block(self._request("eth_blockNumber", []))
+
+    def _logs_on(self, endpoint: Endpoint, spec: Dict[str, Any], start: Optional[int], stop: Optional[int]):
+        """eth_getLogs over [start, min(stop, head)] on one endpoint, with `head` read from that
+        same endpoint so a lagging node can't answer [] for blocks it hasn't seen yet.
+        Returns (response, last block covered or None); raises when the endpoint should be skipped."""
+        head = self._block(self._send(endpoint, "eth_blockNumber", []))
+        end = head if stop is None else min(stop, head)
+        start = head if start is None else start
+        logs: List[Any] = []
+        while start <= end:
+            chunk_end = min(end, start + MAX_LOG_RANGE - 1)
+            query = dict(spec, fromBlock=hex(start), toBlock=hex(chunk_end))
+            response = self._send(endpoint, "eth_getLogs", [query])
+            if is_retryable_error(response.get("error")):
+                raise ConnectionError(f"eth_getLogs failed: {response['error']}")
+            if "error" in response:
+                return response, None
+            logs.extend(response.get("result") or [])
+            start = chunk_end + 1
+        return {"result": logs}, end
+
+    def _get_logs(self, spec: Dict[str, Any], start: Optional[int], stop: Optional[int]):
+        # the whole range comes from one endpoint; after a failure it is read again from the next
+        tried: List[Endpoint] = []
+        last_exc: Optional[Exception] = None
+        for _ in range(len(self.endpoints)):
+            ranked = self.ranked(exclude=tried)
+            if not ranked:
+                break
+            endpoint = ranked[0]
+            tried.append(endpoint)
+            try:
+                return self._logs_on(endpoint, spec, start, stop)
+            except Exception as e:
+                last_exc = e
+        raise last_exc or ConnectionError("no RPC endpoint available")
+
+    def _filter_changes(self, fid: str) -> Any:
+        with self._filter_lock:
+            f = self._filters.get(fid)
+        if f is None:
+            return {"error": {"code": -32000, "message": "filter not found"}}
+        # concurrent polls of one filter would otherwise deliver the same range twice
+        with f["poll_lock"]:
+            with self._filter_lock:
+                start = f["last"] + 1
+            response, end = self._get_logs(f["spec"], start, f["stop"])
+            if end is None:
+                # keep the cursor where it was so the next poll retries this range
+                return response
+            with self._filter_lock:
+                f["last"] = max(f["last"], end)
+            return response
+
+    def _filter_logs(self, fid: str) -> Any:
+        # every log since the filter's fromBlock; unlike eth_getFilterChanges the cursor stays put
+        with self._filter_lock:
+            f = self._filters.get(fid)
+        if f is None:
+            return {"error": {"code": -32000, "message": "filter not found"}}
+        response, _ = self._get_logs(f["spec"], f["first"], f["stop"])
+        return response
+
+    def _filter_method(self, method: str, params: Any) -> Dict[str, Any]:
+        if method == "eth_newFilter":
+            body = {"result": self._new_filter(params)}
+        elif method == "eth_uninstallFilter":
+            with self._filter_lock:
+                body = {"result": self._filters.pop(params[0], None) is not None}
+        elif method == "eth_getFilterLogs":
+            body = self._filter_logs(params[0])
+        else:
+            body = self._filter_changes(params[0])
+        return body
+
+    # ---- BaseProvider
+    def make_request(self, method, params):
+        with self._filter_lock:
+            self._next_id += 1
+            rid = self._next_id
+        if method in FILTER_METHODS:
+            body = self._filter_method(method, params)
+            return dict(body, jsonrpc="2.0", id=rid)
+        response = self._request(method, params)
+        return dict(response, id=rid)
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        for endpoint in self.ranked():
+            try:
+                if endpoint.provider.is_connected():
+                    return True
+            except Exception:
+                endpoint.record_failure()
+        return False
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        return [{
+            "endpoint": e.label,
+            "latency_ms": round(e.latency * 1000, 2),
+            "error_rate": round(e.error_rate, 4),
+            "healthy": e.healthy(now),
+            "score": round(e.score(), 4),
+        } for e in self.endpoints]
+
+    def _export_metrics(self):
+        for e in self.endpoints:
+            _ENDPOINT_LATENCY.labels(e.label).set(e.latency)
+            _ENDPOINT_ERROR_RATE.labels(e.label).set(e.error_rate)
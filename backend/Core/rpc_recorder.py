@@ -0,0 +1,146 @@
+"""Record-and-replay for JSON-RPC traffic.
+
+`RpcRecorder.middleware()` gives a web3 middleware that appends every
+request/response pair to a gzip JSON-lines file; `ReplayProvider` serves a
+recording back, either with the original per-call latency or none at all, so
+round trips and CPU time per pair can be compared run to run without a node.
+
+Each line is `{"m": method, "p": params, "r": result | "e": error, "t": ms}`.
+On load the file is indexed by (method, canonical params); repeated requests
+for the same key (eth_blockNumber, eth_getFilterChanges, ...) are served in
+the order they were recorded, and the last one is repeated once exhausted.
+"""
+import gzip
+import json
+import time
+import threading
+from collections import Counter
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from web3.middleware import Web3Middleware
+    from web3.providers.base import BaseProvider
+except Exception:
+    Web3Middleware = object
+    BaseProvider = object
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, Mapping):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def request_key(method: str, params: Any) -> str:
+    return method + ":" + json.dumps(_jsonable(params), sort_keys=True, separators=(",", ":"))
+
+
+class RpcRecorder:
+    def __init__(self, path: str, flush_every: int = 100):
+        self.path = path
+        self.flush_every = flush_every
+        self._fh = gzip.open(path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.recorded = 0
+
+    def record(self, method: str, params: Any, response: Dict[str, Any], elapsed: float):
+        entry = {"m": method, "p": _jsonable(params), "t": round(elapsed * 1000, 3)}
+        if "error" in response:
+            entry["e"] = _jsonable(response["error"])
+        else:
+            entry["r"] = _jsonable(response.get("result"))
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._fh.write(line)
+            self.recorded += 1
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._fh.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._fh.close()
+
+    def middleware(self):
+        """A Web3Middleware class bound to this recorder, for `middleware_onion.add`."""
+        recorder = self
+
+        class RecordingMiddleware(Web3Middleware):
+            def wrap_make_request(self, make_request):
+                def middleware(method, params):
+                    start = time.perf_counter()
+                    response = make_request(method, params)
+                    recorder.record(method, params, response, time.perf_counter() - start)
+                    return response
+
+                return middleware
+
+        return RecordingMiddleware
+
+
+def load_recording(path: str) -> Dict[str, List[Tuple[Dict[str, Any], float]]]:
+    index: Dict[str, List[Tuple[Dict[str, Any], float]]] = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            body = {"error": entry["e"]} if "e" in entry else {"result": entry.get("r")}
+            index.setdefault(request_key(entry["m"], entry.get("p")), []).append((body, entry.get("t", 0.0) / 1000.0))
+    return index
+
+
+class ReplayProvider(BaseProvider):
+    """Serve a recording made by RpcRecorder as a web3 provider.
+
+    `latency="original"` sleeps for each call's recorded duration,
+    `latency="zero"` answers immediately.
+    """
+
+    def __init__(self, path: str, latency: str = "zero"):
+        super().__init__()
+        self.path = path
+        self.latency = latency
+        self._index = load_recording(path)
+        self._cursor: Counter = Counter()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.calls: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def make_request(self, method, params):
+        key = request_key(method, params)
+        with self._lock:
+            self._next_id += 1
+            rid = self._next_id
+            self.calls[method] += 1
+            entries = self._index.get(key)
+            if not entries:
+                self.misses[method] += 1
+                body, delay = {"error": {"code": -32000, "message": f"{method} not in recording"}}, 0.0
+            else:
+                i = min(self._cursor[key], len(entries) - 1)
+                self._cursor[key] += 1
+                body, delay = entries[i]
+        if self.latency == "original" and delay:
+            time.sleep(delay)
+        return dict(body, jsonrpc="2.0", id=rid)
+
+    def has(self, method: str, params: Any) -> bool:
+        return request_key(method, params) in self._index
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._cursor.clear()
+            self.calls.clear()
+            self.misses.clear()
@@ -1,4 +1,6 @@
 import json
+import threading
+from collections import OrderedDict
 from web3 import Web3
 
 ERC20_ABI = json.loads("""
@@ -9,12 +11,47 @@ ERC20_ABI = json.loads("""
 ]
 """)
 
-def get_token_info(web3: Web3, token_address: str):
+# name/symbol/decimals never change; per-process LRU so WETH (and tokens seen
+# again on rechecks or in other pairs) cost no calls after the first lookup.
+# Keyed by (chain_id, address): the same address is a different token on another chain.
+_INFO_CACHE_SIZE = 50000
+_info_cache = OrderedDict()
+_info_lock = threading.Lock()
+
+def cached_token_info(token_address: str, chain_id: int = 1):
+    """Cached metadata of the token, or None if it hasn't been fetched (successfully) yet."""
+    key = (chain_id, token_address.lower())
+    with _info_lock:
+        info = _info_cache.get(key)
+        if info is None:
+            return None
+        _info_cache.move_to_end(key)
+        return dict(info)
+
+def remember_token_info(info, chain_id: int = 1):
+    # failed lookups (the "Unknown" fallback) are retried next time
+    if info.get("symbol") == "UNK":
+        return
+    with _info_lock:
+        _info_cache[(chain_id, info["address"].lower())] = info
+        while len(_info_cache) > _INFO_CACHE_SIZE:
+            _info_cache.popitem(last=False)
+
+def get_token_info(web3: Web3, token_address: str, chain_id: int = 1, block_identifier="latest"):
+    info = cached_token_info(token_address, chain_id)
+    if info is not None:
+        return info
+    # pinned lookups of the same token (analyses of one block) share their calls via the call cache
+    info = _fetch_token_info(web3, token_address, block_identifier)
+    remember_token_info(info, chain_id)
+    return dict(info)
+
+def _fetch_token_info(web3: Web3, token_address: str, block_identifier="latest"):
     token_contract = web3.eth.contract(address=token_address, abi=ERC20_ABI)
     try:
-        name = token_contract.functions.name().call()
-        symbol = token_contract.functions.symbol().call()
-        decimals = token_contract.functions.decimals().call()
+        name = token_contract.functions.name().call(block_identifier=block_identifier)
+        symbol = token_contract.functions.symbol().call(block_identifier=block_identifier)
+        decimals = token_contract.functions.decimals().call(block_identifier=block_identifier)
         return {
               "address": token_address,
               "name": name,
@@ -18,21 +18,28 @@ def create_app():
 		# fastapi isn't available in this environment; defer creation.
 		return None
 
-	# Lifespan manager: start blockchain listener thread on startup and close DB on shutdown.
+	# Lifespan manager: initialize the app context and start the blockchain listener
+	# thread on startup, close DB on shutdown.
 	@asynccontextmanager
 	async def lifespan(app):
 		# Delay importing runtime pieces so importing this package stays lightweight.
 		try:
-			# web_server exposes run_blockchain_listener and client
-			from web_server import run_blockchain_listener, client
+			# web_server exposes run_listeners (one pipeline per configured chain) and the
+			# app context; importing it has no side effects
+			from web_server import run_listeners, context
 		except Exception:
-			run_blockchain_listener = None
-			client = None
+			run_listeners = None
+			context = None
+
+		if context is not None:
+			# Mongo, indexes and the watchlist come up in the background so the app
+			# serves requests (health checks included) right away
+			context.start()
 
 		listener_thread = None
-		if run_blockchain_listener is not None:
+		if run_listeners is not None:
 			try:
-				listener_thread = threading.Thread(target=run_blockchain_listener, daemon=True)
+				listener_thread = threading.Thread(target=run_listeners, daemon=True)
 				listener_thread.start()
 			except Exception:
 				# If starting the listener fails, continue — status_messages will capture errors.
@@ -42,12 +49,8 @@ def create_app():
 			yield
 		finally:
 			print("Shutting down...")
-			if client is not None:
-				try:
-					client.close()
-					print("MongoDB client closed.")
-				except Exception:
-					pass
+			if context is not None:
+				context.close()
 
 	# Create FastAPI app with lifespan for startup/shutdown
 	app = FastAPI(title="eth_bot API", lifespan=lifespan)
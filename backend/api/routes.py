@@ -10,14 +10,28 @@ except Exception:
 
 import threading
 import os
-from typing import Optional, Any
+import re
+from typing import Optional, Any, List
 
 # Create router only if FastAPI is available; keep router=None otherwise so imports are safe.
 router = APIRouter(prefix="/api") if APIRouter is not None else None
 
 if router is not None:
-    # Import runtime state lazily to avoid pulling optional deps (passlib, web3)
-    from web_server import auth_manager, wl_manager, web3_instance, tracked_tokens, wallet_tracker_threads, wallet_alerts, WATCHLIST
+    # Runtime state is looked up per request: importing web_server (and building the
+    # auth/watchlist managers, which connects to Mongo) is deferred to first use
+    def _context():
+        from web_server import context
+        return context
+
+    def _auth():
+        return _context().auth_manager
+
+    def _watchlists():
+        return _context().wl_manager
+
+    def _state():
+        import web_server
+        return web_server
     try:
         from fastapi.responses import JSONResponse
     except Exception:
@@ -31,10 +45,10 @@ if router is not None:
     @router.post("/register")
     def register(u: UserRegister):
         try:
-            auth_manager.register_user(u.username, u.password)
-            print(f"[auth] register: username={u.username} users_collection={'yes' if auth_manager.users_collection is not None else 'no'}")
+            _auth().register_user(u.username, u.password)
+            print(f"[auth] register: username={u.username} users_collection={'yes' if _auth().users_collection is not None else 'no'}")
             # return access token so client can use it immediately
-            token = auth_manager.create_access_token(u.username)
+            token = _auth().create_access_token(u.username)
             print(f"[auth] register: created token for {u.username} -> {bool(token)}")
             return {"access_token": token, "token_type": "bearer"}
         except ValueError as e:
@@ -82,7 +96,7 @@ if router is not None:
             raise HTTPException(status_code=400, detail="No credentials provided")
 
         print(f"[auth] login attempt user={user}")
-        token = auth_manager.authenticate(user, pw)
+        token = _auth().authenticate(user, pw)
         print(f"[auth] login result for {user}: {'OK' if token else 'INVALID'}")
 
         if not token:
@@ -91,21 +105,30 @@ if router is not None:
         return JSONResponse({"access_token": token, "token_type": "bearer"})
 
 
+    @router.post("/logout")
+    def logout(authorization: str = Header(None)):
+        token = _auth().token_from_auth_header(authorization)
+        if not token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        _auth().revoke_token(token)
+        return {"logged_out": True}
+
+
     @router.get("/watchlist")
     def read_watchlist(authorization: str = Header(None)):
-        user = auth_manager.get_username_from_auth_header(authorization)
+        user = _auth().get_username_from_auth_header(authorization)
         if user:
-            return {"watchlist": wl_manager.get_user_watchlist(user)}
-        return {"watchlist": WATCHLIST}
+            return {"watchlist": _watchlists().get_user_watchlist(user)}
+        return {"watchlist": sorted(_state().WATCHLIST)}
 
 
     @router.get("/me")
     def me(authorization: str = Header(None)):
-        user = auth_manager.get_username_from_auth_header(authorization)
+        user = _auth().get_username_from_auth_header(authorization)
         if not user:
             raise HTTPException(status_code=401, detail="Not authenticated")
         try:
-            uwl = wl_manager.get_user_watchlist(user)
+            uwl = _watchlists().get_user_watchlist(user)
         except Exception:
             uwl = []
         return {"username": user, "watchlist": uwl}
@@ -115,13 +138,18 @@ if router is not None:
     def _ping():
         # lightweight diagnostic endpoint to confirm the API returns JSON on the deployed host
         try:
+            ctx = _context()
+            auth = ctx.peek_auth_manager()
             info = {
                 "ok": True,
                 "mongo_env_set": bool(os.getenv("MONGO_URI")),
-                "web3_provider_set": bool(os.getenv("WEB3_PROVIDER")),
+                "web3_provider_set": bool(os.getenv("WEB3_PROVIDERS") or os.getenv("WEB3_PROVIDER")),
                 # pymongo Collection doesn't support truth testing; compare to None explicitly
-                "users_collection_present": (getattr(auth_manager, 'users_collection', None) is not None),
-                "watchlist_count": len(WATCHLIST) if WATCHLIST is not None else 0,
+                # never waits for Mongo: a health check must answer while it is down or still connecting
+                "mongo": ctx.mongo_state,
+                "users_collection_present": ctx.users_collection is not None,
+                "watchlist_count": len(ctx.watchlist_index),
+                "auth_token_cache": auth.token_cache_stats() if auth is not None else None,
             }
         except Exception as e:
             info = {"ok": False, "error": str(e)}
@@ -132,36 +160,38 @@ if router is not None:
     def add_watchlist(address: str, authorization: str = Header(None)):
         try:
             addr = address.lower()
-            user = auth_manager.get_username_from_auth_header(authorization)
+            user = _auth().get_username_from_auth_header(authorization)
             if user:
-                wl = wl_manager.add_user_watchlist(user, addr)
+                wl = _watchlists().add_user_watchlist(user, addr)
                 return {"watchlist": wl, "added": True}
 
-            wl = wl_manager.get_global_watchlist()
-            if addr in wl:
-                return {"watchlist": wl, "added": False}
-            wl.append(addr)
-            wl_manager.save_global_watchlist(wl)
+            previous = _watchlists().get_global_watchlist()
+            if addr in previous:
+                return {"watchlist": previous, "added": False}
+            wl = previous + [addr]
+            _watchlists().save_global_watchlist(wl, previous=previous)
 
             try:
+                state = _state()
+                web3_instance = state.web3_instance
                 if web3_instance is not None:
                     # lazy import to avoid failing at module import when web3 or dependencies are missing
                     try:
                         from backend.Core.wallet_tracker import WalletTracker as _WalletTracker
                     except Exception as e:
                         _WalletTracker = None
-                        wallet_alerts.append(f"WalletTracker import failed (deferred): {e}")
+                        state.wallet_alerts.append(f"WalletTracker import failed (deferred): {e}")
 
                     if _WalletTracker is not None:
-                        wallet_tracker = _WalletTracker(web3_instance, set(tracked_tokens), wl)
+                        wallet_tracker = _WalletTracker(web3_instance, set(state.tracked_tokens), wl)
                         t = threading.Thread(target=wallet_tracker.run, daemon=True)
                         t.start()
-                        wallet_tracker_threads.append(t)
-                        wallet_alerts.append(f"Started wallet tracker for {addr}")
+                        state.wallet_tracker_threads.append(t)
+                        state.wallet_alerts.append(f"Started wallet tracker for {addr}")
                     else:
-                        wallet_alerts.append(f"WalletTracker not available; skipped start for {addr}")
+                        state.wallet_alerts.append(f"WalletTracker not available; skipped start for {addr}")
             except Exception as e:
-                wallet_alerts.append(f"Failed to start wallet tracker for {addr}: {e}")
+                _state().wallet_alerts.append(f"Failed to start wallet tracker for {addr}: {e}")
 
             return {"watchlist": wl, "added": True}
         except Exception as e:
@@ -176,17 +206,17 @@ if router is not None:
     def remove_watchlist(address: str, authorization: str = Header(None)):
         try:
             addr = address.lower()
-            user = auth_manager.get_username_from_auth_header(authorization)
+            user = _auth().get_username_from_auth_header(authorization)
             if user:
-                wl = wl_manager.remove_user_watchlist(user, addr)
+                wl = _watchlists().remove_user_watchlist(user, addr)
                 return {"watchlist": wl, "removed": True}
 
-            wl = wl_manager.get_global_watchlist()
-            if addr not in wl:
-                return {"watchlist": wl, "removed": False}
-            wl = [a for a in wl if a != addr]
-            wl_manager.save_global_watchlist(wl)
-            wallet_alerts.append(f"Removed {addr} from watchlist")
+            previous = _watchlists().get_global_watchlist()
+            if addr not in previous:
+                return {"watchlist": previous, "removed": False}
+            wl = [a for a in previous if a != addr]
+            _watchlists().save_global_watchlist(wl, previous=previous)
+            _state().wallet_alerts.append(f"Removed {addr} from watchlist")
             return {"watchlist": wl, "removed": True}
         except Exception as e:
             print(f"Error in remove_watchlist: {e}")
@@ -195,6 +225,37 @@ if router is not None:
             raise
 
 
+    ADDRESS_RE = re.compile(r"^0x[0-9a-f]{40}$")
+    MAX_BULK_ADDRESSES = 50000
+
+    class BulkWatchlist(BaseModel):
+        addresses: List[str]
+
+
+    @router.post("/watchlist/bulk")
+    def bulk_add_watchlist(body: BulkWatchlist, authorization: str = Header(None)):
+        if len(body.addresses) > MAX_BULK_ADDRESSES:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ADDRESSES} addresses per request")
+        valid, invalid = [], []
+        for a in body.addresses:
+            a = (a or "").strip().lower()
+            (valid if ADDRESS_RE.match(a) else invalid).append(a)
+        try:
+            user = _auth().get_username_from_auth_header(authorization)
+            if user:
+                wl = _watchlists().add_user_watchlist_bulk(user, valid)
+                return {"watchlist_count": len(wl), "submitted": len(valid), "invalid": invalid}
+            added = _watchlists().add_global_addresses(valid)
+            if added:
+                _state().wallet_alerts.append(f"Imported {len(added)} addresses into watchlist")
+            return {"watchlist_count": len(_state().WATCHLIST), "added": len(added), "submitted": len(valid), "invalid": invalid}
+        except Exception as e:
+            print(f"Error in bulk_add_watchlist: {e}")
+            if JSONResponse is not None:
+                return JSONResponse(status_code=500, content={"error": str(e)})
+            raise
+
+
     # include token-related routes implemented in token_routes.py
     try:
         # import token_routes at runtime so it's created when FastAPI is available
@@ -8,8 +8,13 @@ without FastAPI/pymongo/web3.
 
 try:
     from fastapi import APIRouter, Query, HTTPException
+    from fastapi.responses import StreamingResponse
+    from pydantic import BaseModel
     from typing import List, Dict, Any, Optional
     from datetime import datetime, timezone
+    import os
+    import re
+    import json
     import time
 
     router = APIRouter()
@@ -22,16 +27,125 @@ try:
             return Exception, Exception
 
 
+    def _verdict(value: Any) -> Optional[bool]:
+        # None: not checked (lite analysis) or the check failed; served as null, never as false
+        return None if value is None else bool(value)
+
+    def _analysis_fields(doc: Dict[str, Any]) -> Dict[str, Any]:
+        level = str(doc.get("analysis_level") or "full")
+        return {"analysis_level": level, "needs_full_analysis": bool(doc.get("needs_full_analysis", level == "lite")),
+                # "deployer": honeypot inferred from the deployer's history, never simulated
+                "deployer_flagged": bool(doc.get("deployer_flagged", level == "deployer")),
+                "honeypot_source": doc.get("honeypot_source")}
+
+
+    _Q_ADDRESS_FIELDS = ("address", "token0_info.address", "token1_info.address")
+    _Q_FIELDS = _Q_ADDRESS_FIELDS + ("token0_info.name", "token1_info.name", "token0_info.symbol",
+                                     "token1_info.symbol")
+
+    def _q_filter(q: str) -> Dict[str, Any]:
+        """Mongo filter for `q`. A hex prefix ("0x3f2a") matches the start of the token and pair
+        token addresses, with the event address taken from the search index when it has a match;
+        anything else is a case-insensitive regex (substring) over the addresses, names and
+        symbols. EventArchive.query applies the same split."""
+        from backend.search_index import is_address_prefix
+        if is_address_prefix(q):
+            from web_server import search_index
+            prefix = {"$regex": "^" + re.escape(q.strip()), "$options": "i"}
+            candidates = search_index.candidates(q)
+            if candidates is None:
+                # no match may only mean the index hasn't pulled the event yet
+                return {"$or": [{field: prefix} for field in _Q_ADDRESS_FIELDS]}
+            return {"$or": [{"address": {"$in": candidates}}] +
+                           [{field: prefix} for field in _Q_ADDRESS_FIELDS[1:]]}
+        regex = {"$regex": q, "$options": "i"}
+        return {"$or": [{field: regex} for field in _Q_FIELDS]}
+
+    def _q_matches(e: Dict[str, Any], q: str) -> bool:
+        """In-memory counterpart of _q_filter."""
+        from backend.search_index import is_address_prefix
+        if is_address_prefix(q):
+            fields = _Q_ADDRESS_FIELDS
+            pattern = re.compile("^" + re.escape(q.strip()), re.IGNORECASE)
+        else:
+            fields = _Q_FIELDS
+            try:
+                pattern = re.compile(q, re.IGNORECASE)
+            except re.error:
+                pattern = re.compile(re.escape(q), re.IGNORECASE)
+        for field in fields:
+            parent, _, key = field.rpartition(".")
+            value = (e.get(parent) or {}).get(key, "") if parent else e.get(key, "")
+            if pattern.search(str(value)):
+                return True
+        return False
+
+
+    def _with_archived(docs: List[Dict[str, Any]], limit: int, start_s: Optional[int] = None,
+                       end_s: Optional[int] = None, **filters) -> List[Dict[str, Any]]:
+        """Newest-first hot results merged with the archived events (ARCHIVE_AFTER_DAYS) matching them."""
+        from backend.archive import get_archive, merge_newest
+        archive = get_archive()
+        if archive is None:
+            return docs
+        if len(docs) >= limit:
+            # the hot results fill the page; only archived events newer than them matter
+            start_s = max(start_s or 0, int(docs[-1].get("timestamp", 0)))
+        archived = archive.query(start_s, end_s, limit=limit, **filters)
+        return merge_newest(docs, archived, limit)
+
+
+    @router.get("/search")
+    def search_tokens(
+        prefix: str = Query(..., description="start of a token symbol, name word or address"),
+        limit: int = Query(10, ge=1, le=20, description="max results"),
+        chain_id: Optional[int] = Query(None, description="only tokens from this chain (1 = Ethereum)"),
+    ):
+        from web_server import search_index
+        started = time.perf_counter()
+        results = search_index.search(prefix, limit=limit, chain_id=chain_id)
+        return {
+            "results": [dict(r, timestamp=int(r["timestamp"]) * 1000) for r in results],
+            "ready": search_index.ready,
+            "took_us": round((time.perf_counter() - started) * 1e6, 1),
+        }
+
+
     @router.get("/status")
     def get_status():
         from web_server import status_messages
         return {"status": status_messages[-1] if status_messages else "No status yet."}
 
 
+    @router.get("/status/history")
+    def get_status_history(
+        since: int = Query(0, description="return only messages with seq greater than this"),
+        limit: Optional[int] = Query(None, ge=1, description="max results (newest kept)"),
+    ):
+        from web_server import status_messages
+        entries = status_messages.since(since, limit)
+        return {"entries": entries, "last_seq": status_messages.last_seq}
+
+
     @router.get("/wallet_alerts")
-    def get_wallet_alerts():
+    def get_wallet_alerts(
+        since: int = Query(0, description="return only alerts with seq greater than this"),
+        limit: Optional[int] = Query(None, ge=1, description="max results (newest kept)"),
+    ):
         from web_server import wallet_alerts
-        return {"wallet_alerts": wallet_alerts}
+        entries = wallet_alerts.since(since, limit)
+        return {
+            "wallet_alerts": [e["message"] for e in entries],
+            "entries": entries,
+            "last_seq": wallet_alerts.last_seq,
+        }
+
+
+    @router.get("/metrics")
+    def get_metrics():
+        from fastapi.responses import PlainTextResponse
+        from backend.metrics import render
+        return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
 
 
     @router.get("/token_events")
@@ -42,6 +156,7 @@ try:
         ownership: Optional[bool] = Query(None, description="ownership renounced true/false"),
         start_ms: Optional[int] = Query(None, description="start time in ms since epoch"),
         end_ms: Optional[int] = Query(None, description="end time in ms since epoch"),
+        chain_id: Optional[int] = Query(None, description="only events from this chain (1 = Ethereum)"),
         limit: int = Query(200, description="max results"),
     ):
         PSE, PME = _get_pymongo_exceptions()
@@ -65,6 +180,8 @@ try:
                 query: Dict[str, Any] = {"timestamp": {"$gte": start_of_day}}
                 if end_of_day is not None:
                     query["timestamp"]["$lte"] = end_of_day
+                if chain_id is not None:
+                    query["chain_id"] = int(chain_id)
                 if honeypot is not None:
                     query["honeypot"] = bool(honeypot)
                 if min_liquidity is not None:
@@ -72,24 +189,22 @@ try:
                 if ownership is not None:
                     query["ownership_renounced"] = bool(ownership)
                 if q:
-                    regex = {"$regex": q, "$options": "i"}
-                    query["$or"] = [
-                        {"address": regex},
-                        {"token0_info.address": regex},
-                        {"token1_info.address": regex},
-                        {"token0_info.name": regex},
-                        {"token1_info.name": regex},
-                        {"token0_info.symbol": regex},
-                        {"token1_info.symbol": regex},
-                    ]
+                    query.update(_q_filter(q))
 
                 fields = {
                     "_id": 0,
+                    "chain_id": 1,
                     "timestamp": 1,
                     "address": 1,
+                    "tx_hash": 1,
+                    "log_index": 1,
                     "liquidity_eth": 1,
                     "honeypot": 1,
                     "ownership_renounced": 1,
+                    "analysis_level": 1,
+                    "needs_full_analysis": 1,
+                    "deployer_flagged": 1,
+                    "honeypot_source": 1,
                     "token0_info": 1,
                     "token1_info": 1,
                 }
@@ -101,40 +216,33 @@ try:
                         continue
                     if end_of_day is not None and ts > end_of_day:
                         continue
-                    if honeypot is not None and bool(e.get("honeypot", False)) != bool(honeypot):
+                    if chain_id is not None and int(e.get("chain_id", 1)) != int(chain_id):
+                        continue
+                    if honeypot is not None and _verdict(e.get("honeypot")) != bool(honeypot):
                         continue
                     if min_liquidity is not None and float(e.get("liquidity_eth", 0.0)) < float(min_liquidity):
                         continue
-                    if ownership is not None and bool(e.get("ownership_renounced", False)) != bool(ownership):
+                    if ownership is not None and _verdict(e.get("ownership_renounced")) != bool(ownership):
+                        continue
+                    if q and not _q_matches(e, q):
                         continue
-                    if q:
-                        ql = q.lower()
-                        found = False
-                        for val in [
-                            str(e.get("address", "")),
-                            str((e.get("token0_info") or {}).get("address", "")),
-                            str((e.get("token1_info") or {}).get("address", "")),
-                            str((e.get("token0_info") or {}).get("name", "")),
-                            str((e.get("token1_info") or {}).get("name", "")),
-                            str((e.get("token0_info") or {}).get("symbol", "")),
-                            str((e.get("token1_info") or {}).get("symbol", "")),
-                        ]:
-                            if ql in val.lower():
-                                found = True
-                                break
-                        if not found:
-                            continue
                     docs.append(e)
                 docs = sorted(docs, key=lambda x: int(x.get("timestamp", 0)), reverse=True)[:limit]
 
+            # a start_ms (or an ARCHIVE_AFTER_DAYS under a day) can reach into the archive
+            docs = _with_archived(docs, limit, start_of_day, end_of_day, chain_id=chain_id, honeypot=honeypot,
+                                  min_liquidity=min_liquidity, ownership=ownership, q=q)
+
             safe = []
             for d in docs:
                 safe.append({
+                    "chain_id": int(d.get("chain_id", 1)),
                     "timestamp": int(d.get("timestamp", 0)) * 1000,
                     "address": str(d.get("address", "")),
                     "liquidity_eth": float(d.get("liquidity_eth", 0.0)),
-                    "honeypot": bool(d.get("honeypot", False)),
-                    "ownership_renounced": bool(d.get("ownership_renounced", False)),
+                    "honeypot": _verdict(d.get("honeypot")),
+                    "ownership_renounced": _verdict(d.get("ownership_renounced")),
+                    **_analysis_fields(d),
                     "token0": d.get("token0_info") or {},
                     "token1": d.get("token1_info") or {},
                 })
@@ -145,14 +253,17 @@ try:
                 from web_server import status_messages, token_events as _token_events
                 status_messages.append(f"Mongo error or handler failure: {e}")
                 safe_mem = [{
+                    "chain_id": int(ev.get("chain_id", 1)),
                     "timestamp": int(ev.get("timestamp", 0)) * 1000,
                     "address": str(ev.get("address", "")),
                     "liquidity_eth": float(ev.get("liquidity_eth", 0.0)),
-                    "honeypot": bool(ev.get("honeypot", False)),
-                    "ownership_renounced": bool(ev.get("ownership_renounced", False)),
+                    "honeypot": _verdict(ev.get("honeypot")),
+                    "ownership_renounced": _verdict(ev.get("ownership_renounced")),
+                    **_analysis_fields(ev),
                     "token0": ev.get("token0_info") or {},
                     "token1": ev.get("token1_info") or {},
-                } for ev in _token_events]
+                } for ev in _token_events
+                    if chain_id is None or int(ev.get("chain_id", 1)) == int(chain_id)]
                 return {"token_events": safe_mem}
             except Exception:
                 raise HTTPException(status_code=500, detail=f"/api/token_events failed: {e}")
@@ -166,6 +277,7 @@ try:
         ownership: Optional[bool] = Query(None, description="ownership renounced true/false"),
         start_ms: Optional[int] = Query(None, description="start time in ms since epoch"),
         end_ms: Optional[int] = Query(None, description="end time in ms since epoch"),
+        chain_id: Optional[int] = Query(None, description="only events from this chain (1 = Ethereum)"),
         limit: int = Query(500, description="max results"),
     ):
         try:
@@ -173,6 +285,8 @@ try:
             docs: List[Dict[str, Any]] = []
             if token_collection is not None:
                 query: Dict[str, Any] = {}
+                if chain_id is not None:
+                    query["chain_id"] = int(chain_id)
                 if honeypot is not None:
                     query["honeypot"] = bool(honeypot)
                 if min_liquidity is not None:
@@ -186,69 +300,61 @@ try:
                     if end_ms is not None:
                         query["timestamp"]["$lte"] = int(end_ms // 1000)
                 if q:
-                    regex = {"$regex": q, "$options": "i"}
-                    query["$or"] = [
-                        {"address": regex},
-                        {"token0_info.address": regex},
-                        {"token1_info.address": regex},
-                        {"token0_info.name": regex},
-                        {"token1_info.name": regex},
-                        {"token0_info.symbol": regex},
-                        {"token1_info.symbol": regex},
-                    ]
+                    query.update(_q_filter(q))
 
                 fields = {
                     "_id": 0,
+                    "chain_id": 1,
                     "timestamp": 1,
                     "liquidity_eth": 1,
                     "honeypot": 1,
                     "ownership_renounced": 1,
+                    "analysis_level": 1,
+                    "needs_full_analysis": 1,
+                    "deployer_flagged": 1,
+                    "honeypot_source": 1,
                     "token0_info": 1,
                     "token1_info": 1,
                     "address": 1,
+                    "tx_hash": 1,
+                    "log_index": 1,
                 }
                 docs = list(token_collection.find(query, fields).sort("timestamp", -1).limit(limit))
             else:
                 for e in token_events:
-                    if honeypot is not None and bool(e.get("honeypot", False)) != bool(honeypot):
+                    if chain_id is not None and int(e.get("chain_id", 1)) != int(chain_id):
+                        continue
+                    if honeypot is not None and _verdict(e.get("honeypot")) != bool(honeypot):
                         continue
                     if min_liquidity is not None and float(e.get("liquidity_eth", 0.0)) < float(min_liquidity):
                         continue
-                    if ownership is not None and bool(e.get("ownership_renounced", False)) != bool(ownership):
+                    if ownership is not None and _verdict(e.get("ownership_renounced")) != bool(ownership):
                         continue
                     if start_ms is not None and int(e.get("timestamp", 0)) * 1000 < start_ms:
                         continue
                     if end_ms is not None and int(e.get("timestamp", 0)) * 1000 > end_ms:
                         continue
-                    if q:
-                        ql = q.lower()
-                        found = False
-                        for val in [
-                            str(e.get("address", "")),
-                            str((e.get("token0_info") or {}).get("address", "")),
-                            str((e.get("token1_info") or {}).get("address", "")),
-                            str((e.get("token0_info") or {}).get("name", "")),
-                            str((e.get("token1_info") or {}).get("name", "")),
-                            str((e.get("token0_info") or {}).get("symbol", "")),
-                            str((e.get("token1_info") or {}).get("symbol", "")),
-                        ]:
-                            if ql in val.lower():
-                                found = True
-                                break
-                            if not found:
-                                continue
+                    if q and not _q_matches(e, q):
+                        continue
                     docs.append(e)
                 docs = sorted(docs, key=lambda x: int(x.get("timestamp", 0)), reverse=True)[:limit]
 
+            # ARCHIVE_AFTER_DAYS: events older than the hot window live in Parquet files
+            docs = _with_archived(docs, limit, int(start_ms // 1000) if start_ms is not None else None,
+                                  int(end_ms // 1000) if end_ms is not None else None, chain_id=chain_id,
+                                  honeypot=honeypot, min_liquidity=min_liquidity, ownership=ownership, q=q)
+
             out = []
             for e in docs:
                 t0 = e.get("token0_info") or e.get("token0") or {}
                 t1 = e.get("token1_info") or e.get("token1") or {}
                 out.append({
+                    "chain_id": int(e.get("chain_id", 1)),
                     "timestamp": int(e.get("timestamp", 0)) * 1000,
                     "liquidity_eth": float(e.get("liquidity_eth", 0.0)),
-                    "honeypot": bool(e.get("honeypot", False)),
-                    "ownership_renounced": bool(e.get("ownership_renounced", False)),
+                    "honeypot": _verdict(e.get("honeypot")),
+                    "ownership_renounced": _verdict(e.get("ownership_renounced")),
+                    **_analysis_fields(e),
                     "token0": {
                         "name": str(t0.get("name", "")),
                         "symbol": str(t0.get("symbol", "")),
@@ -272,15 +378,27 @@ try:
 
 
     @router.get("/token/{address}")
-    def get_token_detail(address: str):
+    def get_token_detail(
+        address: str,
+        chain_id: Optional[int] = Query(None, description="chain the token lives on (1 = Ethereum)"),
+    ):
         try:
             addr = address.lower()
             from web_server import token_collection, token_events
             if token_collection is not None:
-                doc = token_collection.find_one({"address": {"$regex": f"^{addr}$", "$options": "i"}}, {"_id": 0})
+                query: Dict[str, Any] = {"address": {"$regex": f"^{addr}$", "$options": "i"}}
+                if chain_id is not None:
+                    query["chain_id"] = int(chain_id)
+                doc = token_collection.find_one(query, {"_id": 0})
             else:
-                doc = next((e for e in token_events if str(e.get("address", "")).lower() == addr), None)
+                doc = next((e for e in token_events if str(e.get("address", "")).lower() == addr
+                            and (chain_id is None or int(e.get("chain_id", 1)) == int(chain_id))), None)
 
+            if not doc:
+                # ARCHIVE_AFTER_DAYS: older events were moved out of Mongo
+                from backend.archive import get_archive
+                archive = get_archive()
+                doc = archive.find(addr, chain_id) if archive is not None else None
             if not doc:
                 raise HTTPException(status_code=404, detail="Token not found")
 
@@ -288,12 +406,14 @@ try:
             t1 = doc.get("token1_info") or doc.get("token1") or {}
 
             return {
+                "chain_id": int(doc.get("chain_id", 1)),
                 "timestamp": int(doc.get("timestamp", 0)) * 1000,
                 "address": str(doc.get("address", "")),
                 "pair_address": str(doc.get("pair_address", "")),
                 "liquidity_eth": float(doc.get("liquidity_eth", 0.0)),
-                "honeypot": bool(doc.get("honeypot", False)),
-                "ownership_renounced": bool(doc.get("ownership_renounced", False)),
+                "honeypot": _verdict(doc.get("honeypot")),
+                "ownership_renounced": _verdict(doc.get("ownership_renounced")),
+                **_analysis_fields(doc),
                 "token0": {"name": str(t0.get("name", "")), "symbol": str(t0.get("symbol", "")), "address": str(t0.get("address", ""))},
                 "token1": {"name": str(t1.get("name", "")), "symbol": str(t1.get("symbol", "")), "address": str(t1.get("address", ""))},
                 "raw": doc,
@@ -303,6 +423,74 @@ try:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"/api/token/{address} failed: {e}")
 
+
+    @router.get("/deployer/{address}")
+    def get_deployer_profile(
+        address: str,
+        chain_id: int = Query(1, description="chain the deployer launched on (1 = Ethereum)"),
+        samples: bool = Query(False, description="include the recent liquidity samples"),
+    ):
+        from web_server import context
+        profiles = context.deployer_profiles
+        profile = profiles.get(address, chain_id)
+        if not profile:
+            raise HTTPException(status_code=404, detail="Deployer not found")
+        out = {k: v for k, v in profile.items() if k != "_id" and (samples or k != "liquidity_samples")}
+        launches = int(profile.get("launches", 0))
+        out["honeypot_rate"] = round(profile.get("honeypots", 0) / launches, 4) if launches else 0.0
+        out["known_bad"] = profiles.is_known_bad(address, chain_id)
+        for field in ("first_seen", "last_seen"):
+            if out.get(field):
+                out[field] = int(out[field]) * 1000
+        return out
+
+
+    ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+    MAX_ANALYZE_ADDRESSES = int(os.getenv("ANALYZE_MAX_ADDRESSES", "500"))
+
+    class AnalyzeRequest(BaseModel):
+        addresses: List[str]
+        chain_id: int = 1
+        # chunks analysed in parallel for this request (capped by ANALYZE_MAX_CONCURRENCY)
+        concurrency: Optional[int] = None
+
+
+    @router.post("/analyze")
+    def analyze_tokens(body: AnalyzeRequest):
+        """Analyse token or pair/pool addresses on demand; streams one JSON line per address
+        as results come in, then a summary line with "done": true."""
+        if len(body.addresses) > MAX_ANALYZE_ADDRESSES:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_ANALYZE_ADDRESSES} addresses per request")
+        valid, invalid = [], []
+        for a in body.addresses:
+            a = (a or "").strip()
+            (valid if ADDRESS_RE.match(a) else invalid).append(a)
+        import web_server
+        from backend.Core.analyzer.bulk import stream_analysis
+        try:
+            analyzer = web_server.bulk_analyzer(body.chain_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        concurrency = body.concurrency or int(os.getenv("ANALYZE_CONCURRENCY", "2"))
+        concurrency = max(1, min(concurrency, int(os.getenv("ANALYZE_MAX_CONCURRENCY", "4"))))
+        batch_size = int(os.getenv("ANALYZE_BATCH_SIZE", "25"))
+
+        def lines():
+            started = time.perf_counter()
+            counts = {"analyzed": 0, "cached": 0, "errors": len(invalid)}
+            for a in invalid:
+                yield json.dumps({"input": a, "error": "not an address"}) + "\n"
+            for result in stream_analysis(analyzer, valid, web_server.analysis_results,
+                                          concurrency=concurrency, batch_size=batch_size):
+                if "error" in result:
+                    counts["errors"] += 1
+                else:
+                    counts["cached" if result.get("cached") else "analyzed"] += 1
+                yield json.dumps(result, default=str) + "\n"
+            yield json.dumps(dict(counts, done=True, took_ms=round((time.perf_counter() - started) * 1000))) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 except Exception:
     # FastAPI or other imports failed; export router=None so package import is safe.
     router = None
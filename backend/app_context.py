@@ -0,0 +1,250 @@
+"""Process-wide resources (Mongo handles, auth and watchlist managers, the
+bytecode template cache), created on first use instead of at import.
+
+Importing `web_server` used to ping Mongo, build indexes, load the watchlist
+and construct the bcrypt context before anything else could run, so a cold
+start paid for all of it and a Mongo outage held up even health checks.
+`AppContext` does that work in `initialize()`, which the API lifespan starts
+in a background thread (`start()`) and the listener calls before ingesting.
+Accessing `auth_manager`, `wl_manager`, `code_templates` or
+`deployer_profiles` connects first if that hasn't happened yet; the plain
+collection attributes never block and stay None until Mongo is connected (or
+for good when it is unavailable).
+"""
+import os
+import threading
+from typing import Any, Optional
+
+from backend.ring_buffer import ensure_capped_collection
+
+
+def ensure_unique_index(collection):
+    """
+    Clean legacy docs with missing or null keys and ensure a UNIQUE SPARSE index
+    on (tx_hash, log_index). Sparse means docs missing either field are not
+    indexed, so they don't collide. Also prevent inserting nulls in code.
+    """
+    from pymongo import ASCENDING
+    from pymongo.errors import PyMongoError
+    try:
+        # Drop any previous partial or wrong index if it exists
+        try:
+            collection.drop_index("uniq_txhash_logindex")
+        except Exception:
+            pass
+
+        # 1) Remove legacy rows that would collide
+        cleanup_filter = {
+            "$or": [
+                {"tx_hash": {"$exists": False}},
+                {"log_index": {"$exists": False}},
+                {"tx_hash": None},
+                {"log_index": None},
+            ]
+        }
+        try:
+            removed = collection.delete_many(cleanup_filter).deleted_count
+            if removed:
+                print(f"Cleaned {removed} legacy docs without tx_hash/log_index")
+        except Exception as e:
+            print(f"Warning: cleanup failed (continuing): {e}")
+
+        #   Create UNIQUE SPARSE compound index
+        #    (Only documents that contain BOTH fields are indexed.
+        #     Missing fields are ignored; nulls would be indexed—so we cleaned them and we skip inserting nulls.)
+        collection.create_index(
+            [("tx_hash", ASCENDING), ("log_index", ASCENDING)],
+            unique=True,
+            name="uniq_txhash_logindex",
+            sparse=True,
+        )
+        print("Unique sparse index ensured on (tx_hash, log_index)")
+    except PyMongoError as e:
+        print(f"Index ensure warning: {e}")
+
+def ensure_chain_index(collection):
+    """Tag events stored before multi-chain support as mainnet; index chain_id and address."""
+    from pymongo import ASCENDING, DESCENDING
+    from pymongo.errors import PyMongoError
+    try:
+        tagged = collection.update_many({"chain_id": {"$exists": False}}, {"$set": {"chain_id": 1}}).modified_count
+        if tagged:
+            print(f"Tagged {tagged} legacy docs with chain_id=1")
+        collection.create_index([("chain_id", ASCENDING), ("timestamp", DESCENDING)], name="chain_timestamp")
+        # `q` searches resolve to address lists through the search index
+        collection.create_index([("address", ASCENDING)], name="address")
+    except PyMongoError as e:
+        print(f"Index ensure warning: {e}")
+
+
+class AppContext:
+    def __init__(self, watchlist_index, wallet_alerts=None, status_messages=None,
+                 mongo_uri: Optional[str] = None, db_name: Optional[str] = None):
+        self.watchlist_index = watchlist_index
+        self.wallet_alerts = wallet_alerts
+        self.status_messages = status_messages
+        self.mongo_uri = mongo_uri
+        self.db_name = db_name
+        self.client = self.db = self.token_collection = None
+        self.watchlist_collection = None
+        self.users_collection = None
+        # "pending" until connect() ran, then "connected", "unavailable" or "disabled"
+        self.mongo_state = "pending"
+        self._auth_manager = None
+        self._wl_manager = None
+        self._code_templates = None
+        self._deployer_profiles = None
+        self._connected = False
+        self._initialized = False
+        self._lock = threading.RLock()
+        self.ready = threading.Event()
+
+    def _status(self, msg: str):
+        print(msg)
+        if self.status_messages is not None:
+            self.status_messages.append(msg)
+
+    # ---- Mongo
+    def connect(self) -> bool:
+        """Connect to Mongo and ensure indexes once; True when Mongo is usable."""
+        with self._lock:
+            if self._connected:
+                return self.db is not None
+            self._connected = True
+            uri = self.mongo_uri or os.getenv("MONGO_URI")
+            if not uri:
+                print("MONGO_URI not set; running without Mongo")
+                self.mongo_state = "disabled"
+                return False
+            try:
+                # pymongo is imported only when Mongo is actually used
+                from pymongo import MongoClient, ASCENDING
+                client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+                client.admin.command("ping")  # fail fast if unreachable
+            except Exception as e:
+                self._status(f"Mongo unavailable, running without it: {e}")
+                self.mongo_state = "unavailable"
+                return False
+            self.client = client
+            self.db = client[self.db_name or os.getenv("MONGO_DB", "eth_bot_db")]
+            self.token_collection = self.db["token_events"]
+            # watchlist collection for persisted watchlist addresses
+            self.watchlist_collection = self.db["watchlist"]
+            self.users_collection = self.db["users"]
+            self.mongo_state = "connected"
+            print("Mongo connected")
+            try:
+                # Ensure index (do not crash if it fails)
+                ensure_unique_index(self.token_collection)
+                ensure_chain_index(self.token_collection)
+                if os.getenv("PERSIST_MESSAGES", "").lower() in ("1", "true", "yes"):
+                    self.wallet_alerts.attach_collection(
+                        ensure_capped_collection(self.db, "wallet_alerts", max_docs=self.wallet_alerts.capacity))
+                    self.status_messages.attach_collection(
+                        ensure_capped_collection(self.db, "status_messages", max_docs=self.status_messages.capacity))
+                try:
+                    # Ensure unique index on address for watchlist
+                    self.watchlist_collection.create_index([("address", ASCENDING)], unique=True,
+                                                           name="uniq_watchlist_address")
+                except Exception as e:
+                    print(f"Warning: could not ensure watchlist index: {e}")
+            except Exception as e:
+                # keep the collections; the connection itself succeeded
+                self._status(f"Mongo connected but index setup hit an issue: {e}")
+            return True
+
+    # ---- managers (built on first use, after connect())
+    @property
+    def auth_manager(self):
+        if self._auth_manager is None:
+            self.connect()
+            with self._lock:
+                if self._auth_manager is None:
+                    # passlib/jose are imported here, not when web_server is imported
+                    from backend.auth import AuthManager
+                    self._auth_manager = AuthManager(users_collection=self.users_collection,
+                                                     jwt_secret=os.getenv("JWT_SECRET"))
+        return self._auth_manager
+
+    @property
+    def wl_manager(self):
+        if self._wl_manager is None:
+            self.connect()
+            with self._lock:
+                if self._wl_manager is None:
+                    from backend.watchlist import WatchlistManager
+                    self._wl_manager = WatchlistManager(watchlist_collection=self.watchlist_collection,
+                                                        users_collection=self.users_collection,
+                                                        index=self.watchlist_index)
+        return self._wl_manager
+
+    @property
+    def code_templates(self):
+        """Bytecode-hash template cache of the default chain (None with CODE_TEMPLATES=0)."""
+        if self._code_templates is None and os.getenv("CODE_TEMPLATES", "1") != "0":
+            self.connect()
+            with self._lock:
+                if self._code_templates is None:
+                    self._code_templates = self.new_template_cache("code_templates")
+        return self._code_templates
+
+    @property
+    def deployer_profiles(self):
+        if self._deployer_profiles is None:
+            self.connect()
+            with self._lock:
+                if self._deployer_profiles is None:
+                    from backend.deployers import DeployerProfiles
+                    self._deployer_profiles = DeployerProfiles.from_env(
+                        self.db["deployer_profiles"] if self.db is not None else None)
+        return self._deployer_profiles
+
+    def new_template_cache(self, collection_name: str):
+        from backend.Core.code_templates import TemplateCache
+        cache = TemplateCache(self.db[collection_name] if self.db is not None else None,
+                              min_samples=int(os.getenv("CODE_TEMPLATE_MIN_SAMPLES", "3")))
+        cache.ensure_index()
+        return cache
+
+    def peek_auth_manager(self) -> Optional[Any]:
+        """The auth manager if something already built it (never builds it)."""
+        return self._auth_manager
+
+    # ---- lifecycle
+    def load_watchlist(self):
+        # load the global and per-user watchlists into the shared index
+        try:
+            self.wl_manager.load_index()
+        except Exception as e:
+            print(f"Warning: failed to load watchlist (fallback to empty): {e}")
+            self.watchlist_index.set_global([])
+
+    def initialize(self) -> "AppContext":
+        """Connect, load the watchlist and follow its changes; runs once."""
+        with self._lock:
+            if self._initialized:
+                return self
+            self._initialized = True
+            self.connect()
+            self.load_watchlist()
+            # follow changes made by other processes when change streams are available
+            self.wl_manager.watch_changes()
+        self.ready.set()
+        return self
+
+    def start(self) -> threading.Thread:
+        """initialize() in a background thread so startup isn't held up by Mongo."""
+        t = threading.Thread(target=self.initialize, daemon=True, name="app-context-init")
+        t.start()
+        return t
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self.ready.wait(timeout)
+
+    def close(self):
+        if self.client is not None:
+            try:
+                self.client.close()
+                print("MongoDB client closed.")
+            except Exception:
+                pass
@@ -0,0 +1,331 @@
+"""Columnar archive of token events older than the Mongo hot window.
+
+With ARCHIVE_AFTER_DAYS=N a compaction job (web_server.run_archive_compactor)
+moves `token_events` documents older than N days out of Mongo into Parquet
+files under ARCHIVE_DIR, one directory per UTC day:
+
+    resources/archive/day=2025-01-31/part-<id>.parquet
+    resources/archive/manifest.json      # per file: rows, min/max timestamp, chain ids
+
+Each file holds the queryable fields as typed columns (token metadata
+flattened to token0_name, token0_symbol, ...) plus the whole document as JSON
+in `doc`, so nothing is lost. `EventArchive.query` uses the manifest to skip
+files outside the requested time range / chain, walks the rest newest first
+and stops once `limit` rows are certain, and reads only the needed columns
+(memory-mapped, with the remaining filters pushed down to the Parquet row
+groups). /api/historical_data and /api/token_events merge those rows with the
+Mongo results, /api/token/{address} falls back to `EventArchive.find`, and
+the search index is rebuilt from both (`EventArchive.iter_documents`).
+Events still inside the recheck window are never archived.
+
+pyarrow is optional: without it the archive is disabled and Mongo keeps
+every event, as before.
+"""
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except Exception:
+    pa = pc = pq = None
+
+from backend import metrics
+from backend.search_index import is_address_prefix
+
+_ARCHIVED = metrics.REGISTRY.counter("ethbot_archive_events_total", "Token events moved from Mongo to the archive")
+_FILES_READ = metrics.REGISTRY.counter("ethbot_archive_files_total", "Archive files considered by queries",
+                                       ["outcome"])
+
+TOKEN_FIELDS = ("name", "symbol", "address")
+
+# top-level document fields stored as typed columns
+SCALAR_COLUMNS = [
+    ("chain_id", "int64"),
+    ("timestamp", "int64"),
+    ("tx_hash", "string"),
+    ("log_index", "int64"),
+    ("block_number", "int64"),
+    ("address", "string"),
+    ("pair_address", "string"),
+    ("liquidity_eth", "float64"),
+    ("honeypot", "bool_"),
+    ("ownership_renounced", "bool_"),
+    ("analysis_level", "string"),
+    ("dex", "string"),
+    ("fee", "int64"),
+]
+TOKEN_COLUMNS = [f"token{i}_{f}" for i in (0, 1) for f in TOKEN_FIELDS]
+
+# columns /api/historical_data needs (everything but `doc`)
+QUERY_COLUMNS = [name for name, _ in SCALAR_COLUMNS] + TOKEN_COLUMNS
+SEARCH_COLUMNS = ["address"] + TOKEN_COLUMNS
+ADDRESS_COLUMNS = ["address", "token0_address", "token1_address"]
+
+
+def _schema():
+    fields = [(name, getattr(pa, kind)()) for name, kind in SCALAR_COLUMNS]
+    fields += [(name, pa.string()) for name in TOKEN_COLUMNS]
+    return pa.schema(fields + [("doc", pa.string())])
+
+
+def _day(ts: int) -> str:
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    row = {name: doc.get(name) for name, _ in SCALAR_COLUMNS}
+    for i in (0, 1):
+        info = doc.get(f"token{i}_info") or {}
+        for f in TOKEN_FIELDS:
+            value = info.get(f)
+            row[f"token{i}_{f}"] = None if value is None else str(value)
+    if row["fee"] is not None:
+        row["fee"] = int(row["fee"])
+    row["doc"] = json.dumps({k: v for k, v in doc.items() if k != "_id"}, default=str)
+    return row
+
+
+def to_document(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Archive row back to the token_events document shape used by the API."""
+    doc = {name: row.get(name) for name, _ in SCALAR_COLUMNS}
+    for i in (0, 1):
+        doc[f"token{i}_info"] = {f: row.get(f"token{i}_{f}") or "" for f in TOKEN_FIELDS}
+    return doc
+
+
+class EventArchive:
+    def __init__(self, root: str):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self._lock = threading.Lock()
+        self._files: List[Dict[str, Any]] = []
+        self._manifest_mtime: Optional[float] = None
+
+    # ---- manifest
+    def files(self) -> List[Dict[str, Any]]:
+        """Manifest entries (re-read when another process rewrote the manifest)."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime
+        except OSError:
+            return []
+        with self._lock:
+            if mtime != self._manifest_mtime:
+                with open(self.manifest_path) as f:
+                    self._files = json.load(f).get("files", [])
+                self._manifest_mtime = mtime
+            return list(self._files)
+
+    def _save_manifest(self, files: List[Dict[str, Any]]):
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"files": files}, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+        self._files = files
+        self._manifest_mtime = os.stat(self.manifest_path).st_mtime
+
+    # ---- writing
+    def write(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append documents as one new file per UTC day; returns the new manifest entries."""
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in docs:
+            if doc.get("timestamp") is None:
+                continue
+            by_day.setdefault(_day(doc["timestamp"]), []).append(_row(doc))
+        if not by_day:
+            return []
+        os.makedirs(self.root, exist_ok=True)
+        schema = _schema()
+        entries = []
+        for day, rows in sorted(by_day.items()):
+            rows.sort(key=lambda r: r["timestamp"])
+            rel = os.path.join(f"day={day}", f"part-{int(time.time())}-{uuid.uuid4().hex[:8]}.parquet")
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            table = pa.Table.from_pylist(rows, schema=schema)
+            # sorted by timestamp, so each row group's min/max statistics are tight
+            pq.write_table(table, path, compression="zstd", row_group_size=16384, write_statistics=True)
+            entries.append({
+                "path": rel,
+                "day": day,
+                "rows": len(rows),
+                "min_ts": rows[0]["timestamp"],
+                "max_ts": rows[-1]["timestamp"],
+                "chain_ids": sorted({int(r["chain_id"] or 1) for r in rows}),
+            })
+        self.files()
+        with self._lock:
+            self._save_manifest(self._files + entries)
+        return entries
+
+    # ---- reading
+    def query(self, start_ts: Optional[int] = None, end_ts: Optional[int] = None,
+              chain_id: Optional[int] = None, honeypot: Optional[bool] = None,
+              min_liquidity: Optional[float] = None, ownership: Optional[bool] = None,
+              q: Optional[str] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        """Newest-first archived documents matching the /api/historical_data filters."""
+        candidates = []
+        for entry in self.files():
+            if (start_ts is not None and entry["max_ts"] < start_ts) or \
+                    (end_ts is not None and entry["min_ts"] > end_ts) or \
+                    (chain_id is not None and int(chain_id) not in entry.get("chain_ids", [1])):
+                _FILES_READ.labels("pruned").inc()
+                continue
+            candidates.append(entry)
+        candidates.sort(key=lambda e: e["max_ts"], reverse=True)
+
+        filters = []
+        if start_ts is not None:
+            filters.append(("timestamp", ">=", int(start_ts)))
+        if end_ts is not None:
+            filters.append(("timestamp", "<=", int(end_ts)))
+        if chain_id is not None:
+            filters.append(("chain_id", "=", int(chain_id)))
+        if honeypot is not None:
+            filters.append(("honeypot", "=", bool(honeypot)))
+        if min_liquidity is not None:
+            filters.append(("liquidity_eth", ">=", float(min_liquidity)))
+        if ownership is not None:
+            filters.append(("ownership_renounced", "=", bool(ownership)))
+
+        tables = []
+        newest: List[int] = []
+        for entry in candidates:
+            # every remaining file is older than the limit-th newest row found so far
+            if len(newest) >= limit and entry["max_ts"] < newest[limit - 1]:
+                _FILES_READ.labels("skipped").inc()
+                continue
+            _FILES_READ.labels("read").inc()
+            table = pq.read_table(os.path.join(self.root, entry["path"]), columns=QUERY_COLUMNS,
+                                  filters=filters or None, memory_map=True)
+            if q and table.num_rows:
+                table = table.filter(self._search_mask(table, q))
+            if not table.num_rows:
+                continue
+            tables.append(table)
+            newest = sorted(newest + table.column("timestamp").to_pylist(), reverse=True)[:limit]
+        if not tables:
+            return []
+        table = pa.concat_tables(tables)
+        table = table.take(pc.sort_indices(table, sort_keys=[("timestamp", "descending")])[:limit])
+        return [to_document(row) for row in table.to_pylist()]
+
+    def find(self, address: str, chain_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Newest archived event of token `address` (the whole document), or None."""
+        addr = address.lower()
+        entries = [e for e in self.files() if chain_id is None or int(chain_id) in e.get("chain_ids", [1])]
+        best = None
+        for entry in sorted(entries, key=lambda e: e["max_ts"], reverse=True):
+            if best is not None and entry["max_ts"] <= best["timestamp"]:
+                break
+            path = os.path.join(self.root, entry["path"])
+            filters = [("chain_id", "=", int(chain_id))] if chain_id is not None else None
+            # only the address column first; the documents are read for a hit only
+            table = pq.read_table(path, columns=["address", "timestamp"], filters=filters, memory_map=True)
+            mask = pc.fill_null(pc.equal(pc.utf8_lower(table.column("address")), addr), False)
+            table = table.filter(mask)
+            if not table.num_rows:
+                continue
+            stored = table.column("address")[0].as_py()
+            hits = pq.read_table(path, columns=["timestamp", "doc"], memory_map=True,
+                                 filters=[("address", "=", stored)] + (filters or []))
+            newest = hits.take(pc.sort_indices(hits, sort_keys=[("timestamp", "descending")])[:1])
+            doc = json.loads(newest.column("doc")[0].as_py())
+            # files of one day can overlap in time; keep looking while a newer one could hold a later event
+            if best is None or int(doc.get("timestamp", 0)) > best["timestamp"]:
+                best = doc
+        return best
+
+    def iter_documents(self) -> Iterator[Dict[str, Any]]:
+        """Every archived event (API document shape, no `doc`), newest file first."""
+        for entry in sorted(self.files(), key=lambda e: e["max_ts"], reverse=True):
+            table = pq.read_table(os.path.join(self.root, entry["path"]), columns=QUERY_COLUMNS, memory_map=True)
+            table = table.take(pc.sort_indices(table, sort_keys=[("timestamp", "descending")]))
+            for row in table.to_pylist():
+                yield to_document(row)
+
+    @staticmethod
+    def _search_mask(table, q: str):
+        # same semantics as the Mongo query (api.token_routes._q_filter): a hex prefix matches the
+        # start of the addresses, anything else is a case-insensitive regex, literal if it doesn't compile
+        if is_address_prefix(q):
+            prefix = q.strip().lower()
+            masks = [pc.starts_with(pc.utf8_lower(table.column(c)), prefix) for c in ADDRESS_COLUMNS]
+            mask = pc.or_kleene(pc.or_kleene(masks[0], masks[1]), masks[2])
+            return pc.fill_null(mask, False)
+        try:
+            masks = [pc.match_substring_regex(table.column(c), q, ignore_case=True) for c in SEARCH_COLUMNS]
+        except pa.ArrowInvalid:
+            masks = [pc.match_substring(table.column(c), q, ignore_case=True) for c in SEARCH_COLUMNS]
+        mask = masks[0]
+        for m in masks[1:]:
+            mask = pc.or_kleene(mask, m)
+        return pc.fill_null(mask, False)
+
+
+def hot_window_days() -> Optional[float]:
+    value = os.getenv("ARCHIVE_AFTER_DAYS")
+    return float(value) if value else None
+
+
+def compact(collection, archive: EventArchive, older_than_s: float, batch_size: int = 50000) -> int:
+    """Move events older than `older_than_s` seconds from Mongo to the archive; returns how many."""
+    cutoff = int(time.time() - older_than_s)
+    moved = 0
+    while True:
+        docs = list(collection.find({"timestamp": {"$lt": cutoff}}).sort("timestamp", 1).limit(batch_size))
+        if not docs:
+            break
+        archive.write(docs)
+        # delete only after the files and manifest are written; a crash in between
+        # archives these again next run, and readers drop the duplicates
+        collection.delete_many({"_id": {"$in": [d["_id"] for d in docs]}})
+        moved += len(docs)
+        _ARCHIVED.inc(len(docs))
+        if len(docs) < batch_size:
+            break
+    return moved
+
+
+_archive: Optional[EventArchive] = None
+_archive_lock = threading.Lock()
+_warned_missing = False
+
+
+def get_archive() -> Optional[EventArchive]:
+    """The configured archive, or None when ARCHIVE_AFTER_DAYS is unset or pyarrow is missing."""
+    global _archive, _warned_missing
+    if hot_window_days() is None:
+        return None
+    if pq is None:
+        if not _warned_missing:
+            _warned_missing = True
+            print("ARCHIVE_AFTER_DAYS is set but pyarrow is not installed; archive disabled")
+        return None
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = EventArchive(os.getenv("ARCHIVE_DIR", "resources/archive"))
+    return _archive
+
+
+def merge_newest(hot: List[Dict[str, Any]], archived: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """Newest `limit` of both result sets; an event in both (compaction interrupted) is kept once."""
+    seen = set()
+    out = []
+    for doc in sorted(hot + archived, key=lambda d: int(d.get("timestamp", 0) or 0), reverse=True):
+        key = (doc.get("tx_hash"), doc.get("log_index"))
+        if key[0] is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        out.append(doc)
+        if len(out) >= limit:
+            break
+    return out
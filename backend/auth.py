@@ -1,19 +1,117 @@
 import os
 import time
 import json
-from typing import Optional
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 
 
+class TokenCache:
+    """Bounded LRU of verified JWTs keyed by the token's sha256 digest.
+
+    Each entry stores the token subject and its ``exp`` claim so a hit can skip
+    the HMAC verification and JSON parsing done by ``jwt.decode``. Entries are
+    never served past ``exp``. Revoked digests are remembered until their own
+    expiry so a revoked token can't be re-verified and re-cached.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(1, int(maxsize))
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._revoked: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[str]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            sub, exp = entry
+            if exp is not None and int(now) > exp:
+                # expired: same whole-second comparison jwt.decode uses, so a
+                # cached token never outlives what a fresh decode would accept
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return sub
+
+    def put(self, key: str, sub: str, exp: Optional[int]):
+        with self._lock:
+            if key in self._revoked:
+                return
+            self._entries[key] = (sub, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revoke(self, key: str, exp: Optional[int] = None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if exp is None and entry is not None:
+                exp = entry[1]
+            # without a known expiry keep the revocation for the default token lifetime
+            self._revoked[key] = int(exp) if exp is not None else int(now) + 3600
+            # prune revocations for tokens that have expired on their own
+            if len(self._revoked) > self.maxsize:
+                self._revoked = {k: v for k, v in self._revoked.items() if v >= int(now)}
+
+    def is_revoked(self, key: str) -> bool:
+        with self._lock:
+            exp = self._revoked.get(key)
+            if exp is None:
+                return False
+            if int(time.time()) > exp:
+                # expired: jwt.decode rejects it from here on (same comparison as get())
+                del self._revoked[key]
+                return False
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "revoked": len(self._revoked),
+                "hit_ratio": (self.hits / total) if total else 0.0,
+            }
+
+
 class AuthManager:
-    def __init__(self, users_collection=None, users_dir: str = "resources/users", jwt_secret: str = None):
+    def __init__(self, users_collection=None, users_dir: str = "resources/users", jwt_secret: str = None,
+                 token_cache_size: int = None):
         self.users_collection = users_collection
         self.users_dir = users_dir
         os.makedirs(self.users_dir, exist_ok=True)
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         self.secret = jwt_secret or os.getenv("JWT_SECRET", "dev-secret")
         self.alg = "HS256"
+        if token_cache_size is None:
+            token_cache_size = int(os.getenv("JWT_CACHE_SIZE", "1024"))
+        self.token_cache = TokenCache(token_cache_size)
 
     def hash_password(self, pw: str) -> str:
         return self.pwd_context.hash(pw)
@@ -29,11 +127,34 @@ class AuthManager:
         return jwt.encode(payload, self.secret, algorithm=self.alg)
 
     def decode_token(self, token: str) -> Optional[str]:
+        key = self.token_cache.digest(token)
+        sub = self.token_cache.get(key)
+        if sub is not None:
+            return sub
+        if self.token_cache.is_revoked(key):
+            return None
         try:
             payload = jwt.decode(token, self.secret, algorithms=[self.alg])
-            return payload.get("sub")
         except JWTError:
             return None
+        sub = payload.get("sub")
+        if sub is not None:
+            exp = payload.get("exp")
+            self.token_cache.put(key, sub, int(exp) if exp is not None else None)
+        return sub
+
+    def revoke_token(self, token: str):
+        """Invalidate a token before its expiry (e.g. on logout)."""
+        exp = None
+        try:
+            # signature is still checked so arbitrary strings can't fill the revocation set
+            exp = jwt.decode(token, self.secret, algorithms=[self.alg]).get("exp")
+        except JWTError:
+            return
+        self.token_cache.revoke(self.token_cache.digest(token), exp)
+
+    def token_cache_stats(self) -> Dict[str, Any]:
+        return self.token_cache.stats()
 
     # persistence helpers
     def _read_user_file(self, username: str):
@@ -71,11 +192,16 @@ class AuthManager:
             return None
         return self.create_access_token(username)
 
-    def get_username_from_auth_header(self, auth_header: Optional[str]) -> Optional[str]:
+    @staticmethod
+    def token_from_auth_header(auth_header: Optional[str]) -> Optional[str]:
         if not auth_header:
             return None
         if auth_header.startswith("Bearer "):
-            token = auth_header.split(" ", 1)[1]
-        else:
-            token = auth_header
+            return auth_header.split(" ", 1)[1]
+        return auth_header
+
+    def get_username_from_auth_header(self, auth_header: Optional[str]) -> Optional[str]:
+        token = self.token_from_auth_header(auth_header)
+        if not token:
+            return None
         return self.decode_token(token)
@@ -0,0 +1,299 @@
+"""Coordination between several replicas sharing one Mongo database.
+
+- `Lease`: a single document (`_id` = lease name) naming the holder and an
+  expiry. The holder renews it every `ttl / 3` seconds; anyone may take it
+  over once it has expired. Each takeover bumps `epoch` (a fencing token) and
+  the leader stores its ingest progress (`checkpoint`) on the same document so
+  a new leader can backfill from where the old one stopped.
+- membership: every replica heartbeats a document in `members`; replicas seen
+  within `member_ttl` are live.
+- partitioning: analysis jobs carry `partition = hash(pair) % PARTITIONS`, and
+  each partition belongs to one live member by rendezvous hashing, so when a
+  member joins or dies only its partitions move.
+
+The ingest leader publishes jobs to `analysis_jobs`; every replica claims the
+pending jobs of the partitions it owns. Claims are leases too
+(`claimed_until`): jobs of a member that died are picked up again by the new
+partition owner once the claim runs out. Times are wall-clock seconds, so the
+replicas' clocks need to agree to well within the lease TTL.
+
+With several chains (backend.Core.chains) each chain's pipeline has its own
+Coordinator: lease and member set are per chain, jobs carry `chain_id`.
+"""
+import os
+import time
+import uuid
+import socket
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from pymongo import ASCENDING, ReturnDocument
+    from pymongo.errors import DuplicateKeyError
+except Exception:
+    ASCENDING = 1
+    ReturnDocument = None
+    DuplicateKeyError = Exception
+
+from backend import metrics
+
+PARTITIONS = 64
+
+_IS_LEADER = metrics.REGISTRY.gauge("ethbot_cluster_is_leader", "1 while this replica holds the ingest lease")
+_LIVE_MEMBERS = metrics.REGISTRY.gauge("ethbot_cluster_live_members", "Replicas with a recent heartbeat")
+_OWNED_PARTITIONS = metrics.REGISTRY.gauge("ethbot_cluster_owned_partitions", "Analysis partitions owned here")
+_JOBS = metrics.REGISTRY.counter("ethbot_cluster_jobs_total", "Cluster analysis jobs by event", ["event"])
+
+
+def default_member_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def partition_of(pair: str) -> int:
+    digest = hashlib.sha1(pair.lower().encode()).digest()
+    return int.from_bytes(digest[:4], "big") % PARTITIONS
+
+
+def _weight(member: str, partition: int) -> int:
+    return int.from_bytes(hashlib.sha1(f"{member}:{partition}".encode()).digest()[:8], "big")
+
+
+def assign_partitions(members: List[str], partitions: int = PARTITIONS) -> Dict[int, str]:
+    """Rendezvous (highest random weight) assignment of partitions to members."""
+    if not members:
+        return {}
+    return {p: max(members, key=lambda m: _weight(m, p)) for p in range(partitions)}
+
+
+class Lease:
+    def __init__(self, collection, name: str, holder: str, ttl: float = 10.0):
+        self.collection = collection
+        self.name = name
+        self.holder = holder
+        self.ttl = float(ttl)
+        self.epoch = 0
+        self.checkpoint: Optional[int] = None
+        # locally trusted until slightly before the stored expiry
+        self._valid_until = 0.0
+
+    def held(self) -> bool:
+        return time.time() < self._valid_until
+
+    def try_acquire(self) -> bool:
+        """Renew our lease, or take it over if it expired; True while we hold it."""
+        now = time.time()
+        expires = now + self.ttl
+        try:
+            doc = self.collection.find_one_and_update(
+                {"_id": self.name, "holder": self.holder},
+                {"$set": {"expires_at": expires, "renewed_at": now}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is None:
+                doc = self.collection.find_one_and_update(
+                    {"_id": self.name, "$or": [{"expires_at": {"$lt": now}}, {"holder": None}]},
+                    {"$set": {"holder": self.holder, "expires_at": expires, "renewed_at": now,
+                              "acquired_at": now}, "$inc": {"epoch": 1}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+        except DuplicateKeyError:
+            # the lease exists and is held by someone else
+            doc = None
+        except Exception as e:
+            print(f"Lease {self.name}: could not reach Mongo: {e}")
+            doc = None
+        if doc is None:
+            self._valid_until = 0.0
+            return False
+        self.epoch = int(doc.get("epoch", 0))
+        self.checkpoint = doc.get("checkpoint")
+        # step down a third of a TTL early so two holders never overlap
+        self._valid_until = now + self.ttl * 2 / 3
+        return True
+
+    def release(self):
+        try:
+            self.collection.update_one({"_id": self.name, "holder": self.holder},
+                                       {"$set": {"holder": None, "expires_at": 0}})
+        except Exception:
+            pass
+        self._valid_until = 0.0
+
+    def save_checkpoint(self, block_number: int) -> bool:
+        """Record ingest progress; fenced by holder and epoch so a deposed leader can't write."""
+        try:
+            res = self.collection.update_one(
+                {"_id": self.name, "holder": self.holder, "epoch": self.epoch},
+                {"$max": {"checkpoint": int(block_number)}},
+            )
+        except Exception as e:
+            print(f"Lease {self.name}: checkpoint failed: {e}")
+            return False
+        if res.matched_count:
+            self.checkpoint = max(self.checkpoint or 0, int(block_number))
+            return True
+        self._valid_until = 0.0
+        return False
+
+
+class Coordinator:
+    def __init__(self, db, member_id: Optional[str] = None, lease_ttl: float = 10.0,
+                 member_ttl: float = 6.0, heartbeat: float = 2.0, claim_ttl: float = 120.0, chain=None):
+        self.member_id = member_id or default_member_id()
+        # chain: a ChainProfile; None is the default chain
+        self.chain_id = chain.chain_id if chain is not None else 1
+        self.lease = Lease(db["leases"], chain.collection("ingest_leader") if chain is not None else "ingest_leader",
+                           self.member_id, ttl=lease_ttl)
+        self.members = db[chain.collection("members") if chain is not None else "members"]
+        self.jobs = db["analysis_jobs"]
+        self.member_ttl = member_ttl
+        self.heartbeat = heartbeat
+        self.claim_ttl = claim_ttl
+        self._owned: List[int] = []
+        self._live: List[str] = [self.member_id]
+        self._on_leadership: List[Callable[[bool], None]] = []
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @classmethod
+    def from_env(cls, db, chain=None) -> "Coordinator":
+        return cls(db, member_id=os.getenv("CLUSTER_MEMBER_ID") or None,
+                   lease_ttl=float(os.getenv("CLUSTER_LEASE_TTL", "10")),
+                   member_ttl=float(os.getenv("CLUSTER_MEMBER_TTL", "6")),
+                   heartbeat=float(os.getenv("CLUSTER_HEARTBEAT", "2")),
+                   chain=chain)
+
+    def ensure_indexes(self):
+        try:
+            self.jobs.create_index([("chain_id", ASCENDING), ("status", ASCENDING), ("partition", ASCENDING)],
+                                   name="chain_status_partition")
+            # finished jobs are dropped a day after completion
+            self.jobs.create_index("done_at", expireAfterSeconds=86400, name="ttl_done_at")
+        except Exception as e:
+            print(f"Warning: could not ensure analysis_jobs indexes: {e}")
+
+    # ---- lifecycle
+    def start(self):
+        for target, name in ((self._lease_loop, "cluster-lease"), (self._member_loop, "cluster-members")):
+            t = threading.Thread(target=target, daemon=True, name=name)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.lease.release()
+        try:
+            self.members.delete_one({"_id": self.member_id})
+        except Exception:
+            pass
+
+    def on_leadership(self, callback: Callable[[bool], None]):
+        self._on_leadership.append(callback)
+
+    def _lease_loop(self):
+        was_leader = False
+        while not self._stop.is_set():
+            leader = self.lease.try_acquire()
+            _IS_LEADER.set(1 if leader else 0)
+            if leader != was_leader:
+                print(f"Cluster member {self.member_id} {'became' if leader else 'is no longer'} ingest leader"
+                      + (f" (epoch {self.lease.epoch})" if leader else ""))
+                for cb in self._on_leadership:
+                    try:
+                        cb(leader)
+                    except Exception as e:
+                        print(f"Leadership callback failed: {e}")
+                was_leader = leader
+            self._stop.wait(self.lease.ttl / 3)
+
+    def _member_loop(self):
+        while not self._stop.is_set():
+            now = time.time()
+            try:
+                self.members.update_one({"_id": self.member_id},
+                                        {"$set": {"last_seen": now, "pid": os.getpid()}}, upsert=True)
+                live = sorted(d["_id"] for d in self.members.find({"last_seen": {"$gte": now - self.member_ttl}},
+                                                                   {"_id": 1}))
+                # long-dead members are only noise
+                self.members.delete_many({"last_seen": {"$lt": now - 10 * self.member_ttl}})
+            except Exception as e:
+                print(f"Cluster heartbeat failed: {e}")
+                live = [self.member_id]
+            if self.member_id not in live:
+                live.append(self.member_id)
+            assignment = assign_partitions(live)
+            self._live = live
+            self._owned = [p for p, m in assignment.items() if m == self.member_id]
+            _LIVE_MEMBERS.set(len(live))
+            _OWNED_PARTITIONS.set(len(self._owned))
+            self._stop.wait(self.heartbeat)
+
+    # ---- state
+    def is_leader(self) -> bool:
+        return self.lease.held()
+
+    def live_members(self) -> List[str]:
+        return list(self._live)
+
+    def owned_partitions(self) -> List[int]:
+        return list(self._owned)
+
+    def owns(self, pair: str) -> bool:
+        return partition_of(pair) in self._owned
+
+    # ---- jobs
+    def publish(self, job) -> bool:
+        """Leader side: queue a job for whichever replica owns its partition."""
+        doc = {
+            "_id": f"{job.tx_hash}:{job.log_index}",
+            "chain_id": self.chain_id,
+            "partition": partition_of(job.pair),
+            "status": "pending",
+            "created_at": time.time(),
+            "token0": job.token0, "token1": job.token1, "pair": job.pair, "deployer": job.deployer,
+            "tx_hash": job.tx_hash, "log_index": job.log_index, "block_number": job.block_number,
+            "watchlisted": job.watchlisted, "is_weth_pair": job.is_weth_pair, "liquidity_eth": job.liquidity_eth,
+            "dex": job.dex, "fee": job.fee,
+            "epoch": self.lease.epoch,
+        }
+        try:
+            self.jobs.insert_one(doc)
+        except DuplicateKeyError:
+            return False
+        _JOBS.labels("published").inc()
+        return True
+
+    def claim(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Claim up to `limit` runnable jobs from the partitions this replica owns."""
+        owned = self._owned
+        if not owned:
+            return []
+        claimed = []
+        while len(claimed) < limit:
+            now = time.time()
+            doc = self.jobs.find_one_and_update(
+                {"chain_id": self.chain_id, "partition": {"$in": owned},
+                 "$or": [{"status": "pending"}, {"status": "claimed", "claimed_until": {"$lt": now}}]},
+                {"$set": {"status": "claimed", "claimed_by": self.member_id, "claimed_until": now + self.claim_ttl},
+                 "$inc": {"attempts": 1}},
+                sort=[("created_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is None:
+                break
+            claimed.append(doc)
+        if claimed:
+            _JOBS.labels("claimed").inc(len(claimed))
+        return claimed
+
+    def complete(self, tx_hash: str, log_index: int):
+        from datetime import datetime, timezone
+        try:
+            self.jobs.update_one({"_id": f"{tx_hash}:{log_index}", "claimed_by": self.member_id},
+                                 {"$set": {"status": "done", "done_at": datetime.now(timezone.utc)}})
+            _JOBS.labels("done").inc()
+        except Exception as e:
+            print(f"Could not mark job {tx_hash}:{log_index} done: {e}")
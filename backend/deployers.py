@@ -0,0 +1,180 @@
+"""Per-deployer reputation profiles, maintained as token events are persisted.
+
+One document per (chain, deployer) in `deployer_profiles`:
+
+    {"_id": "1:0xabc...", "address": "0xabc...", "chain_id": 1,
+     "launches": 12, "honeypots": 9, "flagged_launches": 2,
+     "median_liquidity_eth": 1.7, "liquidity_samples": [...last 101...],
+     "first_seen": ..., "last_seen": ..., "last_token": "0x...", "last_pair": "0x..."}
+
+`record_launch` applies one upsert per new event ($inc counters, $set the
+latest fields, $push the liquidity sample capped with $slice, $min
+first_seen), so a profile never needs a rescan of the history. The median is
+taken over the cached samples plus the new one; with several replicas
+writing the same deployer it may lag a launch behind until the next one.
+
+Only verdicts that came from a sell simulation whose quotes both came back
+(or from a bytecode template built from such simulations) count as
+honeypots; one that is unknown, assumed out of caution or inferred is not
+evidence. A deployer with at least `min_launches` launches of which
+`bad_ratio` or more were honeypots is "known bad": the listener gives its new pairs a lite
+analysis (no sell simulation) and marks them honeypot by inference. Those
+launches count as `flagged_launches`, not `honeypots`, so the ratio decays
+and the deployer gets fully re-analysed now and then.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from statistics import median
+from typing import Any, Dict, Optional
+
+from backend import metrics
+
+_SHORT_CIRCUITS = metrics.REGISTRY.counter(
+    "ethbot_deployer_short_circuits_total", "Pairs of known-bad deployers given a lite analysis")
+
+MAX_SAMPLES = 101
+
+
+# honeypot_source values backed by a simulation (backend.Core.analyzer.token_analyzer)
+EVIDENCE_SOURCES = ("simulation", "template")
+
+
+def counts_as_honeypot(result: Dict[str, Any]) -> bool:
+    """A honeypot verdict that is evidence against the deployer."""
+    return bool(result.get("honeypot")) and result.get("honeypot_source") in EVIDENCE_SOURCES
+
+
+def profile_id(address: str, chain_id: int = 1) -> str:
+    return f"{int(chain_id)}:{address.lower()}"
+
+
+def _new_profile(address: str, chain_id: int) -> Dict[str, Any]:
+    return {"_id": profile_id(address, chain_id), "address": address.lower(), "chain_id": int(chain_id),
+            "launches": 0, "honeypots": 0, "flagged_launches": 0, "median_liquidity_eth": 0.0,
+            "liquidity_samples": [], "first_seen": None, "last_seen": None, "last_token": None, "last_pair": None}
+
+
+class DeployerProfiles:
+    def __init__(self, collection=None, min_launches: int = 3, bad_ratio: float = 0.8,
+                 cache_size: int = 10000, cache_ttl: float = 60.0, short_circuit: bool = True):
+        self.collection = collection
+        self.short_circuit = short_circuit
+        self.min_launches = min_launches
+        self.bad_ratio = bad_ratio
+        self.cache_size = cache_size
+        # cached profiles are re-read after this long so other replicas' launches show up
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls, collection=None) -> "DeployerProfiles":
+        return cls(collection,
+                   min_launches=int(os.getenv("DEPLOYER_MIN_LAUNCHES", "3")),
+                   bad_ratio=float(os.getenv("DEPLOYER_BAD_RATIO", "0.8")),
+                   short_circuit=os.getenv("DEPLOYER_SHORT_CIRCUIT", "1") != "0")
+
+    # ---- cache
+    def _cached(self, pid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            hit = self._cache.get(pid)
+            if hit is None:
+                return None
+            loaded_at, profile = hit
+            # without Mongo the cache is the only copy and never goes stale
+            if self.collection is not None and time.time() - loaded_at > self.cache_ttl:
+                return None
+            self._cache.move_to_end(pid)
+            return profile
+
+    def _remember(self, profile: Dict[str, Any]):
+        with self._lock:
+            self._cache[profile["_id"]] = (time.time(), profile)
+            self._cache.move_to_end(profile["_id"])
+            if self.collection is not None:
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+    # ---- reads
+    def get(self, address: str, chain_id: int = 1) -> Optional[Dict[str, Any]]:
+        if not address:
+            return None
+        pid = profile_id(address, chain_id)
+        profile = self._cached(pid)
+        if profile is not None or self.collection is None:
+            return profile
+        try:
+            profile = self.collection.find_one({"_id": pid})
+        except Exception as e:
+            print(f"Deployer profile lookup failed: {e}")
+            return None
+        if profile is not None:
+            self._remember(profile)
+        return profile
+
+    def is_known_bad(self, address: str, chain_id: int = 1) -> bool:
+        profile = self.get(address, chain_id)
+        if not profile or profile.get("launches", 0) < self.min_launches:
+            return False
+        return profile.get("honeypots", 0) / profile["launches"] >= self.bad_ratio
+
+    def should_short_circuit(self, address: str, chain_id: int = 1) -> bool:
+        """Known bad and short-circuiting enabled (DEPLOYER_SHORT_CIRCUIT, default on)."""
+        if not self.short_circuit or not self.is_known_bad(address, chain_id):
+            return False
+        _SHORT_CIRCUITS.inc()
+        return True
+
+    # ---- writes
+    def record_launch(self, token_info: Dict[str, Any], flagged: bool = False) -> Optional[Dict[str, Any]]:
+        """Count a newly persisted token event towards its deployer's profile."""
+        address = (token_info.get("deployer") or "").lower()
+        if not address:
+            return None
+        chain_id = int(token_info.get("chain_id", 1) or 1)
+        now = int(token_info.get("timestamp") or time.time())
+        liquidity = float(token_info.get("liquidity_eth", 0.0) or 0.0)
+        honeypot = 1 if counts_as_honeypot(token_info) and not flagged else 0
+
+        # analysis workers may record launches of one deployer concurrently
+        with self._lock:
+            profile = dict(self.get(address, chain_id) or _new_profile(address, chain_id))
+            samples = (list(profile.get("liquidity_samples") or []) + [liquidity])[-MAX_SAMPLES:]
+            inc = {"launches": 1, "honeypots": honeypot, "flagged_launches": 1 if flagged else 0}
+            latest = {"last_seen": now, "last_token": token_info.get("address"),
+                      "last_pair": token_info.get("pair_address"), "median_liquidity_eth": float(median(samples))}
+            for field, n in inc.items():
+                profile[field] = profile.get(field, 0) + n
+            profile.update(latest, liquidity_samples=samples)
+            profile["first_seen"] = min(profile.get("first_seen") or now, now)
+            self._remember(profile)
+
+        if self.collection is not None:
+            try:
+                self.collection.update_one(
+                    {"_id": profile["_id"]},
+                    {"$inc": inc, "$set": latest, "$min": {"first_seen": now},
+                     "$push": {"liquidity_samples": {"$each": [liquidity], "$slice": -MAX_SAMPLES}},
+                     "$setOnInsert": {"address": address, "chain_id": chain_id}},
+                    upsert=True,
+                )
+            except Exception as e:
+                print(f"Deployer profile update failed: {e}")
+        return profile
+
+    def record_honeypot(self, address: str, chain_id: int = 1):
+        """A lite-analysed launch turned out to be a honeypot after its full analysis."""
+        if not address:
+            return
+        pid = profile_id(address, chain_id)
+        with self._lock:
+            profile = self._cached(pid)
+            if profile is not None:
+                profile["honeypots"] = profile.get("honeypots", 0) + 1
+        if self.collection is not None:
+            try:
+                self.collection.update_one({"_id": pid}, {"$inc": {"honeypots": 1}})
+            except Exception as e:
+                print(f"Deployer profile update failed: {e}")
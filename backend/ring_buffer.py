@@ -0,0 +1,125 @@
+import time
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+# pymongo.DESCENDING; spelled out so importing this module doesn't load pymongo
+DESCENDING = -1
+
+
+class SequencedRingBuffer:
+    """Capacity-bounded message log with monotonically increasing sequence ids.
+
+    Behaves like the plain list it replaces for the common operations
+    (`append`, `[-1]`, iteration, `len`) so existing callers keep working,
+    while `since(seq)` lets pollers fetch only entries newer than the last
+    one they saw. Oldest entries are dropped once `capacity` is reached.
+
+    When a Mongo collection is attached (normally a capped collection, see
+    `ensure_capped_collection`) every append is also written there and the
+    buffer is seeded from it on attach so sequence ids survive restarts.
+    """
+
+    def __init__(self, capacity: int = 1000, initial: Optional[List[str]] = None, collection=None):
+        self.capacity = max(1, int(capacity))
+        self._entries: deque = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.collection = None
+        for message in initial or []:
+            self.append(message)
+        if collection is not None:
+            self.attach_collection(collection)
+
+    def attach_collection(self, collection):
+        """Persist future appends to `collection` and resume from its contents."""
+        try:
+            docs = list(collection.find({}, {"_id": 0}).sort("seq", DESCENDING).limit(self.capacity))
+        except Exception as e:
+            print(f"Warning: could not load persisted messages: {e}")
+            docs = []
+        with self._lock:
+            if docs:
+                pending = list(self._entries)
+                self._entries.clear()
+                for d in reversed(docs):
+                    self._entries.append((int(d["seq"]), float(d.get("ts", 0)), d.get("message", "")))
+                self._seq = int(docs[0]["seq"])
+                # re-number anything appended before the collection was attached
+                for _, ts, message in pending:
+                    self._seq += 1
+                    self._entries.append((self._seq, ts, message))
+            self.collection = collection
+
+    def append(self, message: Any) -> int:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            ts = time.time()
+            self._entries.append((seq, ts, message))
+            collection = self.collection
+        if collection is not None:
+            try:
+                collection.insert_one({"seq": seq, "ts": ts, "message": message})
+            except Exception as e:
+                print(f"Warning: failed to persist message {seq}: {e}")
+        return seq
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def since(self, seq: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries with a sequence id greater than `seq`, oldest first.
+
+        Walks from the newest entry backwards, so the cost is proportional to
+        the number of entries returned rather than the buffer size. A `seq`
+        ahead of the buffer (e.g. the server restarted) returns everything;
+        a `limit` of 0 or less returns nothing.
+        """
+        if limit is not None and limit <= 0:
+            return []
+        with self._lock:
+            if seq > self._seq:
+                seq = 0
+            out = []
+            for entry in reversed(self._entries):
+                if entry[0] <= seq:
+                    break
+                out.append(entry)
+        out.reverse()
+        if limit is not None and len(out) > limit:
+            out = out[-limit:]
+        return [{"seq": s, "ts": ts, "message": m} for s, ts, m in out]
+
+    def messages(self) -> List[Any]:
+        with self._lock:
+            return [m for _, _, m in self._entries]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return len(self._entries) > 0
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.messages())
+
+    def __getitem__(self, i):
+        with self._lock:
+            if isinstance(i, slice):
+                return [m for _, _, m in list(self._entries)[i]]
+            return self._entries[i][2]
+
+
+def ensure_capped_collection(db, name: str, size_bytes: int = 1 << 20, max_docs: Optional[int] = None):
+    """Return `db[name]`, creating it as a capped collection if it doesn't exist."""
+    try:
+        if name not in db.list_collection_names():
+            opts = {"capped": True, "size": int(size_bytes)}
+            if max_docs:
+                opts["max"] = int(max_docs)
+            db.create_collection(name, **opts)
+    except Exception as e:
+        print(f"Warning: could not create capped collection {name}: {e}")
+    return db[name]
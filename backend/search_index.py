@@ -0,0 +1,212 @@
+"""In-memory search index for token autocomplete and the `q` filters.
+
+- a prefix trie over lowercase symbols, names and the words of names; every
+  node keeps the `top_k` most recent tokens below it, so `/api/search`
+  answers with one walk down the prefix
+- a sorted list of lowercase addresses for hex-prefix lookups (bisect)
+
+web_server.run_search_index_sync rebuilds it from Mongo at startup and then
+pulls newer events every SEARCH_INDEX_REFRESH seconds (which also picks up
+events ingested by other processes/replicas); the listener adds its own
+events right away. Entries are keyed by (chain_id, address).
+"""
+import re
+import heapq
+import bisect
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+Key = Tuple[int, str]
+
+_WORD_RE = re.compile(r"[^0-9a-z]+")
+_HEX_PREFIX_RE = re.compile(r"^0x[0-9a-f]*$")
+# trie children are single characters; these two keys can't collide with them
+_TOP = None      # [(-timestamp, key), ...] newest first, at most top_k
+_HERE = ""       # keys whose term ends at this node
+
+# deeper prefixes share a node and are checked against the full terms
+MAX_TERM_LENGTH = 12
+# hex prefixes matching more addresses than this ("0x", "0xa") are returned in
+# address order instead of ranking the whole range by recency
+MAX_RANKED_ADDRESSES = 4096
+
+
+def _terms(symbol: str, name: str) -> Set[str]:
+    terms = {symbol, name}
+    terms.update(w for w in _WORD_RE.split(name) if w)
+    return {t[:MAX_TERM_LENGTH] for t in terms if t}
+
+
+def is_address_prefix(q: Optional[str]) -> bool:
+    """True for a `q` like "0x3f2a": a substring of an address that can only be its prefix."""
+    return bool(q) and bool(_HEX_PREFIX_RE.match(q.strip().lower()))
+
+
+def main_token(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata of the event's token (the non-WETH side) from token0_info/token1_info."""
+    address = str(doc.get("address") or "").lower()
+    for field in ("token0_info", "token1_info", "token0", "token1"):
+        info = doc.get(field) or {}
+        if str(info.get("address") or "").lower() == address:
+            return info
+    return {}
+
+
+class TokenSearchIndex:
+    def __init__(self, top_k: int = 20):
+        self.top_k = top_k
+        self._root: Dict[Any, Any] = {}
+        self._tokens: Dict[Key, Dict[str, Any]] = {}
+        self._addresses: List[str] = []
+        self._by_address: Dict[str, List[Key]] = {}
+        self._lock = threading.Lock()
+        self.ready = False
+        # newest event timestamp seen, for incremental refreshes
+        self.last_timestamp = 0
+
+    def __len__(self):
+        return len(self._tokens)
+
+    # ---- maintenance
+    def add(self, doc: Dict[str, Any]) -> bool:
+        """Index the token of a token_events document; True if it wasn't indexed yet."""
+        address = str(doc.get("address") or "")
+        if not address:
+            return False
+        info = main_token(doc)
+        key = (int(doc.get("chain_id", 1) or 1), address.lower())
+        ts = int(doc.get("timestamp", 0) or 0)
+        symbol = str(info.get("symbol") or "")
+        name = str(info.get("name") or "")
+        with self._lock:
+            self.last_timestamp = max(self.last_timestamp, ts)
+            entry = self._tokens.get(key)
+            is_new = entry is None
+            if is_new:
+                entry = self._tokens[key] = {"address": address, "chain_id": key[0], "symbol": symbol,
+                                             "name": name, "timestamp": ts}
+                lower = key[1]
+                if lower not in self._by_address:
+                    bisect.insort(self._addresses, lower)
+                self._by_address.setdefault(lower, []).append(key)
+            elif ts <= entry["timestamp"] and (symbol, name) == (entry["symbol"], entry["name"]):
+                return False
+            else:
+                entry["timestamp"] = max(entry["timestamp"], ts)
+                entry["symbol"] = symbol or entry["symbol"]
+                entry["name"] = name or entry["name"]
+            # terms share prefixes ("pepe", "pepe inu"): offer the key once per node
+            nodes = {}
+            for term in _terms(entry["symbol"].lower(), entry["name"].lower()):
+                node = self._root
+                for ch in term:
+                    node = node.setdefault(ch, {})
+                    nodes[id(node)] = node
+                node.setdefault(_HERE, set()).add(key)
+            self._offer(self._root, key, entry["timestamp"], is_new)
+            for node in nodes.values():
+                self._offer(node, key, entry["timestamp"], is_new)
+        return is_new
+
+    def _offer(self, node: Dict[Any, Any], key: Key, ts: int, is_new: bool):
+        top = node.get(_TOP)
+        if top is None:
+            node[_TOP] = [(-ts, key)]
+            return
+        if not is_new:
+            for i, (neg_ts, k) in enumerate(top):
+                if k == key:
+                    if -neg_ts >= ts:
+                        return
+                    del top[i]
+                    break
+        # full and everything in it is newer (the common case when adding newest first)
+        if len(top) >= self.top_k and -top[-1][0] >= ts:
+            return
+        bisect.insort(top, (-ts, key))
+        del top[self.top_k:]
+
+    def rebuild(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Replace the contents with `docs`; returns the token count.
+
+        Pass them newest first (a cursor sorted by timestamp descending): the
+        per-node top lists then fill up once and reject the rest cheaply."""
+        fresh = TokenSearchIndex(self.top_k)
+        for doc in docs:
+            fresh.add(doc)
+        with self._lock:
+            self._root, self._tokens = fresh._root, fresh._tokens
+            self._addresses, self._by_address = fresh._addresses, fresh._by_address
+            # events added while the snapshot was read are pulled again by the next refresh
+            self.last_timestamp = fresh.last_timestamp
+            self.ready = True
+        return len(self._tokens)
+
+    # ---- lookups
+    def _node(self, prefix: str) -> Optional[Dict[Any, Any]]:
+        node = self._root
+        for ch in prefix[:MAX_TERM_LENGTH]:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def _address_range(self, prefix: str):
+        lo = bisect.bisect_left(self._addresses, prefix)
+        hi = bisect.bisect_left(self._addresses, prefix + "\x7f")
+        return lo, hi
+
+    def search(self, prefix: str, limit: int = 10, chain_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent tokens whose symbol, name or a name word (or address) starts with `prefix`."""
+        prefix = (prefix or "").strip().lower()
+        if not prefix:
+            return []
+        with self._lock:
+            if _HEX_PREFIX_RE.match(prefix):
+                lo, hi = self._address_range(prefix)
+                if hi - lo > MAX_RANKED_ADDRESSES:
+                    hi = lo + (limit if chain_id is None else MAX_RANKED_ADDRESSES)
+                keys = heapq.nlargest(limit if chain_id is None else hi - lo,
+                                      (k for a in self._addresses[lo:hi] for k in self._by_address[a]),
+                                      key=lambda k: self._tokens[k]["timestamp"])
+            else:
+                node = self._node(prefix)
+                keys = [k for _, k in node.get(_TOP, [])] if node is not None else []
+                if len(prefix) > MAX_TERM_LENGTH:
+                    keys = [k for k in keys if self._matches(k, prefix)]
+            if chain_id is not None:
+                keys = [k for k in keys if k[0] == int(chain_id)]
+            return [dict(self._tokens[k]) for k in keys[:limit]]
+
+    def candidates(self, q: str, max_candidates: int = 1000) -> Optional[List[str]]:
+        """Addresses (as stored) of every token matching `q` by prefix (the address for a hex `q`,
+        else symbol/name), or None when the index can't answer: not built yet, no match (the
+        event may be newer than the last refresh) or more than `max_candidates` matches."""
+        q = (q or "").strip().lower()
+        if not self.ready or not q:
+            return None
+        with self._lock:
+            keys: Set[Key] = set()
+            if _HEX_PREFIX_RE.match(q):
+                lo, hi = self._address_range(q)
+                if hi - lo > max_candidates:
+                    return None
+                return sorted({self._tokens[k]["address"] for a in self._addresses[lo:hi]
+                               for k in self._by_address[a]}) or None
+            node = self._node(q)
+            stack = [node] if node is not None else []
+            while stack:
+                node = stack.pop()
+                keys.update(node.get(_HERE, ()))
+                if len(keys) > max_candidates:
+                    return None
+                stack.extend(child for ch, child in node.items() if ch)
+            if len(q) > MAX_TERM_LENGTH:
+                # terms are indexed truncated; check the full ones
+                keys = {k for k in keys if self._matches(k, q) or k[1].startswith(q)}
+            return sorted({self._tokens[k]["address"] for k in keys}) or None
+
+    def _matches(self, key: Key, prefix: str) -> bool:
+        entry = self._tokens[key]
+        symbol, name = entry["symbol"].lower(), entry["name"].lower()
+        return any(t.startswith(prefix) for t in [symbol, name] + _WORD_RE.split(name))
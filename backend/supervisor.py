@@ -0,0 +1,84 @@
+"""Run one ingest pipeline per chain and restart the ones that die.
+
+`ChainSupervisor(target, chains, mode)` calls `target(chain_name)` for every
+chain, either in a daemon thread each (mode "thread": one process, shared
+Mongo client and API state) or in a spawned process each (mode "process":
+separate interpreters, so caches, rate limiters and the GIL are not shared;
+status messages of a child only reach its own stdout). A pipeline that
+returns or crashes is restarted after `restart_delay`, doubling up to
+`max_delay` while it keeps failing quickly.
+"""
+import time
+import threading
+import multiprocessing
+from typing import Callable, Dict, List
+
+from backend import metrics
+
+_RESTARTS = metrics.REGISTRY.counter(
+    "ethbot_chain_pipeline_restarts_total", "Ingest pipelines restarted by the supervisor", ["chain"])
+_RUNNING = metrics.REGISTRY.gauge("ethbot_chain_pipelines_running", "Chain ingest pipelines alive")
+
+MODES = ("thread", "process")
+
+
+class ChainSupervisor:
+    def __init__(self, target: Callable[[str], None], chains: List[str], mode: str = "thread",
+                 restart_delay: float = 5.0, max_delay: float = 300.0, poll: float = 1.0):
+        if mode not in MODES:
+            raise ValueError(f"unknown supervisor mode {mode!r} (expected one of {', '.join(MODES)})")
+        self.target = target
+        self.chains = list(chains)
+        self.mode = mode
+        self.restart_delay = restart_delay
+        self.max_delay = max_delay
+        self.poll = poll
+        self._workers: Dict[str, object] = {}
+        self._started_at: Dict[str, float] = {}
+        self._delay: Dict[str, float] = {c: restart_delay for c in self.chains}
+        self._retry_at: Dict[str, float] = {}
+        self._stop = threading.Event()
+
+    def _spawn(self, chain: str):
+        if self.mode == "process":
+            worker = multiprocessing.get_context("spawn").Process(
+                target=self.target, args=(chain,), name=f"ingest-{chain}", daemon=True)
+        else:
+            worker = threading.Thread(target=self.target, args=(chain,), name=f"ingest-{chain}", daemon=True)
+        worker.start()
+        self._workers[chain] = worker
+        self._started_at[chain] = time.time()
+        print(f"Supervisor: started {chain} pipeline ({self.mode})")
+
+    def _check(self, chain: str):
+        worker = self._workers.get(chain)
+        if worker is not None and worker.is_alive():
+            return
+        now = time.time()
+        if worker is not None:
+            self._workers.pop(chain)
+            # a pipeline that ran for a while gets the short delay again
+            if now - self._started_at.get(chain, now) > self.max_delay:
+                self._delay[chain] = self.restart_delay
+            self._retry_at[chain] = now + self._delay[chain]
+            print(f"Supervisor: {chain} pipeline exited; restarting in {self._delay[chain]:.0f}s")
+            self._delay[chain] = min(self.max_delay, self._delay[chain] * 2)
+            return
+        if now >= self._retry_at.get(chain, 0.0):
+            if chain in self._started_at:
+                _RESTARTS.labels(chain).inc()
+            self._spawn(chain)
+
+    def run(self):
+        """Start every pipeline and keep them running (blocks until stop())."""
+        while not self._stop.is_set():
+            for chain in self.chains:
+                self._check(chain)
+            _RUNNING.set(sum(1 for w in self._workers.values() if w.is_alive()))
+            self._stop.wait(self.poll)
+
+    def stop(self):
+        self._stop.set()
+        for worker in self._workers.values():
+            if isinstance(worker, multiprocessing.process.BaseProcess):
+                worker.terminate()
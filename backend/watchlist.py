@@ -1,15 +1,194 @@
 import os
 import json
-from typing import List, Optional
+import glob
+import threading
+from typing import List, Optional, Dict, Set, Iterable, FrozenSet, Tuple
+
+
+class WatchlistIndex:
+    """In-memory lookup of watched deployer addresses.
+
+    Holds the global watchlist as a set plus an inverted address -> usernames
+    map built from the per-user watchlists, so a deployer hit resolves both
+    "is it watched" and "who cares" with a couple of dict/set lookups.
+    All mutations happen in place; `global_addresses` keeps its identity so
+    callers may hold a reference to it.
+    """
+
+    def __init__(self):
+        self.global_addresses: Set[str] = set()
+        self.subscribers: Dict[str, Set[str]] = {}
+        self._user_addresses: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, addr: str) -> bool:
+        return addr in self.global_addresses or addr in self.subscribers
+
+    def __len__(self) -> int:
+        return len(self.global_addresses)
+
+    def users_for(self, addr: str) -> FrozenSet[str]:
+        users = self.subscribers.get(addr)
+        if not users:
+            return frozenset()
+        with self._lock:
+            return frozenset(users)
+
+    def usernames(self) -> List[str]:
+        with self._lock:
+            return list(self._user_addresses)
+
+    def all_addresses(self) -> Set[str]:
+        with self._lock:
+            return set(self.global_addresses) | set(self.subscribers)
+
+    # global watchlist
+    def add_global(self, addr: str):
+        with self._lock:
+            self.global_addresses.add(addr.lower())
+
+    def remove_global(self, addr: str):
+        with self._lock:
+            self.global_addresses.discard(addr.lower())
+
+    def set_global(self, addrs: Iterable[str]):
+        new = {a.lower() for a in addrs if a}
+        with self._lock:
+            self.global_addresses.intersection_update(new)
+            self.global_addresses.update(new)
+
+    # per-user watchlists
+    def add_user(self, username: str, addr: str):
+        addr = addr.lower()
+        with self._lock:
+            self._user_addresses.setdefault(username, set()).add(addr)
+            self.subscribers.setdefault(addr, set()).add(username)
+
+    def remove_user(self, username: str, addr: str):
+        addr = addr.lower()
+        with self._lock:
+            self._user_addresses.get(username, set()).discard(addr)
+            self._unsubscribe(username, addr)
+
+    def set_user(self, username: str, addrs: Iterable[str]):
+        new = {a.lower() for a in (addrs or []) if a}
+        with self._lock:
+            old = self._user_addresses.get(username, set())
+            for addr in old - new:
+                self._unsubscribe(username, addr)
+            for addr in new - old:
+                self.subscribers.setdefault(addr, set()).add(username)
+            if new:
+                self._user_addresses[username] = new
+            else:
+                self._user_addresses.pop(username, None)
+
+    def drop_user(self, username: str):
+        self.set_user(username, [])
+
+    def _unsubscribe(self, username: str, addr: str):
+        users = self.subscribers.get(addr)
+        if users is not None:
+            users.discard(username)
+            if not users:
+                del self.subscribers[addr]
 
 
 class WatchlistManager:
-    def __init__(self, watchlist_collection=None, users_collection=None, resources_dir: str = "resources"):
+    def __init__(self, watchlist_collection=None, users_collection=None, resources_dir: str = "resources",
+                 index: Optional[WatchlistIndex] = None):
         self.watchlist_collection = watchlist_collection
         self.users_collection = users_collection
         self.resources_dir = resources_dir
+        self.index = index if index is not None else WatchlistIndex()
+        self._watch_threads: List[threading.Thread] = []
         os.makedirs(self.resources_dir, exist_ok=True)
 
+    def load_index(self):
+        """(Re)build the index from the global and all per-user watchlists."""
+        self.index.set_global(self.get_global_watchlist())
+        self._load_user_index()
+
+    def _load_user_index(self):
+        seen = set()
+        if self.users_collection is not None:
+            for doc in self.users_collection.find({}, {"_id": 0, "username": 1, "watchlist": 1}):
+                username = doc.get("username")
+                if username:
+                    seen.add(username)
+                    self.index.set_user(username, doc.get("watchlist", []))
+        else:
+            prefix = os.path.join(self.resources_dir, "watchlist_")
+            for path in glob.glob(prefix + "*.json"):
+                username = path[len(prefix):-len(".json")]
+                seen.add(username)
+                self.index.set_user(username, self.get_user_watchlist(username))
+        for username in self.index.usernames():
+            if username not in seen:
+                self.index.drop_user(username)
+
+    def watch_changes(self) -> bool:
+        """Follow Mongo change streams to keep the index live across processes.
+
+        Change streams need a replica set; on a standalone server (or without
+        Mongo) this returns False and the index is only updated by this
+        process's own add/remove calls.
+        """
+        if self.watchlist_collection is None and self.users_collection is None:
+            return False
+        started = False
+        if self.watchlist_collection is not None:
+            started |= self._start_watch(self.watchlist_collection, self._on_global_change, "watchlist")
+        if self.users_collection is not None:
+            started |= self._start_watch(self.users_collection, self._on_user_change, "users")
+        return started
+
+    def _start_watch(self, collection, handler, name: str) -> bool:
+        try:
+            # probe once so a standalone server fails here rather than in the thread
+            stream = collection.watch(full_document="updateLookup")
+        except Exception as e:
+            print(f"Watchlist change stream unavailable for {name}: {e}")
+            return False
+
+        def run():
+            nonlocal stream
+            while True:
+                try:
+                    with stream:
+                        for change in stream:
+                            handler(change)
+                except Exception as e:
+                    print(f"Watchlist change stream for {name} stopped: {e}")
+                # resync in full after any interruption, then resume watching
+                try:
+                    self.load_index()
+                    stream = collection.watch(full_document="updateLookup")
+                except Exception as e:
+                    print(f"Watchlist change stream for {name} could not resume: {e}")
+                    return
+
+        t = threading.Thread(target=run, daemon=True, name=f"watchlist-{name}-changes")
+        t.start()
+        self._watch_threads.append(t)
+        return True
+
+    def _on_global_change(self, change: dict):
+        op = change.get("operationType")
+        doc = change.get("fullDocument") or {}
+        if op in ("insert", "replace", "update") and doc.get("address"):
+            self.index.add_global(doc["address"])
+        else:
+            # deletes only carry the _id, so re-read the (small) global list
+            self.index.set_global(self.get_global_watchlist())
+
+    def _on_user_change(self, change: dict):
+        doc = change.get("fullDocument") or {}
+        if doc.get("username"):
+            self.index.set_user(doc["username"], doc.get("watchlist", []))
+        else:
+            self._load_user_index()
+
     def get_global_watchlist(self) -> List[str]:
         # Use DB-backed global watchlist when a collection is available.
         if self.watchlist_collection is not None:
@@ -22,17 +201,71 @@ class WatchlistManager:
         except Exception:
             return []
 
-    def save_global_watchlist(self, wl: List[str]):
+    def save_global_watchlist(self, wl: List[str], previous: Optional[Iterable[str]] = None) -> Tuple[List[str], List[str]]:
+        """Persist `wl` as the global watchlist by applying only the difference.
+
+        `previous` is the list the caller started from (e.g. the result of
+        get_global_watchlist); when omitted the stored list is read once.
+        Returns the (added, removed) addresses.
+        """
+        new = {a.lower() for a in wl if a}
+        old = set(a.lower() for a in previous) if previous is not None else set(self.get_global_watchlist())
+        added = sorted(new - old)
+        removed = sorted(old - new)
         if self.watchlist_collection is not None:
-            # rewrite collection with idempotent upserts
-            for a in wl:
-                try:
-                    self.watchlist_collection.update_one({"address": a}, {"$set": {"address": a}}, upsert=True)
-                except Exception:
-                    pass
+            from pymongo import UpdateOne, DeleteMany
+            ops = [UpdateOne({"address": a}, {"$setOnInsert": {"address": a}}, upsert=True) for a in added]
+            if removed:
+                ops.append(DeleteMany({"address": {"$in": removed}}))
+            if ops:
+                self.watchlist_collection.bulk_write(ops, ordered=False)
         else:
             with open(os.path.join(self.resources_dir, "watchlist.json"), "w") as f:
-                json.dump(wl, f, indent=2)
+                json.dump(sorted(new), f, indent=2)
+        self.index.set_global(new)
+        return added, removed
+
+    def add_global_addresses(self, addrs: Iterable[str]) -> List[str]:
+        """Bulk-add addresses to the global watchlist in a single write.
+
+        Returns the addresses that were not already present.
+        """
+        new = sorted({a.lower() for a in addrs if a})
+        if not new:
+            return []
+        if self.watchlist_collection is not None:
+            from pymongo import UpdateOne
+            ops = [UpdateOne({"address": a}, {"$setOnInsert": {"address": a}}, upsert=True) for a in new]
+            res = self.watchlist_collection.bulk_write(ops, ordered=False)
+            # upserted_ids maps op index -> _id for the documents that were inserted
+            added = [new[i] for i in sorted((res.upserted_ids or {}).keys())]
+        else:
+            current = self.get_global_watchlist()
+            known = set(current)
+            added = [a for a in new if a not in known]
+            if added:
+                with open(os.path.join(self.resources_dir, "watchlist.json"), "w") as f:
+                    json.dump(current + added, f, indent=2)
+        for a in added:
+            self.index.add_global(a)
+        return added
+
+    def add_user_watchlist_bulk(self, username: str, addrs: Iterable[str]) -> List[str]:
+        new = sorted({a.lower() for a in addrs if a})
+        if self.users_collection is not None:
+            if new:
+                self.users_collection.update_one({"username": username}, {"$addToSet": {"watchlist": {"$each": new}}})
+            wl = self.get_user_watchlist(username)
+        else:
+            wl = self.get_user_watchlist(username)
+            known = set(wl)
+            extra = [a for a in new if a not in known]
+            if extra:
+                wl = wl + extra
+                with open(os.path.join(self.resources_dir, f"watchlist_{username}.json"), "w") as f:
+                    json.dump(wl, f, indent=2)
+        self.index.set_user(username, wl)
+        return wl
 
     def get_user_watchlist(self, username: str) -> List[str]:
         if self.users_collection is not None:
@@ -50,6 +283,7 @@ class WatchlistManager:
         addr = addr.lower()
         if self.users_collection is not None:
             self.users_collection.update_one({"username": username}, {"$addToSet": {"watchlist": addr}})
+            self.index.add_user(username, addr)
             return self.get_user_watchlist(username)
         path = os.path.join(self.resources_dir, f"watchlist_{username}.json")
         wl = self.get_user_watchlist(username)
@@ -57,12 +291,14 @@ class WatchlistManager:
             wl.append(addr)
             with open(path, "w") as f:
                 json.dump(wl, f, indent=2)
+        self.index.add_user(username, addr)
         return wl
 
     def remove_user_watchlist(self, username: str, addr: str) -> List[str]:
         addr = addr.lower()
         if self.users_collection is not None:
             self.users_collection.update_one({"username": username}, {"$pull": {"watchlist": addr}})
+            self.index.remove_user(username, addr)
             return self.get_user_watchlist(username)
         path = os.path.join(self.resources_dir, f"watchlist_{username}.json")
         wl = self.get_user_watchlist(username)
@@ -70,4 +306,5 @@ class WatchlistManager:
             wl = [a for a in wl if a != addr]
             with open(path, "w") as f:
                 json.dump(wl, f, indent=2)
+        self.index.remove_user(username, addr)
         return wl
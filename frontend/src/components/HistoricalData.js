@@ -122,8 +122,8 @@ function HistoricalData() {
                     <TableCell>{main_token?.name || 'Unknown'} ({main_token?.symbol || 'N/A'})</TableCell>
                     <TableCell>{main_token?.address}</TableCell>
                     <TableCell><Chip label={`${Number(entry.liquidity_eth).toFixed(4)} ETH`} size="small" /></TableCell>
-                    <TableCell>{entry.honeypot ? 'Yes' : 'No'}</TableCell>
-                    <TableCell>{entry.ownership_renounced ? 'Yes' : 'No'}</TableCell>
+                    <TableCell>{entry.honeypot == null ? 'Unknown' : (entry.honeypot ? 'Yes' : 'No')}</TableCell>
+                    <TableCell>{entry.ownership_renounced == null ? 'Unknown' : (entry.ownership_renounced ? 'Yes' : 'No')}</TableCell>
                   </TableRow>
                 );
               })
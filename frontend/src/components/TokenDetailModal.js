@@ -34,8 +34,9 @@ function TokenDetailModal({ open, onClose, token }) {
             <Typography variant="subtitle1">Address: {detail.address}</Typography>
             <Typography variant="body2">Pair: {detail.pair_address}</Typography>
             <Typography variant="body2">Liquidity (ETH): {detail.liquidity_eth}</Typography>
-            <Typography variant="body2">Honeypot: {detail.honeypot ? 'Yes' : 'No'}</Typography>
-            <Typography variant="body2">Ownership Renounced: {detail.ownership_renounced ? 'Yes' : 'No'}</Typography>
+            <Typography variant="body2">Honeypot: {detail.honeypot == null ? 'Unknown' : (detail.honeypot ? 'Yes' : 'No')}</Typography>
+            <Typography variant="body2">Ownership Renounced: {detail.ownership_renounced == null ? 'Unknown' : (detail.ownership_renounced ? 'Yes' : 'No')}</Typography>
+            <Typography variant="body2">Analysis: {detail.analysis_level}{detail.needs_full_analysis ? ' (full analysis pending)' : ''}</Typography>
             <Typography variant="body2">Token0: {detail.token0.name} ({detail.token0.symbol})</Typography>
             <Typography variant="body2">Token1: {detail.token1.name} ({detail.token1.symbol})</Typography>
             <pre style={{ marginTop: 10, maxHeight: 200, overflow: 'auto' }}>{JSON.stringify(detail.raw, null, 2)}</pre>
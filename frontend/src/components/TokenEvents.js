@@ -85,8 +85,8 @@ function TokenEvents() {
                   <TableCell>{displayName}{mainToken.symbol ? ` (${mainToken.symbol})` : ''}</TableCell>
                     <TableCell>{event.address}</TableCell>
                     <TableCell><Chip label={`${Number(event.liquidity_eth).toFixed(4)} ETH`} size="small" /></TableCell>
-                  <TableCell>{event.honeypot ? 'Yes' : 'No'}</TableCell>
-                  <TableCell>{event.ownership_renounced ? 'Yes' : 'No'}</TableCell>
+                  <TableCell>{event.honeypot == null ? 'Unknown' : (event.honeypot ? 'Yes' : 'No')}</TableCell>
+                  <TableCell>{event.ownership_renounced == null ? 'Unknown' : (event.ownership_renounced ? 'Yes' : 'No')}</TableCell>
                 </TableRow>
               );
             })}
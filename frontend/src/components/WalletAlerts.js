@@ -1,15 +1,25 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { List, ListItem, ListItemText, Paper, Typography, Box } from '@mui/material';
 
 function WalletAlerts() {
   const [walletAlerts, setWalletAlerts] = useState([]);
+  const lastSeq = useRef(0);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const walletAlertsRes = await fetch('/api/wallet_alerts');
+        // only ask for alerts newer than the last one we have
+        const walletAlertsRes = await fetch(`/api/wallet_alerts?since=${lastSeq.current}`);
         const walletAlertsData = await walletAlertsRes.json();
-        setWalletAlerts(walletAlertsData.wallet_alerts || []);
+        const newAlerts = walletAlertsData.wallet_alerts || [];
+        const serverSeq = walletAlertsData.last_seq || 0;
+        if (serverSeq < lastSeq.current) {
+          // server restarted and its sequence reset; the response holds everything
+          setWalletAlerts(newAlerts);
+        } else if (newAlerts.length > 0) {
+          setWalletAlerts((prev) => prev.concat(newAlerts).slice(-1000));
+        }
+        lastSeq.current = serverSeq;
       } catch (error) {
         console.error('Error fetching wallet alerts:', error);
       }
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+How analysis throughput scales with worker count: threads vs processes.
+
+Starts tools/fake_rpc_node.py in its own process, collects PairCreated logs
+from it, and pushes disjoint slices of those pairs through TokenAnalyzer
+using N analysis threads (one interpreter, one GIL) and N worker processes
+(backend.Core.analyzer.process_pool), for each N in --workers.
+
+    python tools/bench_analysis_workers.py --workers 1,2,4,8 --pairs 200
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if proj_root not in sys.path:
+    sys.path.insert(0, proj_root)
+os.chdir(proj_root)
+
+
+def start_node(args):
+    cmd = [sys.executable, os.path.join("tools", "fake_rpc_node.py"), "--port", "0", "--ws-port", "0",
+           "--pairs-per-block", str(args.pairs_per_block), "--block-time", str(args.block_time),
+           "--latency-ms", str(args.latency_ms)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    url = line.split("HTTP JSON-RPC on ")[1].split(",")[0].strip()
+    return proc, url
+
+
+def collect_jobs(url, count, start_block=20_000_000):
+    from web3 import Web3
+    from backend.Core.analyzer.scheduler import AnalysisJob
+    with open("resources/config.json") as f:
+        config = json.load(f)
+    web3 = Web3(Web3.HTTPProvider(url))
+    weth = config["WETH"].lower()
+    jobs = []
+    while len(jobs) < count:
+        head = web3.eth.block_number
+        logs = web3.provider.make_request("eth_getLogs", [{
+            "fromBlock": hex(start_block), "toBlock": hex(head), "address": config["UNISWAP_FACTORY"]}])["result"]
+        jobs = []
+        for log in logs:
+            token0 = Web3.to_checksum_address("0x" + log["topics"][1][-40:])
+            token1 = Web3.to_checksum_address("0x" + log["topics"][2][-40:])
+            pair = Web3.to_checksum_address("0x" + log["data"][2:66][-40:])
+            job = AnalysisJob(token0, token1, pair, "", log["transactionHash"], int(log["logIndex"], 16),
+                              int(log["blockNumber"], 16), is_weth_pair=weth in (token0.lower(), token1.lower()))
+            jobs.append(job)
+        if len(jobs) < count:
+            time.sleep(0.5)
+    return jobs[:count], config
+
+
+def run_threads(jobs, n, url, config):
+    from backend.Core.providers import make_web3
+    from backend.Core.code_templates import TemplateCache
+    from backend.Core.analyzer.token_analyzer import TokenAnalyzer
+    web3 = make_web3(url)
+    templates = TemplateCache()
+
+    def one(job):
+        TokenAnalyzer(web3, job.token0, job.token1, job.pair, config["UNISWAP_ROUTER"], None,
+                      templates=templates).analyze()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        list(ex.map(one, jobs))
+    return time.perf_counter() - start
+
+
+def run_processes(jobs, n, url, config):
+    from backend.Core.analyzer.process_pool import ProcessAnalysisPool
+    pool = ProcessAnalysisPool(n, url, config["UNISWAP_ROUTER"], None).warm_up()
+    try:
+        start = time.perf_counter()
+        futures = [pool.analyze(job) for job in jobs]
+        for f in futures:
+            f.result()
+        return time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Analysis throughput vs worker count (threads and processes).")
+    ap.add_argument("--workers", default="1,2,4,8", help="comma-separated worker counts")
+    ap.add_argument("--pairs", type=int, default=200, help="pairs analysed per run")
+    ap.add_argument("--modes", default="threads,processes")
+    ap.add_argument("--pairs-per-block", type=int, default=50)
+    ap.add_argument("--block-time", type=float, default=0.05)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    # measure CPU scaling, not the client-side rate limiter
+    os.environ["RPC_RATE_LIMIT"] = "0"
+    os.environ.pop("MONGO_URI", None)
+    counts = [int(w) for w in args.workers.split(",") if w.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+
+    node, url = start_node(args)
+    try:
+        # every run gets fresh pairs so no run benefits from another's caches
+        jobs, config = collect_jobs(url, args.pairs * len(counts) * len(modes))
+        results = []
+        i = 0
+        for mode in modes:
+            for n in counts:
+                batch = jobs[i * args.pairs:(i + 1) * args.pairs]
+                i += 1
+                runner = run_threads if mode == "threads" else run_processes
+                elapsed = runner(batch, n, url, config)
+                results.append({"mode": mode, "workers": n, "pairs": len(batch),
+                                "seconds": round(elapsed, 3), "pairs_per_s": round(len(batch) / elapsed, 1)})
+                if not args.json:
+                    print(f"{mode:>9} x{n:<3} {results[-1]['pairs_per_s']:>8} pairs/s")
+    finally:
+        node.terminate()
+    if args.json:
+        print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
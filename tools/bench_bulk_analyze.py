@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Bulk on-demand analysis benchmark: TokenAnalyzer one token at a time vs.
+BulkAnalyzer's batched rounds (the /api/analyze path), against the fake node.
+
+Both analyse the same --tokens WETH-pair tokens; reported are wall time, RPC
+round trips (a JSON-RPC batch is one) and, for the bulk path, the time until
+the first streamed result:
+
+    python tools/bench_bulk_analyze.py --tokens 200 --latency-ms 20
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if proj_root not in sys.path:
+    sys.path.insert(0, proj_root)
+sys.path.insert(0, os.path.join(proj_root, "tools"))
+os.chdir(proj_root)
+
+from fake_rpc_node import node_from_config, add_node_arguments, node_kwargs
+
+
+def weth_tokens(node, n):
+    node._ensure_generated(node.start_block + n // node.pairs_per_block + 10)
+    weth = node.weth.lower()
+    out = []
+    for rec in node._pairs.values():
+        if weth in (rec["token0"].lower(), rec["token1"].lower()):
+            out.append((rec["token1"] if rec["token0"].lower() == weth else rec["token0"], rec))
+    return out[:n]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk analysis benchmark.")
+    ap.add_argument("--tokens", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=2, help="bulk chunks in flight")
+    ap.add_argument("--batch-size", type=int, default=25, help="addresses per bulk chunk")
+    ap.add_argument("--skip-sequential", action="store_true")
+    ap.add_argument("--json", action="store_true")
+    add_node_arguments(ap)
+    args = ap.parse_args()
+
+    node = node_from_config(**node_kwargs(args)).start()
+    os.environ["RPC_RATE_LIMIT"] = "0"
+    from backend.Core.providers import make_web3
+    from backend.Core.rpc_batch import BatchCaller
+    from backend.Core.analyzer.bulk import BulkAnalyzer, stream_analysis
+    from backend.Core.analyzer.token_analyzer import TokenAnalyzer
+    from backend.Core import token_info
+    from backend.Core.chains import get_chain
+
+    web3 = make_web3(node.http_url)
+    chain = get_chain()
+    tokens = weth_tokens(node, args.tokens)
+    result = {"tokens": len(tokens)}
+
+    if not args.skip_sequential:
+        token_info._info_cache.clear()
+        before = node.stats()["round_trips"]
+        t0 = time.perf_counter()
+        for _, rec in tokens:
+            TokenAnalyzer(web3, rec["token0"], rec["token1"], rec["pair"], chain.router, None,
+                          chain=chain).analyze()
+        result["sequential"] = {"seconds": round(time.perf_counter() - t0, 3),
+                                "round_trips": node.stats()["round_trips"] - before}
+
+    token_info._info_cache.clear()
+    analyzer = BulkAnalyzer(BatchCaller(web3), chain)
+    before = node.stats()["round_trips"]
+    t0 = time.perf_counter()
+    first = None
+    done = 0
+    for _ in stream_analysis(analyzer, [t for t, _ in tokens], concurrency=args.concurrency,
+                             batch_size=args.batch_size):
+        first = first or time.perf_counter() - t0
+        done += 1
+    result["bulk"] = {"seconds": round(time.perf_counter() - t0, 3), "first_result_s": round(first or 0, 3),
+                      "round_trips": node.stats()["round_trips"] - before, "results": done}
+    node.stop()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['tokens']} tokens")
+    for name in ("sequential", "bulk"):
+        if name in result:
+            r = result[name]
+            extra = f", first result after {r['first_result_s']} s" if "first_result_s" in r else ""
+            print(f"  {name:10} {r['seconds']:8.3f} s  {r['round_trips']:6d} round trips{extra}")
+
+
+if __name__ == "__main__":
+    main()
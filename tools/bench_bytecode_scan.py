@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark the static bytecode scanner (backend.Core.checks.bytecode_scan)
+over a corpus of runtime bytecode files.
+
+The corpus is a directory of `*.bin` (raw bytes) or `*.hex` / `*.txt` (hex
+text, with or without 0x) files. Build one from real contracts with --fetch,
+which reads addresses (one per line) and stores eth_getCode results:
+
+    python tools/bench_bytecode_scan.py --fetch addrs.txt --rpc https://... --corpus corpus/
+    python tools/bench_bytecode_scan.py --corpus corpus/ --repeat 20
+
+Without --corpus a synthetic corpus (--synthetic N contracts) is generated so
+the scanner can be timed offline.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from collections import Counter
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if proj_root not in sys.path:
+    sys.path.insert(0, proj_root)
+
+from backend.Core.checks.bytecode_scan import scan_bytecode, RISK_SELECTORS
+
+
+def load_corpus(path):
+    corpus = []
+    for name in sorted(os.listdir(path)):
+        full = os.path.join(path, name)
+        if name.endswith(".bin"):
+            with open(full, "rb") as f:
+                code = f.read()
+        elif name.endswith((".hex", ".txt")):
+            with open(full) as f:
+                text = f.read().strip()
+            code = bytes.fromhex(text[2:] if text.startswith("0x") else text)
+        else:
+            continue
+        if code:
+            corpus.append((name, code))
+    return corpus
+
+
+def fetch_corpus(addresses_file, rpc, out_dir):
+    from web3 import Web3
+    web3 = Web3(Web3.HTTPProvider(rpc))
+    os.makedirs(out_dir, exist_ok=True)
+    saved = 0
+    with open(addresses_file) as f:
+        for line in f:
+            addr = line.strip()
+            if not addr or addr.startswith("#"):
+                continue
+            code = bytes(web3.eth.get_code(Web3.to_checksum_address(addr)))
+            if code:
+                with open(os.path.join(out_dir, addr.lower() + ".bin"), "wb") as out:
+                    out.write(code)
+                saved += 1
+    print(f"Saved {saved} contracts to {out_dir}")
+
+
+def synthetic_corpus(count, size, seed=1):
+    """Solidity-shaped code: a PUSH4 dispatcher (some risky selectors) then random body."""
+    rnd = random.Random(seed)
+    risky = list(RISK_SELECTORS)
+    corpus = []
+    for n in range(count):
+        out = bytearray(bytes.fromhex("6080604052348015600f57600080fd5b50"))
+        for _ in range(rnd.randrange(10, 40)):
+            sel = rnd.choice(risky) if rnd.random() < 0.1 else rnd.getrandbits(32)
+            out += bytes([0x80, 0x63]) + sel.to_bytes(4, "big") + bytes([0x14, 0x61, 0x01, 0x00, 0x57])
+        while len(out) < size:
+            op = rnd.randrange(256)
+            if 0x60 <= op <= 0x7f:
+                out.append(op)
+                out += bytes(rnd.getrandbits(8) for _ in range(op - 0x5f))
+            elif op not in (0xf4, 0xf2, 0xff) or rnd.random() < 0.02:
+                out.append(op)
+        corpus.append((f"synthetic-{n}", bytes(out)))
+    return corpus
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Time the static bytecode risk scanner over a corpus.")
+    ap.add_argument("--corpus", help="directory of .bin/.hex runtime bytecode files")
+    ap.add_argument("--fetch", help="file of addresses to download into --corpus via --rpc")
+    ap.add_argument("--rpc", help="HTTP JSON-RPC endpoint for --fetch")
+    ap.add_argument("--synthetic", type=int, default=500, help="synthetic contracts when no corpus is given")
+    ap.add_argument("--size", type=int, default=12000, help="bytes per synthetic contract")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    if args.fetch:
+        if not (args.rpc and args.corpus):
+            ap.error("--fetch needs --rpc and --corpus")
+        fetch_corpus(args.fetch, args.rpc, args.corpus)
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.synthetic, args.size)
+    if not corpus:
+        ap.error("corpus is empty")
+
+    timings = []
+    flags = Counter()
+    total_bytes = sum(len(code) for _, code in corpus)
+    start = time.perf_counter()
+    for r in range(args.repeat):
+        for _, code in corpus:
+            t = time.perf_counter()
+            result = scan_bytecode(code)
+            timings.append(time.perf_counter() - t)
+            if r == 0:
+                flags.update(result["flags"])
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "contracts": len(corpus),
+        "mean_size_bytes": round(total_bytes / len(corpus)),
+        "scans": len(timings),
+        "mean_us": round(sum(timings) / len(timings) * 1e6, 1),
+        "p50_us": round(percentile(timings, 0.5) * 1e6, 1),
+        "p99_us": round(percentile(timings, 0.99) * 1e6, 1),
+        "mb_per_s": round(total_bytes * args.repeat / elapsed / 1e6, 2),
+        "flagged_contracts": dict(flags),
+    }
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
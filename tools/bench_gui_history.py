@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Historical Data tab filtering cost, without a display.
+
+Writes a synthetic logs/tokens.json-style file with --rows entries, then
+"types" --query one character at a time (plus a honeypot-checkbox toggle) and
+times each filter pass two ways:
+
+  reload   what filter_historical_data used to do: json.load the whole file
+           and scan every entry on every keystroke
+  index    backend.Core.gui.history.HistoryIndex: mtime check, narrowing
+           filter over the previous matches, one page of rows materialized
+
+    python tools/bench_gui_history.py --rows 100000 --query "pepe 42"
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if proj_root not in sys.path:
+    sys.path.insert(0, proj_root)
+
+from backend.Core.gui.history import HistoryIndex, row_from_entry
+
+WORDS = ["pepe", "doge", "moon", "shiba", "inu", "floki", "safe", "elon", "baby", "gem"]
+
+
+def synthetic_entries(n, seed=1):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    weth = {"symbol": "WETH", "name": "Wrapped Ether", "address": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"}
+    out = []
+    for i in range(n):
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}"
+        token = {"symbol": name[:4].upper(), "name": name, "address": "0x%040x" % rng.getrandbits(160)}
+        out.append({
+            "timestamp": (start + timedelta(seconds=12 * i)).isoformat() + "Z",
+            "token0": token, "token1": weth,
+            "pair_address": "0x%040x" % rng.getrandbits(160),
+            "tx_hash": "0x%064x" % rng.getrandbits(256), "log_index": 0,
+            "liquidity_eth": rng.random() * 20,
+            "honeypot": rng.random() < 0.2,
+            "ownership_renounced": rng.random() < 0.5,
+        })
+    return out
+
+
+def filter_by_reload(path, search, honeypots_only):
+    with open(path) as f:
+        entries = json.load(f)
+    matches = []
+    for entry in entries:
+        row = row_from_entry(entry)
+        if row is None or (honeypots_only and not row.honeypot):
+            continue
+        if search and search not in row.haystack:
+            continue
+        matches.append(row)
+    return len(matches)
+
+
+def keystrokes(query):
+    steps = [(query[:i], False) for i in range(1, len(query) + 1)]
+    return steps + [(query, True), (query, False)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="GUI history filter benchmark.")
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--query", default="pepe 4")
+    ap.add_argument("--page-size", type=int, default=200)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(synthetic_entries(args.rows), f)
+        steps = keystrokes(args.query)
+
+        reload_ms = []
+        for search, honeypots_only in steps:
+            t0 = time.perf_counter()
+            filter_by_reload(path, search, honeypots_only)
+            reload_ms.append((time.perf_counter() - t0) * 1000)
+
+        index = HistoryIndex(path)
+        t0 = time.perf_counter()
+        index.refresh()
+        index.filter("", False)
+        initial_load_ms = (time.perf_counter() - t0) * 1000
+        index_ms = []
+        for search, honeypots_only in steps:
+            t0 = time.perf_counter()
+            index.refresh()
+            matches = index.filter(search, honeypots_only)
+            rows, _, _ = index.page(0, args.page_size)
+            [r.cells() for r in rows]
+            index_ms.append((time.perf_counter() - t0) * 1000)
+
+        result = {
+            "rows": len(index),
+            "keystrokes": len(steps),
+            "final_matches": len(matches),
+            "index_initial_load_ms": round(initial_load_ms, 1),
+            "reload_per_keystroke_ms": {"median": round(statistics.median(reload_ms), 2), "max": round(max(reload_ms), 2)},
+            "index_per_keystroke_ms": {"median": round(statistics.median(index_ms), 2), "max": round(max(index_ms), 2)},
+        }
+    finally:
+        os.remove(path)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['rows']} rows, {result['keystrokes']} filter passes, {result['final_matches']} final matches")
+        print(f"index initial load: {result['index_initial_load_ms']} ms")
+        for name in ("reload", "index"):
+            r = result[f"{name}_per_keystroke_ms"]
+            print(f"{name:>7}: median {r['median']:.2f} ms, max {r['max']:.2f} ms per keystroke")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Track cold-import cost of the server modules with `python -X importtime`.
+
+Each module is imported in a fresh interpreter (--repeat times); the report
+gives the median cumulative import time of the module itself and the
+heaviest modules it pulled in, so a new top-level import of web3/pymongo/
+passlib shows up immediately:
+
+    python tools/bench_import_time.py
+    python tools/bench_import_time.py --module web_server --module backend.api --top 15 --json
+    python tools/bench_import_time.py --max-ms 250      # exit 1 if web_server takes longer
+
+Importing must stay free of side effects (no Mongo connection, no config
+reads); the resources are created later by web_server.context.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module):
+    """(total_us, {direct import: cumulative_us}, modules loaded) for one cold import of `module`."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    # keep a local .env from pointing the import at real services
+    env.pop("MONGO_URI", None)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=proj_root, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    lines = []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            lines.append((m.group(4), int(m.group(2)), len(m.group(3))))
+    # importtime prints children before their parent: the module's subtree is the
+    # run of more deeply indented lines right above its own line
+    for i in range(len(lines) - 1, -1, -1):
+        name, total_us, depth = lines[i]
+        if name == module:
+            break
+    else:
+        raise RuntimeError(f"{module} not found in -X importtime output")
+    direct = {}
+    count = 1
+    for child, cum_us, child_depth in reversed(lines[:i]):
+        if child_depth <= depth:
+            break
+        count += 1
+        if child_depth == depth + 2:
+            direct[child] = cum_us
+    return total_us, direct, count
+
+
+def measure(module, repeat, top):
+    runs = [import_profile(module) for _ in range(repeat)]
+    cumulative = defaultdict(list)
+    for _, direct, _ in runs:
+        for name, cum_us in direct.items():
+            cumulative[name].append(cum_us)
+    heaviest = sorted(((statistics.median(v) / 1000.0, name) for name, v in cumulative.items()), reverse=True)
+    return {
+        "module": module,
+        "runs": repeat,
+        "import_ms": round(statistics.median(r[0] for r in runs) / 1000.0, 2),
+        "modules_loaded": int(statistics.median(r[2] for r in runs)),
+        "heaviest_direct_imports_ms": {name: round(ms, 2) for ms, name in heaviest[:top]},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cold import-time benchmark (python -X importtime).")
+    ap.add_argument("--module", action="append", help="module to import (repeatable; default web_server, backend.api)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10, help="heaviest direct imports to list")
+    ap.add_argument("--max-ms", type=float, default=None, help="fail if the first module's import exceeds this")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    modules = args.module or ["web_server", "backend.api"]
+    results = [measure(m, args.repeat, args.top) for m in modules]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"{r['module']}: {r['import_ms']:.1f} ms (median of {r['runs']}), {r['modules_loaded']} modules")
+            for name, ms in r["heaviest_direct_imports_ms"].items():
+                print(f"  {ms:9.1f} ms  {name}")
+
+    if args.max_ms is not None and results[0]["import_ms"] > args.max_ms:
+        print(f"{results[0]['module']} import took {results[0]['import_ms']:.1f} ms > {args.max_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
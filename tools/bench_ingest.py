@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+End-to-end ingestion benchmark against the local fake JSON-RPC node.
+
+Starts tools/fake_rpc_node.py in-process, points WEB3_PROVIDER at it, runs the
+real `run_blockchain_listener` for a fixed duration (without Mongo, so events
+land in the in-memory store) and reports sustained PairCreated throughput,
+per-stage latency percentiles from backend.metrics, and RPC calls per pair.
+
+    python tools/bench_ingest.py --duration 30 --pairs-per-block 10 --latency-ms 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if proj_root not in sys.path:
+    sys.path.insert(0, proj_root)
+sys.path.insert(0, os.path.join(proj_root, "tools"))
+# the listener reads resources/ relative to the repo root
+os.chdir(proj_root)
+
+from fake_rpc_node import node_from_config, add_node_arguments, node_kwargs
+
+
+def stage_percentiles(metrics_module):
+    out = {}
+    for labels, child in metrics_module.STAGE_SECONDS._children.items():
+        counts, total = child.snapshot()
+        n = sum(counts)
+        if not n:
+            continue
+        out[labels[0]] = {
+            "count": n,
+            "mean_ms": round(total / n * 1000, 3),
+            "p50_ms": child.quantile(0.50) * 1000,
+            "p95_ms": child.quantile(0.95) * 1000,
+            "p99_ms": child.quantile(0.99) * 1000,
+        }
+    return out
+
+
+def events_by_outcome(metrics_module):
+    return {labels[0]: int(c.value) for labels, c in metrics_module.EVENTS_TOTAL._children.items()}
+
+
+def run(args):
+    node = node_from_config(**node_kwargs(args)).start()
+    os.environ["WEB3_PROVIDER"] = node.ws_url if args.websocket and node.ws_url else node.http_url
+    os.environ.pop("MONGO_URI", None)
+
+    import web_server
+    from backend import metrics
+
+    t = threading.Thread(target=web_server.run_blockchain_listener, daemon=True)
+    t.start()
+
+    # let the listener connect and install its filter before measuring
+    time.sleep(args.warmup)
+    start_events = events_by_outcome(metrics).get("inserted", 0)
+    start_calls = node.stats()
+    start = time.time()
+    time.sleep(args.duration)
+    elapsed = time.time() - start
+    end_events = events_by_outcome(metrics).get("inserted", 0)
+    end_calls = node.stats()
+
+    pairs = end_events - start_events
+    calls = end_calls["total_calls"] - start_calls["total_calls"]
+    by_method = {m: n - start_calls["calls"].get(m, 0) for m, n in end_calls["calls"].items()}
+    eth_calls = {m: n - start_calls["eth_calls"].get(m, 0) for m, n in end_calls["eth_calls"].items()}
+    produced = (end_calls["head"] - start_calls["head"]) * args.pairs_per_block
+    report = {
+        "duration_s": round(elapsed, 2),
+        "pairs_produced": produced,
+        "pairs_persisted": pairs,
+        "throughput_pairs_per_s": round(pairs / elapsed, 2) if elapsed else 0.0,
+        "rpc_calls_per_pair": round(calls / pairs, 2) if pairs else None,
+        "rpc_calls_by_method_per_pair": {m: round(n / pairs, 2) for m, n in by_method.items() if n} if pairs else {},
+        "eth_calls_by_function_per_pair": {m: round(n / pairs, 2) for m, n in eth_calls.items() if n} if pairs else {},
+        "errors_injected": end_calls["errors_injected"],
+        "stages": stage_percentiles(metrics),
+        "events": events_by_outcome(metrics),
+    }
+    node.stop()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--websocket", action="store_true", help="connect over websocket instead of HTTP")
+    parser.add_argument("--json", action="store_true", help="print the report as one JSON line")
+    add_node_arguments(parser)
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(json.dumps(report, indent=2))
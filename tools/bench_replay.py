@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Deterministic per-pair RPC / CPU benchmark built on recorded RPC traffic.
+
+record: run the listener against a provider (a live node via --provider, or
+        the local fake node by default) with RPC_RECORD_PATH set, producing a
+        gzip JSON-lines recording.
+replay: serve that recording through ReplayProvider and push every recorded
+        PairCreated log through the listener's per-pair steps (decode,
+        get_transaction, TokenAnalyzer.analyze), reporting RPC round trips
+        and CPU time per pair. With --baseline the report is diffed against a
+        previous one and the exit code is non-zero on regression.
+
+    python tools/bench_replay.py record --out bench.rpc.gz --duration 20
+    python tools/bench_replay.py replay --recording bench.rpc.gz --save base.json
+    python tools/bench_replay.py replay --recording bench.rpc.gz --baseline base.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import Counter
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if proj_root not in sys.path:
+    sys.path.insert(0, proj_root)
+sys.path.insert(0, os.path.join(proj_root, "tools"))
+os.chdir(proj_root)
+
+
+def record(args):
+    os.environ["RPC_RECORD_PATH"] = args.out
+    os.environ.pop("MONGO_URI", None)
+    node = None
+    if args.provider:
+        os.environ["WEB3_PROVIDER"] = args.provider
+    else:
+        from fake_rpc_node import node_from_config
+        node = node_from_config(pairs_per_block=args.pairs_per_block, block_time=args.block_time).start()
+        os.environ["WEB3_PROVIDER"] = node.http_url
+
+    import web_server
+    threading.Thread(target=web_server.run_blockchain_listener, daemon=True).start()
+    time.sleep(args.duration)
+    if web_server.rpc_recorder is not None:
+        print(f"Recorded {web_server.rpc_recorder.recorded} RPC calls to {args.out}")
+        web_server.rpc_recorder.close()
+    if node is not None:
+        node.stop()
+
+
+def recorded_logs(path):
+    """PairCreated logs returned by filter polls / getLogs in the recording, in order."""
+    import gzip
+    logs, seen = [], set()
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["m"] not in ("eth_getFilterChanges", "eth_getLogs") or not isinstance(entry.get("r"), list):
+                continue
+            for log in entry["r"]:
+                key = (log.get("transactionHash"), log.get("logIndex"))
+                if key not in seen:
+                    seen.add(key)
+                    logs.append(log)
+    return logs
+
+
+def replay(args):
+    from web3 import Web3
+    from backend.Core.rpc_recorder import ReplayProvider
+    from backend.Core.analyzer.token_analyzer import TokenAnalyzer
+
+    with open("resources/config.json") as f:
+        config = json.load(f)
+    with open("resources/abis.json") as f:
+        pair_created_abi = json.load(f)
+
+    provider = ReplayProvider(args.recording, latency=args.latency)
+    web3 = Web3(provider)
+    factory = web3.eth.contract(address=config["UNISWAP_FACTORY"], abi=pair_created_abi)
+    # only logs the recording session got as far as processing can be replayed
+    logs = [l for l in recorded_logs(args.recording)
+            if provider.has("eth_getTransactionByHash", [l["transactionHash"]])]
+
+    per_pair_calls = []
+    per_pair_cpu = []
+    wall_start = time.perf_counter()
+    for raw in logs:
+        before = Counter(provider.calls)
+        cpu_start = time.process_time()
+        # raw JSON logs need web3's formatting before process_log, as the filter would do
+        log = _format_log(raw)
+        event = factory.events.PairCreated().process_log(log)
+        args_ = event["args"]
+        web3.eth.get_transaction(log["transactionHash"])
+        # pinned to the log's block like the listener, so the recorded calls match
+        block = log["blockNumber"] if os.getenv("ANALYSIS_PIN", "1") != "0" else None
+        analyzer = TokenAnalyzer(web3, args_["token0"], args_["token1"], args_["pair"],
+                                 config["UNISWAP_ROUTER"], os.getenv("PUBLIC_ADDRESS"), block_identifier=block)
+        analyzer.analyze()
+        per_pair_cpu.append(time.process_time() - cpu_start)
+        per_pair_calls.append(Counter(provider.calls) - before)
+    wall = time.perf_counter() - wall_start
+
+    n = len(logs)
+    total_calls = Counter()
+    for c in per_pair_calls:
+        total_calls.update(c)
+    cpu_sorted = sorted(per_pair_cpu)
+    report = {
+        "pairs": n,
+        "rpc_calls_per_pair": round(sum(total_calls.values()) / n, 3) if n else 0.0,
+        "rpc_calls_by_method_per_pair": {m: round(v / n, 3) for m, v in sorted(total_calls.items())} if n else {},
+        "cpu_ms_per_pair_mean": round(sum(per_pair_cpu) / n * 1000, 3) if n else 0.0,
+        "cpu_ms_per_pair_p95": round(cpu_sorted[int(0.95 * (n - 1))] * 1000, 3) if n else 0.0,
+        "wall_s": round(wall, 3),
+        "replay_misses": dict(provider.misses),
+    }
+    return report
+
+
+def _format_log(raw):
+    from hexbytes import HexBytes
+    from web3.datastructures import AttributeDict
+    ints = ("blockNumber", "logIndex", "transactionIndex")
+    out = {}
+    for k, v in raw.items():
+        if k in ints and isinstance(v, str):
+            out[k] = int(v, 16)
+        elif k == "topics":
+            out[k] = [HexBytes(t) for t in v]
+        elif k in ("data", "blockHash", "transactionHash"):
+            out[k] = HexBytes(v)
+        else:
+            out[k] = v
+    return AttributeDict(out)
+
+
+def compare(report, baseline, max_regression):
+    regressions = []
+    print("metric                         baseline      current     change")
+    for key in ("rpc_calls_per_pair", "cpu_ms_per_pair_mean", "cpu_ms_per_pair_p95"):
+        old, new = baseline.get(key, 0.0), report.get(key, 0.0)
+        change = ((new - old) / old * 100.0) if old else 0.0
+        print(f"{key:28s} {old:11.3f} {new:11.3f} {change:+9.1f}%")
+        # RPC counts are deterministic, so any increase is a regression
+        limit = 0.0 if key == "rpc_calls_per_pair" else max_regression
+        if change > limit:
+            regressions.append(key)
+    for method in sorted(set(baseline.get("rpc_calls_by_method_per_pair", {})) | set(report["rpc_calls_by_method_per_pair"])):
+        old = baseline.get("rpc_calls_by_method_per_pair", {}).get(method, 0.0)
+        new = report["rpc_calls_by_method_per_pair"].get(method, 0.0)
+        if old != new:
+            print(f"  {method:26s} {old:11.3f} {new:11.3f}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rec = sub.add_parser("record")
+    rec.add_argument("--out", required=True)
+    rec.add_argument("--duration", type=float, default=20.0)
+    rec.add_argument("--provider", help="record against this endpoint instead of the fake node")
+    rec.add_argument("--pairs-per-block", type=int, default=5)
+    rec.add_argument("--block-time", type=float, default=1.0)
+
+    rep = sub.add_parser("replay")
+    rep.add_argument("--recording", required=True)
+    rep.add_argument("--latency", choices=["zero", "original"], default="zero")
+    rep.add_argument("--save", help="write the report to this file")
+    rep.add_argument("--baseline", help="compare against a report saved with --save")
+    rep.add_argument("--max-regression", type=float, default=10.0, help="allowed CPU time increase in percent")
+
+    args = parser.parse_args()
+    if args.cmd == "record":
+        record(args)
+        sys.exit(0)
+
+    report = replay(args)
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print(f"Regression in: {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Token search index benchmark: build time, memory and per-lookup latency.
+
+Builds backend.search_index.TokenSearchIndex from --tokens synthetic events
+(newest first, as run_search_index_sync does from Mongo) and times
+`search(prefix)` (/api/search) and `candidates(q)` (the `q` pre-selection)
+for a few typical prefixes:
+
+    python tools/bench_search_index.py --tokens 100000 --lookups 500
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if proj_root not in sys.path:
+    sys.path.insert(0, proj_root)
+
+from backend.search_index import TokenSearchIndex
+
+WORDS = ["pepe", "doge", "moon", "shiba", "inu", "floki", "safe", "elon", "baby", "gem"]
+WETH = {"address": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", "name": "Wrapped Ether", "symbol": "WETH"}
+
+
+def synthetic_events(n, seed=1):
+    rng = random.Random(seed)
+    now = int(time.time())
+    out = []
+    for i in range(n):
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}"
+        address = "0x%040X" % rng.getrandbits(160)
+        out.append({"address": address, "chain_id": 1, "timestamp": now - i,
+                    "token0_info": {"address": address, "name": name, "symbol": f"{name[:3].upper()}{i % 100}"},
+                    "token1_info": WETH})
+    return out
+
+
+def time_us(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return round((time.perf_counter() - t0) / n * 1e6, 1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Token search index benchmark.")
+    ap.add_argument("--tokens", type=int, default=100000)
+    ap.add_argument("--lookups", type=int, default=500, help="repetitions per prefix")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    events = synthetic_events(args.tokens)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    index = TokenSearchIndex()
+    t0 = time.perf_counter()
+    index.rebuild(events)
+    build_s = time.perf_counter() - t0
+    rss_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+
+    prefixes = ["p", "pepe", "moon", "pep4", "zzz", events[10]["address"][:8].lower(), events[10]["address"].lower()]
+    lookups = {}
+    for p in prefixes:
+        candidates = index.candidates(p)
+        lookups[p] = {
+            "search_us": time_us(lambda: index.search(p, 10), args.lookups),
+            "candidates_us": time_us(lambda: index.candidates(p), args.lookups),
+            "candidates": "none (regex)" if candidates is None else len(candidates),
+        }
+
+    result = {"tokens": len(index), "build_s": round(build_s, 2), "rss_growth_mb": round(rss_mb, 1),
+              "lookups": lookups}
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['tokens']} tokens: built in {result['build_s']} s, ~{result['rss_growth_mb']} MB")
+        for p, r in lookups.items():
+            print(f"  {p[:16]!r:20} search {r['search_us']:8.1f} us   candidates {r['candidates_us']:8.1f} us"
+                  f"   ({r['candidates']})")
+
+
+if __name__ == "__main__":
+    main()
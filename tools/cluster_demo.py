@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Run several listener replicas against one local mongod and the fake node,
+kill the ingest leader part-way through, and report failover time and
+whether every pair was analysed exactly once.
+
+    mongod --dbpath /tmp/ethbot-db &
+    python tools/cluster_demo.py --replicas 3 --duration 40 --kill-after 15
+
+Uses its own database (MONGO_DB, default eth_bot_cluster_demo) and drops it
+at start.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from collections import Counter
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if proj_root not in sys.path:
+    sys.path.insert(0, proj_root)
+sys.path.insert(0, os.path.join(proj_root, "tools"))
+os.chdir(proj_root)
+
+REPLICA = "import web_server; web_server.run_blockchain_listener()"
+
+
+def spawn(member_id, env):
+    env = dict(env, CLUSTER_MEMBER_ID=member_id)
+    return subprocess.Popen([sys.executable, "-c", REPLICA], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Leader election / partitioning demo with local replicas.")
+    ap.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://127.0.0.1:27017"))
+    ap.add_argument("--db", default="eth_bot_cluster_demo")
+    ap.add_argument("--replicas", type=int, default=3)
+    ap.add_argument("--duration", type=float, default=40.0)
+    ap.add_argument("--kill-after", type=float, default=15.0, help="seconds before the leader is killed (0: never)")
+    ap.add_argument("--lease-ttl", type=float, default=6.0)
+    ap.add_argument("--pairs-per-block", type=int, default=3)
+    ap.add_argument("--block-time", type=float, default=1.0)
+    args = ap.parse_args()
+
+    from pymongo import MongoClient
+    from fake_rpc_node import node_from_config
+
+    client = MongoClient(args.mongo_uri, serverSelectionTimeoutMS=3000)
+    client.admin.command("ping")
+    client.drop_database(args.db)
+    db = client[args.db]
+
+    node = node_from_config(pairs_per_block=args.pairs_per_block, block_time=args.block_time).start()
+    env = dict(os.environ, MONGO_URI=args.mongo_uri, MONGO_DB=args.db, WEB3_PROVIDER=node.http_url,
+               CLUSTER_MODE="1", CLUSTER_LEASE_TTL=str(args.lease_ttl), RECHECK_ENABLED="0")
+    procs = {f"replica-{i}": spawn(f"replica-{i}", env) for i in range(args.replicas)}
+
+    start = time.time()
+    killed = None
+    killed_at = None
+    failover = None
+    try:
+        while time.time() - start < args.duration:
+            time.sleep(1)
+            lease = db.leases.find_one({"_id": "ingest_leader"}) or {}
+            holder = lease.get("holder")
+            jobs = Counter(d["status"] for d in db.analysis_jobs.find({}, {"status": 1}))
+            live = db.members.count_documents({"last_seen": {"$gte": time.time() - 6}})
+            print(f"t={time.time() - start:5.1f}s leader={holder} epoch={lease.get('epoch')} live={live} "
+                  f"jobs={dict(jobs)} persisted={db.token_events.count_documents({})}")
+            if args.kill_after and killed is None and time.time() - start >= args.kill_after and holder in procs:
+                procs[holder].kill()
+                killed, killed_at = holder, time.time()
+                print(f"killed leader {holder}")
+            if killed and failover is None and holder and holder != killed:
+                failover = time.time() - killed_at
+                print(f"new leader {holder} after {failover:.1f}s")
+    finally:
+        for p in procs.values():
+            p.terminate()
+        for p in procs.values():
+            p.wait(timeout=10)
+
+    produced = set(node._txs)
+    persisted = list(db.token_events.find({}, {"tx_hash": 1, "log_index": 1}))
+    keys = Counter((d["tx_hash"], d["log_index"]) for d in persisted)
+    analysed_by = Counter(d.get("claimed_by") for d in db.analysis_jobs.find({}, {"claimed_by": 1}))
+    attempts = Counter(d.get("attempts", 0) for d in db.analysis_jobs.find({}, {"attempts": 1}))
+    node.stop()
+    report = {
+        "pairs_created_by_node": len(produced),
+        "jobs_published": db.analysis_jobs.count_documents({}),
+        "token_events_persisted": len(persisted),
+        "duplicate_rows": sum(1 for c in keys.values() if c > 1),
+        "jobs_by_replica": dict(analysed_by),
+        "claim_attempts": dict(attempts),
+        "killed_leader": killed,
+        "failover_seconds": round(failover, 2) if failover is not None else None,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an Ethereum JSON-RPC node, for benchmarks and offline runs.
+
+Serves a synthetic chain where every block contains a configurable number of
+Uniswap V2 PairCreated logs, together with the transactions that emitted them
+and the ERC20 / pair / router eth_call results the analyzer asks for. Each
+method can be given an artificial latency and a random error rate (returned
+as the -32005 "limit exceeded" error most providers use for throttling).
+
+HTTP JSON-RPC (including batches) is always served; a websocket endpoint is
+added when the `websockets` package is available.
+
+    python tools/fake_rpc_node.py --port 8545 --pairs-per-block 5 --block-time 1
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from eth_abi import encode, decode
+from eth_utils import keccak, to_checksum_address
+
+proj_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAIR_CREATED_TOPIC = "0x" + keccak(text="PairCreated(address,address,address,uint256)").hex()
+
+SELECTORS = {
+    "0x06fdde03": "name",
+    "0x95d89b41": "symbol",
+    "0x313ce567": "decimals",
+    "0x0902f1ac": "getReserves",
+    "0x0dfe1681": "token0",
+    "0xd21220a7": "token1",
+    "0x8da5cb5b": "owner",
+    "0xd06ca61f": "getAmountsOut",
+    "0x70a08231": "balanceOf",
+    "0xc45a0155": "factory",
+    "0xe6a43905": "getPair",
+}
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def _h(*parts) -> bytes:
+    return hashlib.sha256(":".join(str(p) for p in parts).encode()).digest()
+
+
+def _addr(*parts) -> str:
+    return to_checksum_address("0x" + _h(*parts)[:20].hex())
+
+
+def _hex(n: int) -> str:
+    return hex(int(n))
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class FakeEthNode:
+    """Deterministic synthetic chain plus a JSON-RPC dispatcher.
+
+    The head block advances with wall-clock time (`block_time` seconds per
+    block) from `start_block`. Everything about a pair (tokens, deployer,
+    reserves, honeypot-ness) is derived from its (block, index) so the chain
+    is reproducible across runs with the same seed.
+    """
+
+    def __init__(self, factory: str, router: str, weth: str, pairs_per_block: int = 5,
+                 block_time: float = 1.0, start_block: int = 20_000_000, latency: float = 0.0,
+                 method_latency: Optional[Dict[str, float]] = None, error_rate: float = 0.0,
+                 honeypot_rate: float = 0.2, weth_pair_rate: float = 0.9, seed: int = 1):
+        self.factory = factory.lower()
+        self.router = router.lower()
+        self.weth = to_checksum_address(weth)
+        self.pairs_per_block = int(pairs_per_block)
+        self.block_time = float(block_time)
+        self.start_block = int(start_block)
+        self.latency = float(latency)
+        self.method_latency = dict(method_latency or {})
+        self.error_rate = float(error_rate)
+        self.honeypot_rate = float(honeypot_rate)
+        self.weth_pair_rate = float(weth_pair_rate)
+        self.seed = seed
+        self.t0 = time.time()
+        self.calls: Counter = Counter()
+        self.eth_calls: Counter = Counter()
+        self.errors_injected = 0
+        # HTTP/websocket requests; a JSON-RPC batch is one round trip
+        self.round_trips = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._filters: Dict[str, Dict[str, Any]] = {}
+        self._next_filter = 1
+        # lookup tables filled as pairs are generated
+        self._pairs: Dict[str, Dict[str, Any]] = {}
+        self._pair_by_tokens: Dict[tuple, str] = {}
+        self._tokens: Dict[str, Dict[str, Any]] = {}
+        self._txs: Dict[str, Dict[str, Any]] = {}
+        self._by_block: Dict[int, List[Dict[str, Any]]] = {}
+        self._generated_upto = self.start_block
+        self._http = None
+        self._ws = None
+
+    # ---- synthetic chain
+    def head(self) -> int:
+        return self.start_block + int((time.time() - self.t0) / self.block_time)
+
+    def block_timestamp(self, number: int) -> int:
+        return int(self.t0 + (number - self.start_block) * self.block_time)
+
+    def _pair_record(self, block: int, idx: int) -> Dict[str, Any]:
+        seed = (self.seed, block, idx)
+        rnd = random.Random(_h(*seed))
+        token = _addr("token", *seed)
+        if rnd.random() < self.weth_pair_rate:
+            other = self.weth
+        else:
+            other = _addr("quote", *seed)
+        token0, token1 = sorted([token, other], key=lambda a: a.lower())
+        pair = _addr("pair", *seed)
+        tx_hash = "0x" + _h("tx", *seed).hex()
+        deployer = _addr("deployer", self.seed, rnd.randrange(1000))
+        rec = {
+            "block": block, "index": idx, "token0": token0, "token1": token1, "pair": pair,
+            "tx_hash": tx_hash, "deployer": deployer,
+            "reserve_weth": int(rnd.uniform(0.01, 50) * 10 ** 18),
+            "reserve_token": int(rnd.uniform(1e6, 1e12) * 10 ** 18),
+        }
+        for t in (token0, token1):
+            if t == self.weth or t.lower() in self._tokens:
+                continue
+            self._tokens[t.lower()] = {
+                "name": f"Token {t[2:8]}", "symbol": t[2:6].upper(), "decimals": 18,
+                "owner": ZERO_ADDRESS if rnd.random() < 0.5 else deployer,
+                "honeypot": rnd.random() < self.honeypot_rate,
+            }
+            # most launches are clones of a few templates; honeypots share their own
+            info = self._tokens[t.lower()]
+            if info["honeypot"]:
+                template = "honeypot"
+            elif rnd.random() < 0.7:
+                template = f"clean{rnd.randrange(4)}"
+            else:
+                template = t.lower()
+            info["code"] = "0x6080604052" + _h("code", template).hex()
+        return rec
+
+    def _ensure_generated(self, upto: int):
+        with self._lock:
+            while self._generated_upto <= upto:
+                b = self._generated_upto
+                recs = [self._pair_record(b, i) for i in range(self.pairs_per_block)]
+                for rec in recs:
+                    self._pairs[rec["pair"].lower()] = rec
+                    self._pair_by_tokens[(rec["token0"].lower(), rec["token1"].lower())] = rec["pair"]
+                    self._txs[rec["tx_hash"]] = rec
+                self._by_block[b] = recs
+                self._generated_upto += 1
+
+    def logs_between(self, from_block: int, to_block: int, addresses=None, topic0s=None) -> List[Dict[str, Any]]:
+        if addresses is not None and self.factory not in {a.lower() for a in addresses}:
+            return []
+        if topic0s is not None and PAIR_CREATED_TOPIC[2:] not in {t.lower().replace("0x", "") for t in topic0s}:
+            return []
+        from_block = max(from_block, self.start_block)
+        to_block = min(to_block, self.head())
+        self._ensure_generated(to_block)
+        out = []
+        for b in range(from_block, to_block + 1):
+            for rec in self._by_block.get(b, []):
+                out.append(self._log_for(rec))
+        return out
+
+    def _log_for(self, rec: Dict[str, Any]) -> Dict[str, Any]:
+        b, i = rec["block"], rec["index"]
+        return {
+            "address": to_checksum_address(self.factory),
+            "topics": [
+                PAIR_CREATED_TOPIC,
+                "0x" + encode(["address"], [rec["token0"]]).hex(),
+                "0x" + encode(["address"], [rec["token1"]]).hex(),
+            ],
+            "data": "0x" + encode(["address", "uint256"], [rec["pair"], b * 1000 + i]).hex(),
+            "blockNumber": _hex(b),
+            "blockHash": "0x" + _h("block", self.seed, b).hex(),
+            "transactionHash": rec["tx_hash"],
+            "transactionIndex": _hex(i),
+            "logIndex": _hex(i),
+            "removed": False,
+        }
+
+    # ---- JSON-RPC
+    def handle(self, req: Dict[str, Any], delay: bool = True) -> Dict[str, Any]:
+        method = req.get("method", "")
+        params = req.get("params") or []
+        with self._lock:
+            self.calls[method] += 1
+        if delay:
+            self._round_trip([method])
+        try:
+            if self.error_rate and self._rng.random() < self.error_rate:
+                with self._lock:
+                    self.errors_injected += 1
+                raise RpcError(-32005, "limit exceeded")
+            result = self.dispatch(method, params)
+            return {"jsonrpc": "2.0", "id": req.get("id"), "result": result}
+        except RpcError as e:
+            return {"jsonrpc": "2.0", "id": req.get("id"), "error": {"code": e.code, "message": e.message}}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": req.get("id"), "error": {"code": -32000, "message": str(e)}}
+
+    def _round_trip(self, methods: List[str]):
+        with self._lock:
+            self.round_trips += 1
+        delay = max((self.method_latency.get(m, self.latency) for m in methods), default=0.0)
+        if delay:
+            time.sleep(delay)
+
+    def handle_batch(self, body: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # one round trip: the batch waits for its slowest method once, not per request
+        self._round_trip([r.get("method", "") for r in body])
+        return [self.handle(r, delay=False) for r in body]
+
+    def dispatch(self, method: str, params: List[Any]):
+        # every node knows the whole chain up to its head, whether or not logs were polled
+        self._ensure_generated(self.head())
+        if method == "web3_clientVersion":
+            return "FakeEthNode/1.0"
+        if method in ("eth_chainId",):
+            return _hex(1)
+        if method == "net_version":
+            return "1"
+        if method == "eth_blockNumber":
+            return _hex(self.head())
+        if method == "eth_getBlockByNumber":
+            tag = params[0]
+            number = self.head() if tag in ("latest", "pending", "safe", "finalized") else int(tag, 16)
+            return self._block(number)
+        if method == "eth_newFilter":
+            spec = params[0] if params else {}
+            with self._lock:
+                fid = _hex(self._next_filter)
+                self._next_filter += 1
+                self._filters[fid] = {"spec": spec, "last": self.head()}
+            return fid
+        if method == "eth_uninstallFilter":
+            with self._lock:
+                return self._filters.pop(params[0], None) is not None
+        if method == "eth_getFilterChanges":
+            with self._lock:
+                f = self._filters.get(params[0])
+            if f is None:
+                raise RpcError(-32000, "filter not found")
+            head = self.head()
+            start, f["last"] = f["last"] + 1, head
+            addresses, topic0s = self._spec_filters(f["spec"])
+            return self.logs_between(start, head, addresses, topic0s)
+        if method == "eth_getLogs":
+            spec = params[0] if params else {}
+            addresses, topic0s = self._spec_filters(spec)
+            head = self.head()
+            return self.logs_between(self._block_arg(spec.get("fromBlock"), head),
+                                     self._block_arg(spec.get("toBlock"), head), addresses, topic0s)
+        if method == "eth_getTransactionByHash":
+            rec = self._txs.get(params[0])
+            return self._transaction(rec) if rec else None
+        if method == "eth_getCode":
+            addr = params[0].lower()
+            if addr in self._tokens:
+                return self._tokens[addr]["code"]
+            return "0x6080604052" if addr in self._pairs else "0x"
+        if method == "eth_call":
+            return self._eth_call(params[0])
+        if method == "eth_gasPrice":
+            return _hex(10 ** 9)
+        raise RpcError(-32601, f"method {method} not supported by fake node")
+
+    @staticmethod
+    def _spec_filters(spec: Dict[str, Any]):
+        address = spec.get("address")
+        if isinstance(address, str):
+            address = [address]
+        topics = spec.get("topics") or []
+        topic0 = topics[0] if topics else None
+        if isinstance(topic0, str):
+            topic0 = [topic0]
+        return address, topic0
+
+    @staticmethod
+    def _block_arg(value, head: int) -> int:
+        if value is None or value in ("latest", "pending", "safe", "finalized"):
+            return head
+        if value == "earliest":
+            return 0
+        return int(value, 16) if isinstance(value, str) else int(value)
+
+    def _block(self, number: int) -> Dict[str, Any]:
+        return {
+            "number": _hex(number),
+            "hash": "0x" + _h("block", self.seed, number).hex(),
+            "parentHash": "0x" + _h("block", self.seed, number - 1).hex(),
+            "timestamp": _hex(self.block_timestamp(number)),
+            "gasLimit": _hex(30_000_000), "gasUsed": _hex(0),
+            "miner": ZERO_ADDRESS, "extraData": "0x", "transactions": [],
+            "difficulty": "0x0", "nonce": "0x0000000000000000", "size": _hex(0),
+            "baseFeePerGas": _hex(10 ** 9),
+        }
+
+    def _transaction(self, rec: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "hash": rec["tx_hash"],
+            "blockHash": "0x" + _h("block", self.seed, rec["block"]).hex(),
+            "blockNumber": _hex(rec["block"]),
+            "from": rec["deployer"],
+            "to": to_checksum_address(self.router),
+            "gas": _hex(3_000_000), "gasPrice": _hex(10 ** 9),
+            "input": "0x", "nonce": _hex(rec["index"]),
+            "transactionIndex": _hex(rec["index"]), "value": _hex(0),
+            "type": "0x0", "v": "0x25", "r": "0x1", "s": "0x1", "chainId": "0x1",
+        }
+
+    def _eth_call(self, call: Dict[str, Any]) -> str:
+        to = (call.get("to") or "").lower()
+        data = call.get("data") or call.get("input") or "0x"
+        selector = data[:10]
+        fn = SELECTORS.get(selector, selector)
+        with self._lock:
+            self.eth_calls[fn] += 1
+        args = bytes.fromhex(data[10:])
+        if to == self.router and fn == "getAmountsOut":
+            amount_in, path = decode(["uint256", "address[]"], args)
+            return "0x" + encode(["uint256[]"], [[amount_in, self._quote(amount_in, path)]]).hex()
+        if to in self._pairs:
+            rec = self._pairs[to]
+            if fn == "getReserves":
+                r0, r1 = ((rec["reserve_weth"], rec["reserve_token"]) if rec["token0"] == self.weth
+                          else (rec["reserve_token"], rec["reserve_weth"]))
+                return "0x" + encode(["uint112", "uint112", "uint32"], [r0, r1, self.block_timestamp(rec["block"])]).hex()
+            if fn in ("token0", "token1"):
+                return "0x" + encode(["address"], [rec[fn]]).hex()
+            if fn == "factory":
+                return "0x" + encode(["address"], [to_checksum_address(self.factory)]).hex()
+        if to == self.factory and fn == "getPair":
+            key = tuple(sorted(x.lower() for x in decode(["address", "address"], args)))
+            return "0x" + encode(["address"], [self._pair_by_tokens.get(key, ZERO_ADDRESS)]).hex()
+        token = self._tokens.get(to)
+        if token is not None:
+            if fn in ("name", "symbol"):
+                return "0x" + encode(["string"], [token[fn]]).hex()
+            if fn == "decimals":
+                return "0x" + encode(["uint8"], [token["decimals"]]).hex()
+            if fn == "owner":
+                return "0x" + encode(["address"], [token["owner"]]).hex()
+            if fn == "balanceOf":
+                return "0x" + encode(["uint256"], [0]).hex()
+        if to == self.weth.lower() and fn in ("name", "symbol", "decimals"):
+            value = {"name": "Wrapped Ether", "symbol": "WETH", "decimals": 18}[fn]
+            return "0x" + encode(["uint8" if fn == "decimals" else "string"], [value]).hex()
+        raise RpcError(3, "execution reverted")
+
+    def _quote(self, amount_in: int, path) -> int:
+        src, dst = path[0].lower(), path[-1].lower()
+        weth = self.weth.lower()
+        token = dst if src == weth else src
+        info = self._tokens.get(token, {})
+        if src == weth:
+            return amount_in * 1000
+        # selling back: honeypots return almost nothing
+        ratio = 0.05 if info.get("honeypot") else 0.97
+        return int(amount_in / 1000 * ratio)
+
+    # ---- servers
+    def start(self, host: str = "127.0.0.1", port: int = 0, ws_port: Optional[int] = None):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if isinstance(body, list):
+                    resp = node.handle_batch(body)
+                else:
+                    resp = node.handle(body)
+                raw = json.dumps(resp).encode()
+                self.send_response(200)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer((host, port), Handler)
+        self._http.daemon_threads = True
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        self.http_url = f"http://{host}:{self._http.server_address[1]}"
+
+        self.ws_url = None
+        if ws_port is not None:
+            try:
+                from websockets.sync.server import serve
+            except Exception as e:
+                print(f"websockets not available; websocket endpoint disabled: {e}")
+            else:
+                def ws_handler(conn):
+                    for message in conn:
+                        body = json.loads(message)
+                        resp = node.handle_batch(body) if isinstance(body, list) else node.handle(body)
+                        conn.send(json.dumps(resp))
+
+                self._ws = serve(ws_handler, host, ws_port)
+                threading.Thread(target=self._ws.serve_forever, daemon=True).start()
+                self.ws_url = f"ws://{host}:{self._ws.socket.getsockname()[1]}"
+        return self
+
+    def stop(self):
+        if self._http is not None:
+            self._http.shutdown()
+        if self._ws is not None:
+            self._ws.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "eth_calls": dict(self.eth_calls),
+                "total_calls": sum(self.calls.values()),
+                "round_trips": self.round_trips,
+                "errors_injected": self.errors_injected,
+                "head": self.head(),
+            }
+
+
+def node_from_config(**kwargs) -> FakeEthNode:
+    with open(os.path.join(proj_root, "resources", "config.json")) as f:
+        config = json.load(f)
+    return FakeEthNode(config["UNISWAP_FACTORY"], config["UNISWAP_ROUTER"], config["WETH"], **kwargs)
+
+
+def add_node_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--pairs-per-block", type=int, default=5)
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds per synthetic block")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added latency for every RPC call")
+    parser.add_argument("--method-latency", action="append", default=[],
+                        help="per-method latency, e.g. eth_call=20 (ms); may be repeated")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with -32005")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def node_kwargs(args) -> Dict[str, Any]:
+    method_latency = {}
+    for item in args.method_latency:
+        name, _, ms = item.partition("=")
+        method_latency[name] = float(ms) / 1000.0
+    return {
+        "pairs_per_block": args.pairs_per_block, "block_time": args.block_time,
+        "latency": args.latency_ms / 1000.0, "method_latency": method_latency,
+        "error_rate": args.error_rate, "seed": args.seed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--ws-port", type=int, default=8546)
+    add_node_arguments(parser)
+    args = parser.parse_args()
+
+    node = node_from_config(**node_kwargs(args)).start(args.host, args.port, args.ws_port)
+    print(f"HTTP JSON-RPC on {node.http_url}" + (f", websocket on {node.ws_url}" if node.ws_url else ""))
+    try:
+        while True:
+            time.sleep(10)
+            print(json.dumps(node.stats()))
+    except KeyboardInterrupt:
+        node.stop()
+        sys.exit(0)
@@ -1,10 +1,8 @@
-import json
 import os
 import time
 import threading
-from contextlib import asynccontextmanager
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timezone
+import itertools
+from typing import List, Dict, Any, Optional, Tuple
 
 # This module exposes runtime state and the blockchain listener.
 # FastAPI application and routes are created in `backend.api`.
@@ -14,179 +12,416 @@ except Exception:
     def load_dotenv():
         return None
 
-try:
-    from pymongo import MongoClient, ASCENDING
-    from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError, PyMongoError
-except Exception:
-    MongoClient = None
-    ASCENDING = None
-    DuplicateKeyError = Exception
-    ServerSelectionTimeoutError = Exception
-    PyMongoError = Exception
-
-try:
-    from web3 import Web3
-except Exception:
-    Web3 = None
-
-# Import heavy Core modules lazily where needed to avoid import-time
-# dependency on web3 when tooling imports this module.
-from backend.auth import AuthManager
-from backend.watchlist import WatchlistManager
+# Import heavy Core modules (web3, pymongo, passlib) lazily where needed: importing this
+# module has no side effects and stays cheap; resources live in `context`.
+from backend.app_context import AppContext
+from backend.watchlist import WatchlistIndex
+from backend.search_index import TokenSearchIndex
+from backend.ring_buffer import SequencedRingBuffer
+from backend import metrics
+from backend.metrics import stage_timer
 
 
 # In-memory state
 # ---------------------------
 token_events: List[Dict[str, Any]] = []
-wallet_alerts: List[str] = []
-status_messages: List[str] = ["Starting..."]
-
-# Dynamic watchlist and tracker state (populated at startup)
-WATCHLIST: List[str] = []
+# bounded, sequence-numbered logs; clients poll them with `since=<last seq>`
+wallet_alerts = SequencedRingBuffer(int(os.getenv("WALLET_ALERTS_BUFFER_SIZE", "1000")))
+status_messages = SequencedRingBuffer(int(os.getenv("STATUS_BUFFER_SIZE", "500")), initial=["Starting..."])
+
+# Dynamic watchlist and tracker state (populated at startup).
+# WATCHLIST is the index's live global set; it is updated in place, never rebound.
+watchlist_index = WatchlistIndex()
+WATCHLIST = watchlist_index.global_addresses
 # tokens we are currently tracking (lowercase addresses)
 tracked_tokens: set = set()
 # reference to the web3 instance used by the blockchain listener (set when listener starts)
 web3_instance = None
+# chain name -> web3 instance of that chain's listener (web3_instance is the default chain's)
+chain_web3: Dict[str, Any] = {}
 # keep wallet tracker threads so they stay alive/referencable
 wallet_tracker_threads: List[threading.Thread] = []
+# periodic re-analysis of persisted tokens (set when listener starts), per chain name
+recheck_scheduler = None
+recheck_schedulers: Dict[str, Any] = {}
+# token name/symbol/address autocomplete (/api/search) and `q` pre-selection
+search_index = TokenSearchIndex()
+
+
+load_dotenv()
+
+# Mongo handles, auth/watchlist managers and the template cache, created on first
+# use or by context.initialize() (started in the background by the API lifespan)
+context = AppContext(watchlist_index, wallet_alerts=wallet_alerts, status_messages=status_messages)
+
+# module attributes still served for code doing `from web_server import token_collection`
+_CONTEXT_ATTRIBUTES = {"client", "db", "token_collection", "watchlist_collection", "users_collection",
+                       "auth_manager", "wl_manager", "code_templates", "deployer_profiles"}
 
+def __getattr__(name):
+    if name in _CONTEXT_ATTRIBUTES:
+        return getattr(context, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# bytecode-hash template caches of the non-default chains (the default chain's is context.code_templates)
+_chain_templates: Dict[str, Any] = {}
+
+def templates_for(profile):
+    code_templates = context.code_templates
+    if code_templates is None or profile.is_default:
+        return code_templates
+    cache = _chain_templates.get(profile.name)
+    if cache is None:
+        cache = _chain_templates[profile.name] = context.new_template_cache(profile.collection("code_templates"))
+    return cache
+
+def load_watchlist():
+    context.load_watchlist()
+
+def _auth_cache_metrics():
+    auth_manager = context.peek_auth_manager()
+    if auth_manager is None:
+        return
+    stats = auth_manager.token_cache_stats()
+    for key in ("hits", "misses", "evictions", "size"):
+        _AUTH_CACHE.labels(key).set(stats[key])
+    _AUTH_CACHE.labels("hit_ratio").set(stats["hit_ratio"])
+
+_AUTH_CACHE = metrics.REGISTRY.gauge("ethbot_auth_token_cache", "Verified-JWT cache statistics", ["stat"])
+metrics.REGISTRY.add_collector(_auth_cache_metrics)
 
-# Helpers
 # ---------------------------
-def ensure_unique_index(collection):
-    """
-    Clean legacy docs with missing or null keys and ensure a UNIQUE SPARSE index
-    on (tx_hash, log_index). Sparse means docs missing either field are not
-    indexed, so they don't collide. Also prevent inserting nulls in code.
-    """
-    try:
-        # Drop any previous partial or wrong index if it exists
+# Blockchain listener
+# ---------------------------
+# (chain id, block number) -> timestamp, so end-to-end latency costs one get_block per block
+_block_ts_cache: Dict[Tuple[int, int], int] = {}
+
+def _block_timestamp(web3, block_number: int, chain_id: int = 1) -> Optional[int]:
+    key = (chain_id, block_number)
+    ts = _block_ts_cache.get(key)
+    if ts is None:
         try:
-            collection.drop_index("uniq_txhash_logindex")
+            ts = int(web3.eth.get_block(block_number)["timestamp"])
         except Exception:
-            pass
-
-        # 1) Remove legacy rows that would collide 
-        cleanup_filter = {
-            "$or": [
-                {"tx_hash": {"$exists": False}},
-                {"log_index": {"$exists": False}},
-                {"tx_hash": None},
-                {"log_index": None},
-            ]
-        }
-        try:
-            removed = collection.delete_many(cleanup_filter).deleted_count
-            if removed:
-                print(f"Cleaned {removed} legacy docs without tx_hash/log_index")
-        except Exception as e:
-            print(f"Warning: cleanup failed (continuing): {e}")
-
-        #   Create UNIQUE SPARSE compound index
-        #    (Only documents that contain BOTH fields are indexed.
-        #     Missing fields are ignored; nulls would be indexed—so we cleaned them and we skip inserting nulls.)
-        collection.create_index(
-            [("tx_hash", ASCENDING), ("log_index", ASCENDING)],
-            unique=True,
-            name="uniq_txhash_logindex",
-            sparse=True,
-        )
-        print("Unique sparse index ensured on (tx_hash, log_index)")
-    except PyMongoError as e:
-        print(f"Index ensure warning: {e}")
-
-
-# Mongo init
-# ---------------------------
-load_dotenv()
-MONGO_URI = os.getenv("MONGO_URI")
+            return None
+        if len(_block_ts_cache) > 256:
+            _block_ts_cache.clear()
+        _block_ts_cache[key] = ts
+    return ts
+
+# chain id -> (fetched at, head block number), refreshed at most once a second
+_heads: Dict[int, Tuple[float, int]] = {}
+
+def _head_block(web3, chain_id: int = 1) -> Optional[int]:
+    cached = _heads.get(chain_id)
+    if cached is not None and time.time() - cached[0] < 1.0:
+        return cached[1]
+    try:
+        head = int(web3.eth.block_number)
+    except Exception:
+        return cached[1] if cached else None
+    _heads[chain_id] = (time.time(), head)
+    return head
+
+# shared recorder when RPC_RECORD_PATH is set, so reconnects keep appending to one file
+rpc_recorder = None
+
+def _make_web3(url: str, chain: Optional[str] = None):
+    global rpc_recorder
+    # provider selection (replay:, comma-separated pool, http, ws) and the chain's rate limiter
+    from backend.Core.providers import make_web3
+    web3 = make_web3(url, chain)
+    record_path = os.getenv("RPC_RECORD_PATH")
+    if record_path:
+        if rpc_recorder is None:
+            from backend.Core.rpc_recorder import RpcRecorder
+            rpc_recorder = RpcRecorder(record_path)
+            status_messages.append(f"Recording RPC traffic to {record_path}")
+        web3.middleware_onion.add(rpc_recorder.middleware(), name="rpc_recorder")
+    return web3
+
+# /api/analyze: connections of chains without a running listener, and recent results
+_analysis_web3: Dict[str, Any] = {}
+analysis_results = None
+
+def bulk_analyzer(chain_id: int = 1):
+    """BulkAnalyzer for `chain_id` over the listener's connection (or one of its own)."""
+    global analysis_results
+    from backend.Core.chains import get_profiles
+    from backend.Core.rpc_batch import BatchCaller
+    from backend.Core.analyzer.bulk import BulkAnalyzer, ResultCache
+    profile = next((p for p in get_profiles().values() if p.chain_id == int(chain_id)), None)
+    if profile is None:
+        raise ValueError(f"chain {chain_id} is not configured")
+    limiter_chain = None if profile.is_default else profile.name
+    web3 = chain_web3.get(profile.name) or _analysis_web3.get(profile.name)
+    if web3 is None:
+        if not profile.provider_url:
+            raise ValueError(f"no RPC provider configured for {profile.name}")
+        web3 = _analysis_web3[profile.name] = _make_web3(profile.provider_url, limiter_chain)
+    # BatchCaller talks to the provider directly, so it applies the chain's limiter itself
+    limiter = None
+    if os.getenv("RPC_RATE_LIMIT", "100") != "0":
+        from backend.Core.rate_limit import get_limiter
+        limiter = get_limiter(limiter_chain)
+    if analysis_results is None:
+        analysis_results = ResultCache.from_env()
+    from backend.Core.call_cache import get_call_cache
+    caller = BatchCaller(web3, limiter, cache=get_call_cache(limiter_chain))
+    return BulkAnalyzer(caller, profile, templates=templates_for(profile))
+
+# in-memory dedupe keys when running without Mongo
+seen_keys: set = set()
+
+def _event_identifiers(log):
+    """Robust (tx_hash, log_index, block_number) for idempotent persistence."""
+    raw_txh = log.get("transactionHash")
+    raw_lix = log.get("logIndex")
+    raw_blk = log.get("blockNumber")
 
-client = db = token_collection = None
-watchlist_collection = None
-users_collection = None
-if MONGO_URI:
     try:
-        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=3000)
-        client.admin.command("ping")  # fail fast if unreachable
-        db = client["eth_bot_db"]
-        token_collection = db["token_events"]
-        # watchlist collection for persisted watchlist addresses
-        watchlist_collection = db["watchlist"]
-        users_collection = db["users"]
-        print("Mongo connected")
-
-        # Ensure index (do not crash if it fails)
-        ensure_unique_index(token_collection)
-        try:
-            # Ensure unique index on address for watchlist
-            watchlist_collection.create_index([("address", ASCENDING)], unique=True, name="uniq_watchlist_address")
-        except Exception as e:
-            print(f"Warning: could not ensure watchlist index: {e}")
-    except Exception as e:
-        msg = f"Mongo connected but index setup hit an issue: {e}"
-        print(msg)
-        status_messages.append(msg)
-        # keep token_collection if connection succeeded                
-else:
-    print("MONGO_URI not set; running without Mongo")
+        tx_hash = raw_txh.hex() if hasattr(raw_txh, "hex") else str(raw_txh)
+    except Exception:
+        tx_hash = None
 
-# load watchlist from disk at startup into the global WATCHLIST
-def load_watchlist():
-    global WATCHLIST
     try:
-        # Prefer DB-backed watchlist when available
-        if watchlist_collection is not None:
-            # DB-backed global watchlist stored in watchlist_collection
-            try:
-                docs = list(watchlist_collection.find({}, {"_id": 0, "address": 1}))
-                WATCHLIST = [d.get("address", "").lower() for d in docs if d.get("address")]
-            except Exception as e:
-                print(f"Warning: failed to load watchlist from DB: {e}")
-                WATCHLIST = []
-        else:
-            # Fallback to on-disk watchlist
-            with open("resources/watchlist.json", "r") as f:
-                data = json.load(f)
-                WATCHLIST = [addr.lower() for addr in (data or [])]
+        log_index = int(raw_lix) if raw_lix is not None else None
     except Exception:
-        print("Warning: failed to load watchlist (fallback to empty)")
-        WATCHLIST = []
+        log_index = None
 
-# Now that Mongo (if any) has been initialized, load the watchlist
-load_watchlist()
+    try:
+        block_number = int(raw_blk) if raw_blk is not None else None
+    except Exception:
+        block_number = None
+    return tx_hash, log_index, block_number
+
+def _token_fields(info):
+    info = info or {}
+    return {
+        "name":   str(info.get("name", "")),
+        "symbol": str(info.get("symbol", "")),
+        "address":str(info.get("address", "")),
+    }
+
+def _check_result(value) -> Optional[bool]:
+    # None: the check didn't run (lite analysis) or its RPC failed; kept as unknown, not false
+    return None if value is None else bool(value)
+
+def build_token_info(job, result: Dict[str, Any], target_token: Optional[str]) -> Dict[str, Any]:
+    if not target_token:
+        # fallback: pick non-WETH by symbol in result
+        t0 = result.get("token0", {}) or {}
+        t1 = result.get("token1", {}) or {}
+        target_token = (t1.get("address")
+                        if (t0.get("symbol", "") or "").upper() == "WETH"
+                        else t0.get("address"))
+    lite = result.get("analysis_level") == "lite"
+    return {
+        "chain_id": getattr(job, "chain_id", 1),
+        "tx_hash": job.tx_hash,
+        "log_index": job.log_index,
+        "block_number": job.block_number,
+        "address": str(target_token or job.token0),
+        "pair_address": str(job.pair),
+        "deployer": str(getattr(job, "deployer", "") or "").lower(),
+        "liquidity_eth": float(result.get("liquidity_eth", 0.0) or 0.0),
+        # unknown until the deferred full analysis runs
+        "honeypot": None if lite else _check_result(result.get("honeypot")),
+        "honeypot_source": None if lite else result.get("honeypot_source"),
+        "ownership_renounced": _check_result(result.get("ownership_renounced")),
+        "analysis_level": result.get("analysis_level", "full"),
+        "dex": getattr(job, "dex", None),
+        "fee": getattr(job, "fee", None),
+        "code_hash": result.get("code_hash"),
+        "bytecode_risk": result.get("bytecode_risk"),
+        # block the checks read (None: "latest")
+        "analysis_block": result.get("block_number"),
+        "needs_full_analysis": lite,
+        "token0_info": _token_fields(result.get("token0")),
+        "token1_info": _token_fields(result.get("token1")),
+        "timestamp": int(time.time()),
+    }
+
+def persist_token_info(token_info: Dict[str, Any]) -> str:
+    """Write a new token event once (Mongo upsert or in-memory).
+
+    Returns "inserted", "duplicate" (already stored) or "error" (the write
+    failed; the event is not stored and the job should be retried).
+    """
+    token_collection = context.token_collection
+    tx_hash, log_index = token_info["tx_hash"], token_info["log_index"]
+    outcome = "duplicate"
+    if token_collection is not None:
+        from pymongo.errors import DuplicateKeyError
+        try:
+            with stage_timer("mongo_upsert"):
+                res = token_collection.update_one(
+                    {"tx_hash": tx_hash, "log_index": log_index},
+                    {"$setOnInsert": token_info},
+                    upsert=True,
+                )
+            outcome = "inserted" if res.upserted_id is not None else "duplicate"
+            print(("Inserted" if outcome == "inserted" else "Duplicate skipped"), f"{tx_hash}:{log_index}")
+        except DuplicateKeyError:
+            print(f"DuplicateKeyError: {tx_hash}:{log_index} already exists")
+        except Exception as mongo_e:
+            outcome = "error"
+            print(f"Error saving to MongoDB: {mongo_e}")
+    else:
+        # in-memory dedupe fallback (no Mongo)
+        key = f"{tx_hash}:{log_index}"
+        if key not in seen_keys:
+            seen_keys.add(key)
+            outcome = "inserted"
+            token_events.append(token_info)
+    if outcome == "inserted":
+        search_index.add(token_info)
+    return outcome
+
+def complete_token_info(tx_hash: str, log_index: int, result: Dict[str, Any]) -> bool:
+    """Fill in a lite-analysed event with the results of its full analysis; rows that no
+    longer need one (a deployer verdict, an earlier completion) are left alone. True if updated."""
+    token_collection = context.token_collection
+    update = {
+        "honeypot": _check_result(result.get("honeypot")),
+        "honeypot_source": result.get("honeypot_source"),
+        "ownership_renounced": _check_result(result.get("ownership_renounced")),
+        "analysis_level": "full",
+        "needs_full_analysis": False,
+    }
+    if token_collection is not None:
+        try:
+            with stage_timer("mongo_upsert"):
+                res = token_collection.update_one({"tx_hash": tx_hash, "log_index": log_index,
+                                                   "needs_full_analysis": True}, {"$set": update})
+            return res.matched_count > 0
+        except Exception as mongo_e:
+            print(f"Error updating MongoDB: {mongo_e}")
+            return False
+    for event in reversed(token_events):
+        if event.get("tx_hash") == tx_hash and event.get("log_index") == log_index:
+            if event.get("needs_full_analysis"):
+                event.update(update)
+                return True
+            break
+    return False
+
+def apply_recheck_results(batch):
+    """Write a batch of (RecheckEntry, result) pairs in one round trip."""
+    token_collection = context.token_collection
+    now = int(time.time())
+    updates = {}
+    for entry, result in batch:
+        fields = {"recheck_stage": int(result.get("recheck_stage", 0)), "last_rechecked": now}
+        # checks whose RPC failed are left out, the stored values stand
+        if result.get("liquidity_eth") is not None:
+            fields["liquidity_eth"] = float(result["liquidity_eth"])
+        for field in ("honeypot", "ownership_renounced"):
+            if result.get(field) is not None:
+                fields[field] = bool(result[field])
+        updates[(entry.tx_hash, entry.log_index)] = fields
+    if token_collection is not None:
+        from pymongo import UpdateOne
+        with stage_timer("mongo_recheck_write"):
+            token_collection.bulk_write(
+                [UpdateOne({"tx_hash": txh, "log_index": lix}, {"$set": fields})
+                 for (txh, lix), fields in updates.items()],
+                ordered=False,
+            )
+        return
+    for event in token_events:
+        fields = updates.get((event.get("tx_hash"), event.get("log_index")))
+        if fields:
+            event.update(fields)
 
-# Initialize managers (use DB collections when available)
-auth_manager = AuthManager(users_collection=users_collection, jwt_secret=os.getenv("JWT_SECRET"))
-wl_manager = WatchlistManager(watchlist_collection=watchlist_collection, users_collection=users_collection)
+def _recheck_alert(message: str):
+    print(f"⚠️ {message}")
+    wallet_alerts.append(message)
 
-# ---------------------------
-# Blockchain listener
-# ---------------------------
-def run_blockchain_listener():
-    global token_events, wallet_alerts, status_messages, client, db, token_collection
-    print("▶ run_blockchain_listener STARTED", flush=True)
-    status_messages.append("Blockchain listener started...")
+def resume_rechecks(scheduler, owns=None, chain_id: int = 1) -> int:
+    """Re-queue rechecks for `chain_id` tokens still inside the recheck window (after a restart).
 
-    global web3_instance, tracked_tokens, WATCHLIST, wallet_tracker_threads
-    wss = os.getenv("WEB3_PROVIDER")
+    `owns(pair)` limits this to the pairs this replica is responsible for.
+    """
+    from backend.Core.analyzer.recheck import RecheckEntry
+    token_collection = context.token_collection
+    since = time.time() - max(scheduler.intervals)
+    if token_collection is not None:
+        fields = {"_id": 0, "tx_hash": 1, "log_index": 1, "address": 1, "pair_address": 1, "timestamp": 1,
+                  "liquidity_eth": 1, "honeypot": 1, "ownership_renounced": 1, "dex": 1, "fee": 1,
+                  "token0_info.address": 1, "token1_info.address": 1}
+        docs = token_collection.find({"chain_id": chain_id, "timestamp": {"$gte": int(since)}}, fields)
+    else:
+        docs = [e for e in token_events
+                if int(e.get("timestamp", 0)) >= since and e.get("chain_id", 1) == chain_id]
+    resumed = 0
+    for doc in docs:
+        if not (doc.get("tx_hash") and doc.get("log_index") is not None and doc.get("pair_address")):
+            continue
+        if owns is None or owns(doc["pair_address"]):
+            resumed += scheduler.resume(RecheckEntry.from_token_info(doc))
+    return resumed
+
+def backfill_logs(web3, checkpoint: Optional[int], log_filter: Dict[str, Any]) -> List[Any]:
+    """Factory creation logs after `checkpoint` (bounded by CLUSTER_MAX_BACKFILL blocks)."""
+    if checkpoint is None:
+        return []
+    head = web3.eth.block_number
+    start = max(int(checkpoint) + 1, head - int(os.getenv("CLUSTER_MAX_BACKFILL", "1000")))
+    if start > head:
+        return []
+    return list(web3.eth.get_logs(dict(log_filter, fromBlock=start, toBlock=head)))
+
+def consume_cluster_jobs(coordinator, scheduler):
+    """Feed jobs claimed from this replica's partitions into the local scheduler."""
+    from backend.Core.analyzer.scheduler import AnalysisJob
+    while True:
+        try:
+            # keep the local backlog short so unclaimed work stays available for failover
+            room = 2 * scheduler.workers - scheduler.depth()
+            if room > 0:
+                docs = coordinator.claim(limit=room)
+                for d in docs:
+                    scheduler.submit(AnalysisJob(
+                        d["token0"], d["token1"], d["pair"], d.get("deployer", ""), d["tx_hash"], d["log_index"],
+                        d.get("block_number"), watchlisted=bool(d.get("watchlisted")),
+                        is_weth_pair=bool(d.get("is_weth_pair")), liquidity_eth=d.get("liquidity_eth"),
+                        dex=d.get("dex"), fee=d.get("fee"), chain_id=d.get("chain_id", 1)))
+                if docs:
+                    continue
+        except Exception as e:
+            print(f"Cluster job consumer error: {e}")
+        time.sleep(0.5)
+
+def run_blockchain_listener(chain: Optional[str] = None):
+    """Ingest pipeline for one chain profile (backend.Core.chains; default mainnet)."""
+    global token_events, wallet_alerts, status_messages
+    from backend.Core.chains import get_chain
+    profile = get_chain(chain)
+    print(f"▶ run_blockchain_listener STARTED ({profile.name})", flush=True)
+    status_messages.append(f"Blockchain listener started ({profile.name})...")
+    # Mongo and the watchlist must be ready before events are persisted or matched
+    context.initialize()
+    db = context.db
+
+    global web3_instance, tracked_tokens, wallet_tracker_threads, recheck_scheduler
+    # WEB3_PROVIDERS (comma-separated) enables the multi-endpoint pool; other
+    # chains read WEB3_PROVIDER_<NAME>
+    wss = profile.provider_url
     if not wss:
-        print("WEB3_PROVIDER not found in .env file.")
-        status_messages.append("Error: WEB3_PROVIDER not configured.")
+        print(f"No RPC provider configured for {profile.name}.")
+        status_messages.append(f"Error: RPC provider for {profile.name} not configured.")
         return
 
-    web3 = Web3(Web3.LegacyWebSocketProvider(wss))
+    # non-default chains get their own rate limiter
+    limiter_chain = None if profile.is_default else profile.name
+    web3 = _make_web3(wss, limiter_chain)
     PUBLIC_ADDRESS = os.getenv("PUBLIC_ADDRESS")
 
-    # Load configs/ABIs
-    with open("resources/config.json") as f:
-        config = json.load(f)
-    UNISWAP_FACTORY = config["UNISWAP_FACTORY"]
-    PAIR_CREATED_SIGNATURE = config["PAIR_CREATED_SIGNATURE"]
-
-    with open("resources/abis.json") as f:
-        PAIR_CREATED_ABI = json.load(f)
     # web3 instance visible to API handlers
-    web3_instance = web3
+    chain_web3[profile.name] = web3
+    if profile.is_default:
+        web3_instance = web3
     # expose web3 instance to the rest of the app
     # lazy-import analyzer and wallet tracker implementations so editors/tools
     analyzer_class = None
@@ -207,38 +442,234 @@ def run_blockchain_listener():
         print(msg)
         status_messages.append(msg)
 
-    factory_contract = web3.eth.contract(address=UNISWAP_FACTORY, abi=PAIR_CREATED_ABI)
-    event_signature = web3.keccak(text=PAIR_CREATED_SIGNATURE).hex()
-    event_filter = web3.eth.filter({"address": UNISWAP_FACTORY, "topics": [event_signature]})
+    # every configured factory (V2 forks, V3) behind one filter; logs are routed
+    # back to their factory by (address, topic0)
+    registry = profile.registry
+    log_filter = registry.log_filter()
+    event_filter = web3.eth.filter(log_filter)
+
+    from backend.Core.checks.liquidity import pool_liquidity
+    from backend.Core.analyzer.scheduler import AnalysisJob, AnalysisScheduler, LITE
+    from backend.Core.analyzer.recheck import RecheckEntry, RecheckScheduler
+    from backend.deployers import counts_as_honeypot
+    WETH = profile.weth
+    templates = templates_for(profile)
+
+    # set below when CLUSTER_MODE / RECHECK_ENABLED are on
+    coordinator = None
+    rechecks = None
+
+    # ANALYSIS_PROCESSES>0 runs TokenAnalyzer in worker processes (one core each);
+    # the scheduler threads then only dispatch and persist
+    process_pool = None
+    processes = int(os.getenv("ANALYSIS_PROCESSES", "0"))
+    if processes > 0 and analyzer_class is not None:
+        try:
+            from backend.Core.analyzer.process_pool import ProcessAnalysisPool
+            process_pool = ProcessAnalysisPool(processes, wss, profile.router, PUBLIC_ADDRESS,
+                                               chain=profile.name).warm_up()
+            if os.getenv("RPC_RATE_LIMIT", "100") != "0":
+                from backend.Core.rate_limit import get_limiter
+                # the workers got their shares; the listener here keeps the last one
+                get_limiter(limiter_chain).scale(process_pool.parent_share)
+            status_messages.append(f"Analysis running in {processes} worker processes")
+        except Exception as e:
+            msg = f"Could not start analysis processes, analysing in-process: {e}"
+            print(msg)
+            status_messages.append(msg)
+            process_pool = None
+
+    # analyses read the state at the creation log's block (+ANALYSIS_CONFIRMATIONS) instead of
+    # "latest", so all checks see one state and their calls can be cached (ANALYSIS_PIN=0: latest)
+    pin_blocks = os.getenv("ANALYSIS_PIN", "1") != "0"
+    confirmations = int(os.getenv("ANALYSIS_CONFIRMATIONS", "0"))
+    pin_max_age = int(os.getenv("ANALYSIS_PIN_MAX_AGE", "100"))
+
+    def analysis_block(job) -> Optional[int]:
+        if not pin_blocks or job.block_number is None:
+            return None
+        head = _head_block(chain_web3[profile.name], profile.chain_id)
+        if head is None:
+            return job.block_number if confirmations == 0 else None
+        # N confirmations after the log, or the newest block if that isn't mined yet
+        block = max(job.block_number, min(job.block_number + confirmations, head))
+        # full nodes only keep recent state; jobs deferred for longer than that read "latest"
+        return block if head - block <= pin_max_age else None
+
+    def run_analysis(job, lite=False):
+        if analyzer_class is None:
+            err = "TokenAnalyzer implementation not available; skipping analysis."
+            print(err)
+            status_messages.append(err)
+            return {}, None
+        try:
+            block = analysis_block(job)
+            if process_pool is not None:
+                with stage_timer("analyze"):
+                    outcome = process_pool.analyze(job, lite, block).result()
+                return outcome.result, outcome.target_token
+            # workers always use the listener's current connection
+            analyzer = analyzer_class(chain_web3[profile.name], job.token0, job.token1, job.pair,
+                                      profile.router, PUBLIC_ADDRESS, templates=templates,
+                                      dex=job.dex, fee=job.fee, chain=profile, block_identifier=block)
+            # the reserve read at ingest is only reusable if it was read at the same block
+            liquidity = job.liquidity_eth if block is None or block == job.block_number else None
+            with stage_timer("analyze"):
+                result = analyzer.analyze(lite=lite, liquidity_eth=liquidity)
+            return result, analyzer.get_target_token()
+        except Exception as e:
+            err = f"TokenAnalyzer failed: {e}"
+            print(err)
+            status_messages.append(err)
+            return {}, None
+
+    def analyze_job(job, level):
+        profiles = context.deployer_profiles
+        # a deployer whose launches were mostly honeypots gets no sell simulation
+        flagged = profiles.should_short_circuit(job.deployer, job.chain_id)
+        result, target_token = run_analysis(job, lite=flagged or level == LITE)
+        token_info = build_token_info(job, result, target_token)
+        if flagged:
+            # inferred from the deployer's history, not simulated: honeypot_source tells them apart
+            token_info.update(honeypot=True, honeypot_source="deployer", deployer_flagged=True,
+                              analysis_level="deployer", needs_full_analysis=False)
+        outcome = persist_token_info(token_info)
+        metrics.EVENTS_TOTAL.labels(outcome).inc()
+        inserted = outcome == "inserted"
+        if inserted:
+            profiles.record_launch(token_info, flagged=flagged)
+        # a failed write leaves the cluster job claimed, so it is retried once the claim expires
+        if coordinator is not None and outcome != "error":
+            coordinator.complete(job.tx_hash, job.log_index)
+        if inserted and rechecks is not None:
+            rechecks.schedule(RecheckEntry(
+                job.tx_hash, job.log_index, token_info["address"], job.pair, job.token0, job.token1,
+                job.enqueued_at, liquidity_eth=token_info["liquidity_eth"], honeypot=token_info["honeypot"],
+                ownership_renounced=token_info["ownership_renounced"], dex=job.dex, fee=job.fee))
+        if inserted and job.block_number is not None:
+            block_ts = _block_timestamp(chain_web3[profile.name], job.block_number, profile.chain_id)
+            if block_ts:
+                metrics.BLOCK_TO_PERSISTED_SECONDS.observe(max(0.0, time.time() - block_ts))
+        # the scheduler defers a completion only for a lite row this call actually stored
+        return inserted and bool(token_info.get("needs_full_analysis"))
+
+    def complete_job(job):
+        result, _ = run_analysis(job)
+        if result and complete_token_info(job.tx_hash, job.log_index, result):
+            if counts_as_honeypot(result):
+                context.deployer_profiles.record_honeypot(job.deployer, job.chain_id)
+
+    # watch-listed deployers first, then WETH pairs by reserve; lite analysis under load
+    scheduler = AnalysisScheduler(
+        analyze_job, complete_job,
+        workers=max(int(os.getenv("ANALYSIS_WORKERS", "4")), 2 * processes),
+        lite_threshold=int(os.getenv("ANALYSIS_LITE_THRESHOLD", "50")),
+        max_queue=int(os.getenv("ANALYSIS_MAX_QUEUE", "5000")),
+        dust_eth=float(os.getenv("ANALYSIS_DUST_ETH", "0.1")),
+    ).start()
+
+    def recheck_token(entry):
+        if process_pool is not None:
+            return process_pool.recheck(entry).result()
+        analyzer = analyzer_class(chain_web3[profile.name], entry.token0, entry.token1, entry.pair,
+                                  profile.router, PUBLIC_ADDRESS, dex=entry.dex, fee=entry.fee, chain=profile)
+        return analyzer.recheck()
+
+    # re-run honeypot/ownership/liquidity at RECHECK_INTERVALS after creation to catch rugs
+    if analyzer_class is not None and os.getenv("RECHECK_ENABLED", "1") != "0":
+        rechecks = RecheckScheduler.from_env(recheck_token, apply_recheck_results, _recheck_alert).start()
+        recheck_schedulers[profile.name] = rechecks
+        if profile.is_default:
+            recheck_scheduler = rechecks
+
+    # CLUSTER_MODE=1: replicas elect one ingest leader through a Mongo lease and
+    # split analysis by partition of the pair address (see backend.coordination)
+    if os.getenv("CLUSTER_MODE", "").lower() in ("1", "true", "yes"):
+        if db is None:
+            msg = "CLUSTER_MODE needs MONGO_URI; running standalone."
+            print(msg)
+            status_messages.append(msg)
+        else:
+            from backend.coordination import Coordinator
+            coordinator = Coordinator.from_env(db, chain=profile)
+            coordinator.ensure_indexes()
+            coordinator.start()
+            threading.Thread(target=consume_cluster_jobs, args=(coordinator, scheduler), daemon=True).start()
+            status_messages.append(f"Cluster member {coordinator.member_id} started")
+
+    def resume_pending_rechecks():
+        if coordinator is not None:
+            # let membership settle so partition ownership is known
+            time.sleep(coordinator.member_ttl)
+        try:
+            resumed = resume_rechecks(rechecks, owns=coordinator.owns if coordinator else None,
+                                      chain_id=profile.chain_id)
+            if resumed:
+                status_messages.append(f"Resumed {resumed} pending {profile.name} token rechecks")
+        except Exception as e:
+            print(f"Could not resume pending rechecks: {e}")
+
+    if rechecks is not None:
+        threading.Thread(target=resume_pending_rechecks, daemon=True).start()
 
-    status_messages.append("Connected & listening...")
-    print("Watching for new token pairs on Uniswap...")
+    status_messages.append(f"Connected & listening to {profile.name}: {', '.join(registry.names())}...")
+    print(f"Watching for new token pairs on {profile.name}: {', '.join(registry.names())}...")
 
+    # False while another replica holds the ingest lease
+    leading = coordinator is None
     while True:
         try:
             if not web3.is_connected():
                 print("Web3 is not connected. Reconnecting...")
-                web3 = Web3(Web3.LegacyWebSocketProvider(wss))
-                factory_contract = web3.eth.contract(address=UNISWAP_FACTORY, abi=PAIR_CREATED_ABI)
-                event_filter = web3.eth.filter({"address": UNISWAP_FACTORY, "topics": [event_signature]})
+                web3 = _make_web3(wss, limiter_chain)
+                chain_web3[profile.name] = web3
+                if profile.is_default:
+                    web3_instance = web3
+                event_filter = web3.eth.filter(log_filter)
                 status_messages.append("Reconnected to Web3 provider.")
                 time.sleep(5)
                 continue
 
+            if coordinator is not None and not coordinator.is_leader():
+                leading = False
+                time.sleep(1)
+                continue
+
+            entries = []
+            if not leading:
+                # just took over ingest: new filter, then catch up from the previous leader's checkpoint
+                event_filter = web3.eth.filter(log_filter)
+                entries = backfill_logs(web3, coordinator.lease.checkpoint, log_filter)
+                status_messages.append(f"Ingest leader (epoch {coordinator.lease.epoch}); backfilled {len(entries)} logs")
+                leading = True
+
             wallet_tracker_thread = None
 
-            for log in event_filter.get_new_entries():
-                event = factory_contract.events.PairCreated().process_log(log)
-                token0 = event["args"]["token0"]
-                token1 = event["args"]["token1"]
-                pair = event["args"]["pair"]
+            entries += event_filter.get_new_entries()
+            queue_depth = metrics.QUEUE_DEPTH.labels("listener")
+            queue_depth.set(len(entries))
+            for log in entries:
+                queue_depth.dec()
+                with stage_timer("log_decode"):
+                    event = registry.decode(log)
+                if event is None:
+                    metrics.EVENTS_TOTAL.labels("skipped").inc()
+                    continue
+                token0 = event["token0"]
+                token1 = event["token1"]
+                pair = event["pair"]
 
-                tx = web3.eth.get_transaction(log["transactionHash"])
+                with stage_timer("get_transaction"):
+                    tx = web3.eth.get_transaction(log["transactionHash"])
                 deployer = tx["from"].lower()
 
-                # Watchlist alert / wallet tracker (unchanged)
-                if deployer in WATCHLIST:
+                # Watchlist alert / wallet tracker: one lookup covers the global
+                # list and every user who watches this deployer
+                if deployer in watchlist_index:
+                    interested = watchlist_index.users_for(deployer)
                     message = f"Deployer {deployer} is in watchlist "
+                    if interested:
+                        message += f"(users: {', '.join(sorted(interested))})"
                     print(f"⚠️ {message}")
                     wallet_alerts.append(message)
                     tracked = {token0.lower(), token1.lower()}
@@ -246,7 +677,7 @@ def run_blockchain_listener():
                     tracked_tokens.update(tracked)
                     if wallet_tracker_class is not None:
                         try:
-                            wallet_tracker = wallet_tracker_class(web3, tracked, WATCHLIST)
+                            wallet_tracker = wallet_tracker_class(web3, tracked, watchlist_index.all_addresses())
                             wallet_tracker_thread = threading.Thread(target=wallet_tracker.run, daemon=True)
                             wallet_tracker_thread.start()
                             wallet_tracker_threads.append(wallet_tracker_thread)
@@ -259,109 +690,31 @@ def run_blockchain_listener():
                         print(msg)
                         status_messages.append(msg)
 
-                if analyzer_class is None:
-                    err = "TokenAnalyzer implementation not available; skipping analysis."
-                    print(err)
-                    status_messages.append(err)
-                    result = {}
-                else:
-                    try:
-                        analyzer = analyzer_class(web3, token0, token1, pair, config["UNISWAP_ROUTER"], PUBLIC_ADDRESS)
-                        result = analyzer.analyze()
-                    except Exception as e:
-                        err = f"TokenAnalyzer failed: {e}"
-                        print(err)
-                        status_messages.append(err)
-                        result = {}
-
-                # ---- Robust identifiers for idempotency
-                raw_txh = log.get("transactionHash")
-                raw_lix = log.get("logIndex")
-                raw_blk = log.get("blockNumber")
-
-                try:
-                    tx_hash = raw_txh.hex() if hasattr(raw_txh, "hex") else str(raw_txh)
-                except Exception:
-                    tx_hash = None
-
-                try:
-                    log_index = int(raw_lix) if raw_lix is not None else None
-                except Exception:
-                    log_index = None
-
-                try:
-                    block_number = int(raw_blk) if raw_blk is not None else None
-                except Exception:
-                    block_number = None
-
+                tx_hash, log_index, block_number = _event_identifiers(log)
                 # If we can't identify uniquely, skip persisting
                 if not tx_hash or log_index is None:
                     print("Skipping event: missing tx_hash/log_index")
+                    metrics.EVENTS_TOTAL.labels("skipped").inc()
                     continue
 
-                # pick the non-WETH token for the 'address' field
-                try:
-                    target_token = analyzer.get_target_token()  # analyzer helper
-                except Exception:
-                    # fallback: pick non-WETH by symbol in result
-                    t0 = result.get("token0", {}) or {}
-                    t1 = result.get("token1", {}) or {}
-                    target_token = (t1.get("address")
-                                    if (t0.get("symbol", "") or "").upper() == "WETH"
-                                    else t0.get("address"))
-
-                token_info = {
-                    "tx_hash": tx_hash,
-                    "log_index": log_index,
-                    "block_number": block_number,
-                    "address": str(target_token or token0),
-                    "pair_address": str(pair),
-                    "liquidity_eth": float(result.get("liquidity_eth", 0.0)),
-                    "honeypot": bool(result.get("honeypot", False)),
-                    "ownership_renounced": bool(result.get("ownership_renounced", False)),
-                    "token0_info": {
-                        "name":   str(result.get("token0", {}).get("name", "")),
-                        "symbol": str(result.get("token0", {}).get("symbol", "")),
-                        "address":str(result.get("token0", {}).get("address", "")),
-                    },
-                    "token1_info": {
-                        "name":   str(result.get("token1", {}).get("name", "")),
-                        "symbol": str(result.get("token1", {}).get("symbol", "")),
-                        "address":str(result.get("token1", {}).get("address", "")),
-                    },
-                    "timestamp": int(time.time()),
-                }
-
-                # ---- UPSERT using the unique key; only writes once globally
-                inserted = False
-                if token_collection is not None:
-                    try:
-                        res = token_collection.update_one(
-                            {"tx_hash": tx_hash, "log_index": log_index},
-                            {"$setOnInsert": token_info},
-                            upsert=True,
-                        )
-                        inserted = res.upserted_id is not None
-                        print(("Inserted" if inserted else "Duplicate skipped"), f"{tx_hash}:{log_index}")
-                    except DuplicateKeyError:
-                        inserted = False
-                        print(f"DuplicateKeyError: {tx_hash}:{log_index} already exists")
-                    except Exception as mongo_e:
-                        print(f"Error saving to MongoDB: {mongo_e}")
+                job = AnalysisJob(token0, token1, pair, deployer, tx_hash, log_index, block_number,
+                                  watchlisted=deployer in watchlist_index, dex=event["dex"], fee=event["fee"],
+                                  chain_id=profile.chain_id)
+                # one reserves/balance read here lets the scheduler order WETH pairs by size;
+                # the analyzer reuses it instead of fetching it again
+                if WETH.lower() in (token0.lower(), token1.lower()):
+                    job.is_weth_pair = True
+                    with stage_timer("check_liquidity"):
+                        job.liquidity_eth = pool_liquidity(
+                            web3, event["protocol"], pair, token0, token1, WETH,
+                            block_number if pin_blocks and block_number is not None else "latest")
+                if coordinator is not None:
+                    coordinator.publish(job)
                 else:
-                    # in-memory dedupe fallback (no Mongo)
-                    global seen_keys
-                    try:
-                        seen_keys
-                    except NameError:
-                        seen_keys = set()
-                    key = f"{tx_hash}:{log_index}"
-                    if key not in seen_keys:
-                        seen_keys.add(key)
-                        inserted = True
-
-                if inserted and token_collection is None:
-                    token_events.append(token_info)
+                    scheduler.submit(job)
+
+            if coordinator is not None and entries:
+                coordinator.lease.save_checkpoint(max(int(log["blockNumber"]) for log in entries))
 
             if wallet_tracker_thread and not wallet_tracker_thread.is_alive():
                 wallet_alerts.append("Wallet tracker thread finished.")
@@ -375,7 +728,95 @@ def run_blockchain_listener():
 
             if "filter not found" in str(e).lower():
                 print("Filter not found. Recreating filter...")
-                event_filter = web3.eth.filter({"address": UNISWAP_FACTORY, "topics": [event_signature]})
+                event_filter = web3.eth.filter(log_filter)
                 status_messages.append("Blockchain filter re-created.")
 
             time.sleep(5)
+
+def run_archive_compactor():
+    """Every ARCHIVE_COMPACT_INTERVAL s move events older than ARCHIVE_AFTER_DAYS to the archive."""
+    from backend.archive import get_archive, hot_window_days, compact
+    from backend.Core.analyzer.recheck import parse_intervals
+    archive = get_archive()
+    if archive is None:
+        return
+    # events still due a recheck stay in Mongo, where resume_rechecks looks for them
+    older_than = max(hot_window_days() * 86400, max(parse_intervals(os.getenv("RECHECK_INTERVALS"))))
+    context.initialize()
+    token_collection = context.token_collection
+    if token_collection is None:
+        print("ARCHIVE_AFTER_DAYS needs MONGO_URI; archive compaction disabled.")
+        return
+    from backend.coordination import Lease, default_member_id
+    interval = float(os.getenv("ARCHIVE_COMPACT_INTERVAL", "3600"))
+    # with several replicas only the lease holder compacts
+    lease = Lease(context.db["leases"], "archive_compactor", default_member_id(), ttl=max(600.0, interval * 2))
+    while True:
+        if lease.try_acquire():
+            try:
+                with stage_timer("archive_compaction"):
+                    moved = compact(token_collection, archive, older_than)
+                if moved:
+                    status_messages.append(f"Archived {moved} token events older than {hot_window_days():g} days")
+            except Exception as e:
+                print(f"Archive compaction failed: {e}")
+        time.sleep(interval)
+
+def run_search_index_sync():
+    """Build the search index from Mongo, then pull newer events every SEARCH_INDEX_REFRESH s."""
+    context.initialize()
+    token_collection = context.token_collection
+    if token_collection is None:
+        # in-memory mode: every event goes through persist_token_info
+        search_index.ready = True
+        return
+    fields = {"_id": 0, "address": 1, "chain_id": 1, "timestamp": 1, "token0_info": 1, "token1_info": 1}
+    from backend.archive import get_archive
+    archive = get_archive()
+    try:
+        with stage_timer("search_index_rebuild"):
+            docs = token_collection.find({}, fields).sort("timestamp", -1)
+            # archived events are all older than the ones still in Mongo, so this stays newest first
+            if archive is not None:
+                docs = itertools.chain(docs, archive.iter_documents())
+            count = search_index.rebuild(docs)
+        print(f"Search index built: {count} tokens")
+    except Exception as e:
+        print(f"Search index rebuild failed: {e}")
+        return
+    interval = float(os.getenv("SEARCH_INDEX_REFRESH", "30"))
+    while True:
+        time.sleep(interval)
+        try:
+            # events persisted by other processes/replicas; re-reading a few is harmless
+            since = search_index.last_timestamp - 60
+            for doc in token_collection.find({"timestamp": {"$gte": since}}, fields):
+                search_index.add(doc)
+        except Exception as e:
+            print(f"Search index refresh failed: {e}")
+
+def run_listeners():
+    """Run the ingest pipeline of every chain in CHAINS (default: mainnet only).
+
+    With more than one chain a ChainSupervisor keeps one pipeline per chain
+    alive, as threads or (CHAIN_SUPERVISOR_MODE=process) as processes.
+    """
+    from backend.Core.chains import enabled_chains
+    threading.Thread(target=run_search_index_sync, daemon=True, name="search-index").start()
+    if os.getenv("ARCHIVE_AFTER_DAYS"):
+        threading.Thread(target=run_archive_compactor, daemon=True, name="archive-compactor").start()
+    try:
+        chains = [p.name for p in enabled_chains()]
+    except Exception as e:
+        msg = f"Invalid CHAINS setting: {e}"
+        print(msg)
+        status_messages.append(msg)
+        return
+    if len(chains) == 1:
+        return run_blockchain_listener(chains[0])
+    from backend.supervisor import ChainSupervisor
+    supervisor = ChainSupervisor(run_blockchain_listener, chains,
+                                 mode=os.getenv("CHAIN_SUPERVISOR_MODE", "thread"),
+                                 restart_delay=float(os.getenv("CHAIN_RESTART_DELAY", "5")))
+    status_messages.append(f"Supervising {supervisor.mode} pipelines for {', '.join(chains)}")
+    supervisor.run()